@@ -0,0 +1,71 @@
+# benchmarks/column_widths.py
+"""Compares the old astype(str) column sizing with xlsx_stream.column_width.
+
+Usage: python benchmarks/column_widths.py [rows]   (default: 1,000,000)
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from xlsx_stream import column_width  # noqa: E402
+
+
+def problems_like_frame(rows: int, seed: int = 1) -> pd.DataFrame:
+    """Synthetic frame with the dtypes of the Problems/SLA sheets."""
+    rng = np.random.default_rng(seed)
+    hosts = [f"srv-{i:04d}.example.local" for i in range(2000)]
+    problems = [f"High CPU utilization on {h} (over 90% for 5m)" for h in hosts[:300]]
+    duration = pd.to_timedelta(rng.integers(0, 7 * 86400, rows), unit='s').astype('timedelta64[s]')
+    return pd.DataFrame({
+        'Severity': pd.Categorical.from_codes(rng.integers(0, 6, rows),
+                                              ['Not classified', 'Information', 'Warning', 'Average', 'High',
+                                               'Disaster']),
+        'Host': pd.Categorical.from_codes(rng.integers(0, len(hosts), rows), hosts),
+        'Problem': pd.Categorical.from_codes(rng.integers(0, len(problems), rows), problems),
+        'Duration': duration.where(rng.random(rows) > 0.2),
+        'EventID': pd.Series(rng.integers(10**6, 10**9, rows).astype(str), dtype='str'),
+        'Ack Duration (min)': pd.Series(np.round(rng.exponential(30, rows), 2)),
+        'Message': pd.Series(rng.choice(['ok', 'checking', 'escalated to the network team', None], rows), dtype='str'),
+    })
+
+
+def old_width(series: pd.Series, header) -> int:
+    column_len = max(series.astype(str).str.len().max(), len(str(header)))
+    return min(column_len + 2, 60)
+
+
+def measure(function, df: pd.DataFrame) -> tuple[list, float, float]:
+    """Times one untraced pass, then repeats it under tracemalloc for the allocation peak."""
+    start = time.perf_counter()
+    widths = [function(df[col], col) for col in df.columns]
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    for col in df.columns:
+        function(df[col], col)
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return widths, elapsed, peak
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    rows = int(argv[0]) if argv else 1_000_000
+    df = problems_like_frame(rows)
+    old_widths, old_seconds, old_peak = measure(old_width, df)
+    new_widths, new_seconds, new_peak = measure(column_width, df)
+    print(f"rows: {rows:,}  columns: {len(df.columns)}")
+    print(f"astype(str) : {old_seconds:8.3f} s  peak {old_peak:8.1f} MiB")
+    print(f"column_width: {new_seconds:8.3f} s  peak {new_peak:8.1f} MiB")
+    print(f"speed-up    : {old_seconds / new_seconds:8.1f}x")
+    for col, old, new in zip(df.columns, old_widths, new_widths):
+        print(f"  {col:<20} {old:>4} {new:>4}{'' if old == new else '  <- differs'}")
+    return 0 if [int(w) for w in old_widths] == new_widths else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
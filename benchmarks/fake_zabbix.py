@@ -0,0 +1,311 @@
+# benchmarks/fake_zabbix.py
+"""Local fake Zabbix JSON-RPC server with synthetic events and optional fault injection.
+
+Usage: python benchmarks/fake_zabbix.py --port 18555 --events-per-day 200 --fail-rate 0.05
+
+Implements what the report engine uses: event.get (filters, countOutput, limit,
+eventid_from, sortfield, eventids, selectHosts/selectTags/select_alerts/select_acknowledges),
+host.get, user.get and apiinfo.version. --fail-rate answers that share of requests with
+HTTP 502 and --drop-rate cuts that share of event.get responses in the middle of the body.
+Tests can move FakeZabbix.now forward and add to FakeZabbix.deleted between report runs.
+"""
+import argparse
+import calendar
+import json
+import random
+import sys
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+ACK_MESSAGES = ['', 'ok', 'checking', 'escalated to the network team', 'false positive, closing']
+ACK_ACTIONS = [1, 2, 3, 4, 6, 8, 12]
+
+
+class SyntheticEvents:
+    """Deterministic synthetic problem events kept as numpy columns.
+
+    Only the scalar fields are materialized; tags and acknowledges are derived from the
+    event position when an event is serialized, so a million events need a few tens of MB.
+    Events are numbered in clock order, which makes time and eventid ranges binary searches.
+    Alert storms add bursts of storm_size events on one host within ten minutes.
+    """
+
+    def __init__(self, year: int = 2024, month: int = 2, months: int = 1, events_per_day: int = 200,
+                 hosts: int = 50, users: int = 8, ack_rate: float = 0.6, recover_rate: float = 0.8,
+                 tags_per_event: float = 1.0, storms: int = 0, storm_size: int = 500, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        start = int(datetime(year, month, 1).timestamp())
+        days = 0
+        for offset in range(months):
+            y, m = divmod(year * 12 + month - 1 + offset, 12)
+            days += calendar.monthrange(y, m + 1)[1]
+        self.seed = seed
+        self.users = users
+
+        clocks = [start + np.repeat(np.arange(days, dtype=np.int64) * 86400, events_per_day)
+                  + rng.integers(0, 86400, days * events_per_day)]
+        names = rng.integers(0, 40, days * events_per_day)
+        host_idx = rng.integers(0, hosts, days * events_per_day)
+        self.names = [f"Problem {k} on host" for k in range(40)]
+        storm_names, storm_hosts = [names], [host_idx]
+        for storm in range(storms):
+            storm_start = start + int(rng.integers(0, days * 86400 - 600))
+            clocks.append(storm_start + rng.integers(0, 600, storm_size))
+            self.names.append(f"Alert storm {storm}: link down")
+            storm_names.append(np.full(storm_size, len(self.names) - 1))
+            storm_hosts.append(np.full(storm_size, rng.integers(0, hosts)))
+        clock = np.concatenate(clocks)
+        order = np.argsort(clock, kind='stable')
+        total = len(clock)
+
+        self.clock = clock[order]
+        self.eventid = 1002 + 2 * np.arange(total, dtype=np.int64)
+        self.name_idx = np.concatenate(storm_names)[order]
+        self.host_idx = np.concatenate(storm_hosts)[order]
+        self.severity = rng.integers(0, 6, total)
+        self.alerts = rng.integers(0, 4, total)
+        self.n_tags = np.minimum(rng.poisson(tags_per_event, total), 10)
+        self.n_acks = np.where(rng.random(total) < ack_rate, rng.integers(1, 4, total), 0)
+        self.recovered = rng.random(total) < recover_rate
+        self.recovery_delay = rng.integers(1, 20000, total)
+        self.hosts = [{'hostid': str(10000 + i), 'name': f"host-{i:05d}",
+                       'groups': [{'groupid': str(i % 4 + 1), 'name': f"Group {i % 4}"}]} for i in range(hosts)]
+        # Os dois últimos userid referenciados nos acks não existem (usuários removidos)
+        self.user_list = [{'userid': str(1 + i), 'alias': f"user{i}", 'name': f"Name{i}", 'surname': f"Surname{i}"}
+                          for i in range(users)]
+
+    def __len__(self):
+        return len(self.eventid)
+
+    def event(self, i: int) -> dict:
+        i = int(i)
+        rnd = random.Random(self.seed * 1_000_003 + i)
+        clock = int(self.clock[i])
+        acks = [{'acknowledgeid': str(i * 4 + k), 'userid': str(1 + rnd.randrange(self.users + 2)),
+                 'clock': str(clock + rnd.randrange(60, 4000)), 'message': rnd.choice(ACK_MESSAGES),
+                 'action': str(rnd.choice(ACK_ACTIONS))} for k in range(int(self.n_acks[i]))]
+        return {
+            'eventid': str(int(self.eventid[i])), 'clock': str(clock), 'severity': str(int(self.severity[i])),
+            'name': self.names[self.name_idx[i]], 'acknowledged': '1' if acks else '0',
+            'r_eventid': str(int(self.eventid[i]) + 1) if self.recovered[i] else '0',
+            'hosts': [{'hostid': str(10000 + int(self.host_idx[i]))}],
+            'tags': [{'tag': 'service' if k == 0 else f"tag{k}", 'value': f"value{(i + k) % 7}"}
+                     for k in range(int(self.n_tags[i]))],
+            'alerts': str(int(self.alerts[i])), 'acknowledges': acks,
+        }
+
+    def select(self, params: dict) -> np.ndarray:
+        """Positions of the events matching the event.get filters, in eventid order."""
+        lo, hi = 0, len(self)
+        if 'time_from' in params:
+            lo = max(lo, int(np.searchsorted(self.clock, int(params['time_from']), 'left')))
+        if 'time_till' in params:
+            hi = min(hi, int(np.searchsorted(self.clock, int(params['time_till']), 'right')))
+        if 'eventid_from' in params:
+            lo = max(lo, int(np.searchsorted(self.eventid, int(params['eventid_from']), 'left')))
+        positions = np.arange(lo, max(lo, hi))
+        if 'severities' in params:
+            positions = positions[np.isin(self.severity[lo:max(lo, hi)], [int(s) for s in params['severities']])]
+        return positions
+
+    def position(self, eventid: str) -> int | None:
+        """Position of a problem event, or None when eventid is not one."""
+        i = (int(eventid) - 1002) // 2
+        if int(eventid) % 2 or not 0 <= i < len(self):
+            return None
+        return i
+
+    def recovery(self, eventid: str) -> dict | None:
+        i = (int(eventid) - 1003) // 2
+        if int(eventid) % 2 == 0 or not 0 <= i < len(self) or not self.recovered[i]:
+            return None
+        return {'eventid': str(eventid), 'clock': str(int(self.clock[i] + self.recovery_delay[i]))}
+
+
+def _project(event: dict, params: dict) -> dict:
+    output = params.get('output', 'extend')
+    nested = ('hosts', 'tags', 'acknowledges', 'alerts')
+    keys = output if isinstance(output, list) else [k for k in event if k not in nested]
+    item = {k: event[k] for k in keys if k in event and k not in nested}
+    if 'selectHosts' in params:
+        item['hosts'] = event['hosts']
+    if 'selectTags' in params:
+        fields = params['selectTags']
+        item['tags'] = event['tags'] if fields == 'extend' else [{k: t[k] for k in fields} for t in event['tags']]
+    if 'select_alerts' in params:
+        item['alerts'] = event['alerts']
+    if 'select_acknowledges' in params:
+        fields = params['select_acknowledges']
+        item['acknowledges'] = (event['acknowledges'] if fields == 'extend'
+                                else [{k: a[k] for k in fields} for a in event['acknowledges']])
+    return item
+
+
+class FakeZabbix:
+    """Answers JSON-RPC calls from SyntheticEvents and counts calls per method.
+
+    now is the server clock: events, recoveries and acknowledges after it do not exist yet
+    (None = all of them). Problem eventids in deleted are gone, as if removed by housekeeping.
+    drop_if(method, params), when set, picks the responses to cut instead of drop_rate.
+    """
+
+    def __init__(self, data: SyntheticEvents, fail_rate: float = 0.0, drop_rate: float = 0.0, seed: int = 1):
+        self.data = data
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self.now = None
+        self.deleted = set()
+        self.drop_if = None
+        self.calls, self.faults = {}, {'http_502': 0, 'dropped': 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def roll(self, rate: float) -> bool:
+        with self._lock:
+            return self._random.random() < rate
+
+    def count(self, key: str, bucket: dict):
+        with self._lock:
+            bucket[key] = bucket.get(key, 0) + 1
+
+    def handle(self, method: str, params: dict):
+        self.count(method, self.calls)
+        if method == 'apiinfo.version':
+            return '6.0.0'
+        if method == 'event.get':
+            return self._event_get(params)
+        if method == 'host.get':
+            ids = set(params.get('hostids', []))
+            return [dict({'hostid': h['hostid'], 'name': h['name']},
+                         **({'groups': h['groups']} if 'selectGroups' in params else {}))
+                    for h in self.data.hosts if h['hostid'] in ids]
+        if method == 'user.get':
+            ids = set(params.get('userids', []))
+            return [u for u in self.data.user_list if u['userid'] in ids]
+        raise ValueError(f"Method not found: {method}")
+
+    def _exists(self, i: int) -> bool:
+        return int(self.data.eventid[i]) not in self.deleted and (self.now is None or self.data.clock[i] <= self.now)
+
+    def _event(self, i: int) -> dict:
+        """The event as the server sees it at now: later recoveries and acknowledges are left out."""
+        event = self.data.event(i)
+        if self.now is not None:
+            if self.data.clock[i] + self.data.recovery_delay[i] > self.now:
+                event['r_eventid'] = '0'
+            event['acknowledges'] = [ack for ack in event['acknowledges'] if int(ack['clock']) <= self.now]
+            event['acknowledged'] = '1' if event['acknowledges'] else '0'
+        return event
+
+    def _event_get(self, params: dict):
+        if 'eventids' in params:
+            severities = {int(s) for s in params.get('severities', range(6))}
+            eventid_from = int(params.get('eventid_from', 0))
+            found = []
+            for eventid in sorted(params['eventids'], key=int):
+                if int(eventid) < eventid_from:
+                    continue
+                i = self.data.position(eventid)
+                if i is None:
+                    recovery = self.data.recovery(eventid)
+                    if recovery and (self.now is None or int(recovery['clock']) <= self.now):
+                        found.append(recovery)
+                elif self.data.severity[i] in severities and self._exists(i):
+                    found.append(self._event(i))
+            return [_project(e, params) for e in found]
+        positions = self.data.select(params)
+        if self.now is not None or self.deleted:
+            positions = positions[[self._exists(i) for i in positions]] if len(positions) else positions
+        if params.get('countOutput'):
+            return str(len(positions))
+        if 'limit' in params:
+            positions = positions[:int(params['limit'])]
+        return [_project(self._event(i), params) for i in positions]
+
+
+def _handler_class(fake: FakeZabbix):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            if fake.roll(fake.fail_rate):
+                fake.count('http_502', fake.faults)
+                self.send_response(502)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            try:
+                body = {'jsonrpc': '2.0', 'result': fake.handle(request['method'], request.get('params', {})),
+                        'id': request.get('id')}
+            except ValueError as e:
+                body = {'jsonrpc': '2.0', 'error': {'code': -32601, 'message': 'Invalid params.', 'data': str(e)},
+                        'id': request.get('id')}
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            result = body.get('result')
+            drop = fake.drop_if(request['method'], request.get('params', {})) if fake.drop_if else \
+                fake.roll(fake.drop_rate)
+            if isinstance(result, list) and len(result) > 1 and drop:
+                # Resposta cortada no meio: o cliente recebe parte dos itens e a conexão cai
+                fake.count('dropped', fake.faults)
+                self.wfile.write(data[:len(data) // 2])
+                self.wfile.flush()
+                self.close_connection = True
+                return
+            self.wfile.write(data)
+
+    return Handler
+
+
+def serve(data: SyntheticEvents, port: int = 0, fail_rate: float = 0.0, drop_rate: float = 0.0):
+    """Starts the server in a daemon thread; returns (server, fake, api_url)."""
+    fake = FakeZabbix(data, fail_rate=fail_rate, drop_rate=drop_rate)
+    server = ThreadingHTTPServer(('127.0.0.1', port), _handler_class(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, fake, f"http://127.0.0.1:{server.server_address[1]}/api_jsonrpc.php"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Zabbix JSON-RPC server for local tests and benchmarks.")
+    parser.add_argument('--port', type=int, default=18555, help="0 picks a free port")
+    parser.add_argument('--year', type=int, default=2024)
+    parser.add_argument('--month', type=int, default=2)
+    parser.add_argument('--months', type=int, default=1)
+    parser.add_argument('--events-per-day', type=int, default=200)
+    parser.add_argument('--hosts', type=int, default=50)
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--ack-rate', type=float, default=0.6)
+    parser.add_argument('--recover-rate', type=float, default=0.8)
+    parser.add_argument('--tags-per-event', type=float, default=1.0)
+    parser.add_argument('--storms', type=int, default=0, help="alert storms in the period")
+    parser.add_argument('--storm-size', type=int, default=500)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    args = parser.parse_args(argv)
+    data = SyntheticEvents(args.year, args.month, months=args.months, events_per_day=args.events_per_day,
+                           hosts=args.hosts, users=args.users, ack_rate=args.ack_rate,
+                           recover_rate=args.recover_rate, tags_per_event=args.tags_per_event,
+                           storms=args.storms, storm_size=args.storm_size)
+    server, _, url = serve(data, args.port, args.fail_rate, args.drop_rate)
+    # A primeira linha da saída é a URL: run_benchmarks.py a lê para saber a porta escolhida
+    print(url, flush=True)
+    print(f"{len(data):,} events served (Ctrl+C to stop)", file=sys.stderr, flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+# benchmarks/run_benchmarks.py
+"""End-to-end benchmark suite: full ReportGenerator runs against the local fake Zabbix server.
+
+Usage: python benchmarks/run_benchmarks.py [--sizes 10000,100000,1000000] [--format xlsx]
+                                           [--output results.json] [--compare baseline.json]
+
+For each size a fake server is started in its own process with about that many synthetic
+events in one month, and the report is generated in a fresh child process, so the per-stage
+time and peak memory (from the run-metrics sidecar) belong to that run only. The results
+are saved as JSON together with the git commit, so runs on different commits can be
+compared with --compare.
+"""
+import argparse
+import calendar
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def git_revision() -> dict:
+    def git(*args):
+        result = subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True)
+        return result.stdout.strip() if result.returncode == 0 else None
+    return {'commit': git('rev-parse', 'HEAD'), 'subject': git('log', '-1', '--format=%s'),
+            'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+
+
+def environment() -> dict:
+    import numpy
+    import pandas
+    return {'python': platform.python_version(), 'pandas': pandas.__version__, 'numpy': numpy.__version__,
+            'machine': platform.machine(), 'system': platform.system(), 'cpus': os.cpu_count()}
+
+
+def start_server(args, events_per_day: int, storm_size: int) -> tuple[subprocess.Popen, str]:
+    command = [sys.executable, str(ROOT / 'benchmarks' / 'fake_zabbix.py'), '--port', '0',
+               '--year', str(args.year), '--month', str(args.month), '--events-per-day', str(events_per_day),
+               '--hosts', str(args.hosts), '--ack-rate', str(args.ack_rate),
+               '--tags-per-event', str(args.tags_per_event), '--storms', str(args.storms),
+               '--storm-size', str(storm_size)]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    url = server.stdout.readline().strip()
+    if not url:
+        server.kill()
+        raise RuntimeError("fake Zabbix server did not start")
+    return server, url
+
+
+def run_report(url: str, args, output_dir: Path) -> tuple[dict, float]:
+    """Generates the report in a child process; returns (metrics sidecar, wall seconds)."""
+    last_day = calendar.monthrange(args.year, args.month)[1]
+    config = {'url': url, 'token': 'benchmark', 'year': args.year, 'month': args.month,
+              'date_from': date(args.year, args.month, 1).isoformat(),
+              'date_till': date(args.year, args.month, last_day).isoformat(),
+              'sla_threshold': 20, 'severities': [str(code) for code in range(6)],
+              'output_dir': str(output_dir), 'output_formats': args.format.split(','),
+              'cache_enabled': False, 'api_rate_limit': 0}
+    start = time.perf_counter()
+    subprocess.run([sys.executable, __file__, '--child', json.dumps(config)], cwd=ROOT, check=True)
+    wall = time.perf_counter() - start
+    sidecar = next(output_dir.glob('*.metrics.json'))
+    return json.loads(sidecar.read_text(encoding='utf-8')), wall
+
+
+def run_child(config_json: str) -> int:
+    sys.path.insert(0, str(ROOT))
+    from report_logic import ReportGenerator
+    config = json.loads(config_json)
+    config['output_dir'] = Path(config['output_dir'])
+    for key in ('date_from', 'date_till'):
+        config[key] = date.fromisoformat(config[key])
+    ReportGenerator(config).generate()
+    return 0
+
+
+def print_results(results: dict):
+    print(f"commit {results['git']['commit'] or '?'}{' (dirty)' if results['git']['dirty'] else ''}")
+    for size, run in results['runs'].items():
+        print(f"\n{int(size):,} events requested, {run['events']:,} generated: {run['wall_seconds']:.1f} s")
+        for name, stage in run['metrics']['stages'].items():
+            peak = stage['peak_rss_bytes']
+            print(f"  {name:<16} {stage['seconds']:9.2f} s  "
+                  f"{(stage['events_per_second'] or 0):>12,.0f} ev/s  "
+                  f"{peak / 2**20 if peak else float('nan'):8.0f} MiB")
+
+
+def print_comparison(baseline: dict, results: dict):
+    print(f"\ncompared with {baseline['git']['commit'] or '?'} ({baseline['git']['subject']})")
+    for size, run in results['runs'].items():
+        before = baseline['runs'].get(size)
+        if before is None:
+            continue
+        print(f"\n{int(size):,} events: {before['wall_seconds']:.1f} s -> {run['wall_seconds']:.1f} s")
+        for name, stage in run['metrics']['stages'].items():
+            old = before['metrics']['stages'].get(name)
+            if old is None:
+                continue
+            ratio = old['seconds'] / stage['seconds'] if stage['seconds'] else float('inf')
+            old_peak, new_peak = (s['peak_rss_bytes'] or 0 for s in (old, stage))
+            print(f"  {name:<16} {old['seconds']:9.2f} -> {stage['seconds']:9.2f} s ({ratio:5.2f}x)  "
+                  f"{old_peak / 2**20:6.0f} -> {new_peak / 2**20:6.0f} MiB")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end report benchmarks on synthetic Zabbix data.")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="comma separated event counts (default: %(default)s)")
+    parser.add_argument('--year', type=int, default=2024)
+    parser.add_argument('--month', type=int, default=2)
+    parser.add_argument('--hosts', type=int, default=500)
+    parser.add_argument('--ack-rate', type=float, default=0.6)
+    parser.add_argument('--tags-per-event', type=float, default=2.0)
+    parser.add_argument('--storms', type=int, default=3, help="alert storms in the month")
+    parser.add_argument('--storm-share', type=float, default=0.05,
+                        help="share of the events that belong to the storms (default: %(default)s)")
+    parser.add_argument('--format', default='xlsx', help="report output formats (default: %(default)s)")
+    parser.add_argument('--output', type=Path, help="results JSON (default: benchmark-<commit>.json)")
+    parser.add_argument('--compare', type=Path, help="results JSON of an earlier run to compare with")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        return run_child(args.child)
+
+    days = calendar.monthrange(args.year, args.month)[1]
+    results = {'git': git_revision(), 'environment': environment(),
+               'started_at': datetime.now().astimezone().isoformat(timespec='seconds'),
+               'parameters': {key: getattr(args, key) for key in ('year', 'month', 'hosts', 'ack_rate',
+                                                                  'tags_per_event', 'storms', 'storm_share',
+                                                                  'format')},
+               'runs': {}}
+    for size in (int(s) for s in args.sizes.split(',')):
+        storm_size = int(size * args.storm_share / args.storms) if args.storms else 0
+        events_per_day = max(1, round((size - storm_size * args.storms) / days))
+        server, url = start_server(args, events_per_day, storm_size)
+        try:
+            with tempfile.TemporaryDirectory(prefix='zbx-bench-') as output_dir:
+                metrics, wall = run_report(url, args, Path(output_dir))
+        finally:
+            server.terminate()
+            server.wait()
+        results['runs'][str(size)] = {'events': events_per_day * days + storm_size * args.storms,
+                                      'wall_seconds': round(wall, 3), 'metrics': metrics}
+        print(f"{size:,} events: {wall:.1f} s", file=sys.stderr, flush=True)
+
+    output = args.output or Path(f"benchmark-{(results['git']['commit'] or 'unknown')[:10]}.json")
+    output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print_results(results)
+    if args.compare:
+        print_comparison(json.loads(args.compare.read_text(encoding='utf-8')), results)
+    print(f"\nresults saved to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
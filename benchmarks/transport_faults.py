@@ -0,0 +1,67 @@
+# benchmarks/transport_faults.py
+"""Collects the same synthetic month from a clean and from a faulty fake server and compares.
+
+Usage: python benchmarks/transport_faults.py [--fail-rate 0.1] [--drop-rate 0.1] [--events-per-day 300]
+
+The faulty server answers part of the requests with HTTP 502 and cuts part of the
+event.get responses mid-stream; the retries and the eventid-cursor resume must still
+produce exactly the same frames.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from fake_zabbix import SyntheticEvents, serve  # noqa: E402
+from report_logic import ReportGenerator  # noqa: E402
+
+
+def collect(url: str, args) -> tuple[tuple, float]:
+    config = {'url': url, 'token': 'benchmark', 'year': args.year, 'month': args.month, 'sla_threshold': 20,
+              'severities': [str(code) for code in range(6)], 'output_dir': Path('.'), 'cache_enabled': False,
+              'api_retries': args.retries, 'api_rate_limit': args.rate_limit,
+              'event_page_size': args.page_size, 'max_window_events': args.page_size * 4}
+    engine = ReportGenerator(config)
+    retries = []
+    engine.progress.connect(lambda message: retries.append(message) if 'retry' in message.lower() else None)
+    start = time.perf_counter()
+    frames = engine.collect_period()
+    return frames, time.perf_counter() - start, len(retries)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--year', type=int, default=2024)
+    parser.add_argument('--month', type=int, default=2)
+    parser.add_argument('--events-per-day', type=int, default=300)
+    parser.add_argument('--fail-rate', type=float, default=0.1)
+    parser.add_argument('--drop-rate', type=float, default=0.1)
+    parser.add_argument('--retries', type=int, default=8)
+    parser.add_argument('--rate-limit', type=float, default=0)
+    parser.add_argument('--page-size', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    data = SyntheticEvents(args.year, args.month, events_per_day=args.events_per_day)
+    clean_server, clean, clean_url = serve(data)
+    faulty_server, faulty, faulty_url = serve(data, fail_rate=args.fail_rate, drop_rate=args.drop_rate)
+    try:
+        (expected, clean_seconds, _), (received, faulty_seconds, retries) = collect(clean_url, args), \
+            collect(faulty_url, args)
+    finally:
+        clean_server.shutdown()
+        faulty_server.shutdown()
+
+    print(f"events: {len(data):,}")
+    print(f"clean : {clean_seconds:6.2f} s  calls {clean.calls}")
+    print(f"faulty: {faulty_seconds:6.2f} s  calls {faulty.calls}  faults {faulty.faults}  retries {retries}")
+    for name, left, right in zip(('problems', 'actions'), expected, received):
+        pd.testing.assert_frame_equal(left, right)
+        print(f"{name}: {len(left):,} rows identical")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
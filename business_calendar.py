@@ -0,0 +1,114 @@
+# business_calendar.py
+from datetime import date, datetime, time, timezone as dt_timezone
+
+import numpy as np
+
+_DAY_SECONDS = 86400
+# Dias da semana padrão: segunda (0) a sexta (4)
+DEFAULT_WEEKDAYS = (0, 1, 2, 3, 4)
+DEFAULT_HOURS = ('08:00-18:00',)
+
+
+def _seconds_of(value: str) -> int:
+    parsed = time.fromisoformat(value.strip()) if value.strip() != '24:00' else None
+    return _DAY_SECONDS if parsed is None else parsed.hour * 3600 + parsed.minute * 60 + parsed.second
+
+
+class BusinessCalendar:
+    """Working hours, weekdays and holidays of a team, and working time between timestamps.
+
+    Working time is the difference of a cumulative function W(t), the working seconds from
+    the first day involved up to t: a prefix sum over the working windows before t plus the
+    clipped part of the window containing t. Windows are placed on the timeline separately
+    in each stretch of constant UTC offset of the calendar's timezone, so DST days count the
+    time the wall clock really spends inside them. Both are array operations, so a whole
+    column of intervals costs a few passes over it however long they are.
+    """
+
+    def __init__(self, hours=DEFAULT_HOURS, weekdays=DEFAULT_WEEKDAYS, holidays=(), timezone=None):
+        windows = []
+        for window in hours:
+            start, _, end = str(window).partition('-')
+            windows.append((_seconds_of(start), _seconds_of(end)))
+        windows.sort()
+        if not windows or any(start >= end for start, end in windows) or any(
+                prev_end > start for (_, prev_end), (start, _) in zip(windows, windows[1:])):
+            raise ValueError(f"invalid working hours: {', '.join(map(str, hours))}")
+        if not weekdays or any(int(day) not in range(7) for day in weekdays):
+            raise ValueError(f"invalid weekdays: {weekdays}")
+        self.windows = np.array(windows, dtype=np.int64)
+        self.weekdays = frozenset(int(day) for day in weekdays)
+        self.holidays = frozenset(date.fromisoformat(str(day)) for day in holidays)
+        self.timezone = timezone
+
+    @classmethod
+    def from_config(cls, config: dict, timezone=None) -> 'BusinessCalendar':
+        """Builds the calendar of config 'business_hours' ({'hours', 'weekdays', 'holidays'})."""
+        hours = config.get('hours') or DEFAULT_HOURS
+        return cls(hours=[hours] if isinstance(hours, str) else hours,
+                   weekdays=config.get('weekdays') or DEFAULT_WEEKDAYS,
+                   holidays=config.get('holidays') or (), timezone=timezone)
+
+    def _utc_offset(self, clock: int) -> int:
+        return int(datetime.fromtimestamp(clock, dt_timezone.utc).astimezone(self.timezone).utcoffset().total_seconds())
+
+    def _offset_stretches(self, first_clock: int, last_clock: int) -> list[tuple[int, int, int]]:
+        """(start, end, UTC offset) stretches covering the clocks, with a day of margin on each side."""
+        # O offset muda no máximo uma vez por dia e em quartos de hora: uma sonda por dia e busca binária
+        probes = range(first_clock // 900 * 900 - _DAY_SECONDS, last_clock + 2 * _DAY_SECONDS, _DAY_SECONDS)
+        stretches, start, offset = [], probes[0], self._utc_offset(probes[0])
+        for low, high in zip(probes, probes[1:]):
+            if self._utc_offset(high) == offset:
+                continue
+            while high - low > 900:
+                middle = low + (high - low) // 1800 * 900
+                low, high = (middle, high) if self._utc_offset(middle) == offset else (low, middle)
+            stretches.append((start, high, offset))
+            start, offset = high, self._utc_offset(high)
+        stretches.append((start, probes[-1], offset))
+        return stretches
+
+    def _window_bounds(self, first_clock: int, last_clock: int) -> tuple[np.ndarray, np.ndarray]:
+        """Unix clocks (start, end) of the working windows around the clocks, in time order."""
+        starts, ends = [], []
+        for stretch_start, stretch_end, offset in self._offset_stretches(first_clock, last_clock):
+            # Dias locais (desde 1970-01-01) que o trecho toca
+            days = np.arange((stretch_start + offset) // _DAY_SECONDS, (stretch_end - 1 + offset) // _DAY_SECONDS + 1)
+            # 1970-01-01 (dia 0) foi uma quinta-feira: weekday() == 3
+            working = np.isin((days + 3) % 7, list(self.weekdays))
+            if self.holidays:
+                working &= ~np.isin(days, [day.toordinal() - date(1970, 1, 1).toordinal() for day in self.holidays])
+            midnights = days[working] * _DAY_SECONDS - offset
+            for window_start, window_end in self.windows:
+                window_starts = np.maximum(midnights + window_start, stretch_start)
+                window_ends = np.minimum(midnights + window_end, stretch_end)
+                inside = window_starts < window_ends
+                starts.append(window_starts[inside])
+                ends.append(window_ends[inside])
+        starts, ends = np.concatenate(starts), np.concatenate(ends)
+        order = np.argsort(starts, kind='stable')
+        return starts[order], ends[order]
+
+    def working_seconds(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """Working seconds between Unix clock arrays (NaN where either is negative, 0 if end < start)."""
+        start = np.asarray(start, dtype=np.int64)
+        end = np.asarray(end, dtype=np.int64)
+        valid = (start >= 0) & (end >= 0)
+        result = np.full(len(start), np.nan)
+        if not valid.any():
+            return result
+        start, end = start[valid], end[valid]
+        window_start, window_end = self._window_bounds(int(min(start.min(), end.min())),
+                                                       int(max(start.max(), end.max())))
+        before_window = np.concatenate(([0], np.cumsum(window_end - window_start)))
+
+        def cumulative(clocks):
+            # Janelas que começaram até o instante: todas completas, menos a última, que é cortada nele
+            started = np.searchsorted(window_start, clocks, side='right')
+            last = np.maximum(started - 1, 0)
+            inside = np.clip(clocks - window_start[last], 0, window_end[last] - window_start[last]) \
+                if len(window_start) else 0
+            return np.where(started > 0, before_window[last] + inside, 0)
+
+        result[valid] = np.maximum(cumulative(end) - cumulative(start), 0)
+        return result
@@ -0,0 +1,316 @@
+# event_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+# Tamanho máximo padrão do cache em disco (eventos brutos)
+DEFAULT_CACHE_MAX_MB = 512
+# Nomes de hosts/usuários mudam raramente: validade e limite de entradas por tipo
+DEFAULT_NAME_TTL_HOURS = 24
+DEFAULT_NAME_MAX_ENTRIES = 200000
+# Checkpoints do modo incremental mantidos por URL (config 'checkpoint_keep'; os períodos atualizados há
+# mais tempo são descartados). Também contam no limite de tamanho e são os primeiros a sair quando ele estoura
+DEFAULT_CHECKPOINT_KEEP = 3
+# Eventos lidos por vez ao percorrer um dia ou período guardado; o lock só é mantido durante cada leitura
+READ_PAGE_ROWS = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    url TEXT NOT NULL, query_key TEXT NOT NULL, day TEXT NOT NULL,
+    event_count INTEGER NOT NULL, size_bytes INTEGER NOT NULL,
+    fetched_at REAL NOT NULL, last_used REAL NOT NULL,
+    PRIMARY KEY (url, query_key, day)
+);
+CREATE TABLE IF NOT EXISTS events (
+    url TEXT NOT NULL, query_key TEXT NOT NULL, day TEXT NOT NULL,
+    eventid INTEGER NOT NULL, payload TEXT NOT NULL,
+    PRIMARY KEY (url, query_key, day, eventid)
+);
+CREATE TABLE IF NOT EXISTS lookups (
+    url TEXT NOT NULL, kind TEXT NOT NULL, key TEXT NOT NULL,
+    value TEXT NOT NULL, updated_at REAL NOT NULL,
+    PRIMARY KEY (url, kind, key)
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    url TEXT NOT NULL, query_key TEXT NOT NULL, period TEXT NOT NULL,
+    last_eventid INTEGER NOT NULL, last_clock INTEGER NOT NULL, recheck_eventids TEXT NOT NULL,
+    event_count INTEGER NOT NULL, updated_at REAL NOT NULL, size_bytes INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (url, query_key, period)
+);
+CREATE TABLE IF NOT EXISTS checkpoint_events (
+    url TEXT NOT NULL, query_key TEXT NOT NULL, period TEXT NOT NULL,
+    eventid INTEGER NOT NULL, payload TEXT NOT NULL,
+    PRIMARY KEY (url, query_key, period, eventid)
+);
+"""
+
+
+def default_cache_path() -> Path:
+    """Returns the per-user location of the cache database."""
+    base_dir = os.environ.get('LOCALAPPDATA') or Path.home() / '.cache'
+    return Path(base_dir) / 'ZabbixReportGenerator' / 'event_cache.sqlite3'
+
+
+def make_query_key(**query) -> str:
+    """Hashes the event.get filters that change the result set (severities, ...)."""
+    encoded = json.dumps(query, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:16]
+
+
+class EventCache:
+    """SQLite store of closed report days, recovery clocks and host/user names per Zabbix URL.
+
+    Only days whose problems are all recovered are stored: those never change again,
+    so a later run for the same or an overlapping period can skip them entirely.
+    Days and lookup rows together are kept under max_mb, least recently used first.
+    The incremental mode additionally keeps every event of a period together with a
+    checkpoint (last eventid and the events to re-check: still open or recent at the last run);
+    those periods count against max_mb too and are evicted before any day or lookup row.
+    """
+
+    def __init__(self, path=None, max_mb=DEFAULT_CACHE_MAX_MB):
+        self.path = Path(path) if path else default_cache_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.executescript(_SCHEMA)
+            if 'size_bytes' not in {row[1] for row in self._conn.execute("PRAGMA table_info(checkpoints)")}:
+                # Cache criado antes de os checkpoints entrarem na conta do tamanho
+                self._conn.execute("ALTER TABLE checkpoints ADD COLUMN size_bytes INTEGER NOT NULL DEFAULT 0")
+                self._conn.execute(
+                    "UPDATE checkpoints SET size_bytes = (SELECT COALESCE(SUM(LENGTH(payload)), 0) "
+                    "FROM checkpoint_events e WHERE e.url = checkpoints.url AND e.query_key = checkpoints.query_key "
+                    "AND e.period = checkpoints.period)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stored_days(self, url: str, query_key: str, days: list[date]) -> set[date]:
+        """Returns which of the requested days are cached, marking them as recently used."""
+        wanted = {day.isoformat(): day for day in days}
+        with self._lock, self._conn:
+            placeholders = ','.join('?' * len(wanted))
+            stored = [row[0] for row in self._conn.execute(
+                f"SELECT day FROM days WHERE url = ? AND query_key = ? AND day IN ({placeholders})",
+                (url, query_key, *wanted))]
+            self._conn.executemany(
+                "UPDATE days SET last_used = ? WHERE url = ? AND query_key = ? AND day = ?",
+                [(time.time(), url, query_key, day_key) for day_key in stored])
+        return {wanted[day_key] for day_key in stored}
+
+    def _iter_payloads(self, table: str, key_column: str, key: tuple, skip=frozenset()):
+        """Yields the payloads of one stored day or period in eventid order, a page at a time.
+
+        The lock is released before each page is handed out, so a paused or abandoned
+        iteration never blocks other threads using the cache.
+        """
+        last_eventid = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT eventid, payload FROM {table} WHERE url = ? AND query_key = ? AND {key_column} = ? "
+                    f"AND eventid > ? ORDER BY eventid LIMIT ?", (*key, last_eventid, READ_PAGE_ROWS)).fetchall()
+            for eventid, payload in rows:
+                if eventid not in skip:
+                    yield json.loads(payload)
+            if len(rows) < READ_PAGE_ROWS:
+                return
+            last_eventid = rows[-1][0]
+
+    def iter_events(self, url: str, query_key: str, days):
+        """Yields the stored event payloads of the given days one at a time."""
+        for day in days:
+            yield from self._iter_payloads('events', 'day', (url, query_key, day.isoformat()))
+
+    def store_days(self, url: str, query_key: str, days_events: dict):
+        """Replaces the stored (eventid, payload) pairs of each given day, then enforces the size limit."""
+        now = time.time()
+        with self._lock, self._conn:
+            for day, events in days_events.items():
+                day_key = day.isoformat()
+                payloads = [(url, query_key, day_key, int(eventid), json.dumps(payload, separators=(',', ':')))
+                            for eventid, payload in events]
+                self._conn.execute("DELETE FROM events WHERE url = ? AND query_key = ? AND day = ?",
+                                   (url, query_key, day_key))
+                self._conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?)", payloads)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO days VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (url, query_key, day_key, len(payloads), sum(len(p[4]) for p in payloads), now, now))
+            self._evict()
+
+    def stored_bytes(self) -> int:
+        """Size counted against max_bytes: event payloads of the stored days and periods plus every lookup row."""
+        with self._lock:
+            return self._stored_bytes()
+
+    def _stored_bytes(self) -> int:
+        days = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM days").fetchone()[0]
+        lookups = self._conn.execute("SELECT COALESCE(SUM(LENGTH(key) + LENGTH(value)), 0) FROM lookups").fetchone()[0]
+        checkpoints = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM checkpoints").fetchone()[0]
+        return days + lookups + checkpoints
+
+    def _evict(self, keep_period: tuple = None):
+        """Drops stored periods, then the least recently used days and lookup rows, until the cache fits.
+
+        Incremental periods go first, oldest update first, except keep_period (url, query_key,
+        period), the one being written. Days are then ordered by their last use and lookup rows
+        (recoveries, names) by when they were stored, in a single LRU order.
+        """
+        total = self._stored_bytes()
+        if total <= self.max_bytes:
+            return
+        candidates = [(0, updated_at, 'period', (url, query_key, period), size_bytes)
+                      for url, query_key, period, updated_at, size_bytes in self._conn.execute(
+                          "SELECT url, query_key, period, updated_at, size_bytes FROM checkpoints")
+                      if (url, query_key, period) != keep_period]
+        candidates += [(1, last_used, 'day', (url, query_key, day_key), size_bytes)
+                       for url, query_key, day_key, last_used, size_bytes in self._conn.execute(
+                           "SELECT url, query_key, day, last_used, size_bytes FROM days")]
+        candidates += [(1, updated_at, 'lookup', rowid, size_bytes)
+                       for rowid, updated_at, size_bytes in self._conn.execute(
+                           "SELECT rowid, updated_at, LENGTH(key) + LENGTH(value) FROM lookups")]
+        stale_lookups = []
+        for _, _, kind, key, size_bytes in sorted(candidates, key=lambda candidate: candidate[:2]):
+            if kind == 'period':
+                self._delete_period(*key)
+            elif kind == 'day':
+                self._conn.execute("DELETE FROM events WHERE url = ? AND query_key = ? AND day = ?", key)
+                self._conn.execute("DELETE FROM days WHERE url = ? AND query_key = ? AND day = ?", key)
+            else:
+                stale_lookups.append((key,))
+            total -= size_bytes
+            if total <= self.max_bytes:
+                break
+        self._conn.executemany("DELETE FROM lookups WHERE rowid = ?", stale_lookups)
+        self._conn.execute("PRAGMA incremental_vacuum")
+
+    def get_lookup(self, url: str, kind: str, keys, max_age: float = None) -> dict[str, str]:
+        """Returns the cached values ('recovery', 'host' or 'user') for the keys that are present.
+
+        With max_age (seconds), entries stored longer ago count as missing.
+        """
+        keys = list(keys)
+        min_updated = time.time() - max_age if max_age else 0
+        found = {}
+        with self._lock:
+            # Consultas em lotes para respeitar o limite de parâmetros do SQLite
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT key, value FROM lookups WHERE url = ? AND kind = ? AND updated_at >= ? "
+                    f"AND key IN ({placeholders})",
+                    (url, kind, min_updated, *chunk)).fetchall())
+        return found
+
+    def put_lookup(self, url: str, kind: str, mapping: dict, max_entries: int = None):
+        """Stores values, drops the oldest entries of this kind beyond max_entries, then enforces the size limit."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO lookups VALUES (?, ?, ?, ?, ?)",
+                                   [(url, kind, str(k), str(v), now) for k, v in mapping.items()])
+            if max_entries:
+                self._conn.execute(
+                    "DELETE FROM lookups WHERE rowid IN (SELECT rowid FROM lookups WHERE url = ? AND kind = ? "
+                    "ORDER BY updated_at DESC LIMIT -1 OFFSET ?)", (url, kind, int(max_entries)))
+            self._evict()
+
+    def load_checkpoint(self, url: str, query_key: str, period: str) -> dict | None:
+        """Returns the incremental checkpoint of a period (last_eventid, last_clock, recheck_eventids), if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_eventid, last_clock, recheck_eventids, event_count, updated_at FROM checkpoints "
+                "WHERE url = ? AND query_key = ? AND period = ?", (url, query_key, period)).fetchone()
+        if row is None:
+            return None
+        last_eventid, last_clock, recheck_eventids, event_count, updated_at = row
+        return {'last_eventid': last_eventid, 'last_clock': last_clock,
+                'recheck_eventids': json.loads(recheck_eventids), 'event_count': event_count, 'updated_at': updated_at}
+
+    def iter_checkpoint_events(self, url: str, query_key: str, period: str, skip=()):
+        """Yields the stored event payloads of a period, except the eventids in skip."""
+        yield from self._iter_payloads('checkpoint_events', 'period', (url, query_key, period),
+                                       skip={int(eventid) for eventid in skip})
+
+    def store_checkpoint(self, url: str, query_key: str, period: str, checkpoint: dict, events,
+                         replace: bool = False, deleted=(), keep: int = DEFAULT_CHECKPOINT_KEEP):
+        """Merges (eventid, payload) pairs into the stored period and saves its checkpoint.
+
+        With replace the stored events of the period are dropped first; deleted lists eventids
+        that no longer exist. Eventids in events must be unique. Only the keep most recently
+        updated periods per URL are kept, then the size limit is enforced.
+        """
+        key = (url, query_key, period)
+        deleted = {int(eventid) for eventid in deleted}
+        payloads = ((*key, int(eventid), json.dumps(payload, separators=(',', ':'))) for eventid, payload in events)
+        with self._lock, self._conn:
+            if replace:
+                self._conn.execute("DELETE FROM checkpoint_events WHERE url = ? AND query_key = ? AND period = ?", key)
+                size_bytes = 0
+            else:
+                # Só os eventos novos e os reconsultados: poucos, e os regravados deixam de contar pelo tamanho antigo
+                payloads = list(payloads)
+                row = self._conn.execute("SELECT size_bytes FROM checkpoints WHERE url = ? AND query_key = ? "
+                                         "AND period = ?", key).fetchone()
+                size_bytes = (row[0] if row else 0) - self._period_payload_bytes(
+                    key, deleted | {payload[3] for payload in payloads})
+            self._conn.executemany(
+                "DELETE FROM checkpoint_events WHERE url = ? AND query_key = ? AND period = ? AND eventid = ?",
+                [(*key, eventid) for eventid in deleted])
+            size_bytes += self._insert_period_payloads(payloads)
+            event_count = self._conn.execute(
+                "SELECT COUNT(*) FROM checkpoint_events WHERE url = ? AND query_key = ? AND period = ?",
+                key).fetchone()[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (url, query_key, period, last_eventid, last_clock, "
+                "recheck_eventids, event_count, updated_at, size_bytes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, int(checkpoint['last_eventid']), int(checkpoint['last_clock']),
+                 json.dumps(sorted(int(eventid) for eventid in checkpoint['recheck_eventids'])), event_count,
+                 time.time(), size_bytes))
+            stale = self._conn.execute(
+                "SELECT query_key, period FROM checkpoints WHERE url = ? ORDER BY updated_at DESC LIMIT -1 OFFSET ?",
+                (url, max(1, int(keep)))).fetchall()
+            for stale_key, stale_period in stale:
+                self._delete_period(url, stale_key, stale_period)
+            self._evict(keep_period=key)
+        return event_count
+
+    def _insert_period_payloads(self, payloads) -> int:
+        """Inserts or replaces checkpoint_events rows and returns the size of the payloads written."""
+        written = 0
+
+        def counted():
+            nonlocal written
+            for payload in payloads:
+                written += len(payload[4])
+                yield payload
+
+        self._conn.executemany("INSERT OR REPLACE INTO checkpoint_events VALUES (?, ?, ?, ?, ?)", counted())
+        return written
+
+    def _period_payload_bytes(self, key: tuple, eventids: set) -> int:
+        """Size of the stored payloads of a period among the given eventids."""
+        eventids = list(eventids)
+        total = 0
+        for i in range(0, len(eventids), 500):
+            chunk = eventids[i:i + 500]
+            total += self._conn.execute(
+                f"SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM checkpoint_events WHERE url = ? AND query_key = ? "
+                f"AND period = ? AND eventid IN ({','.join('?' * len(chunk))})", (*key, *chunk)).fetchone()[0]
+        return total
+
+    def _delete_period(self, url: str, query_key: str, period: str):
+        self._conn.execute("DELETE FROM checkpoint_events WHERE url = ? AND query_key = ? AND period = ?",
+                           (url, query_key, period))
+        self._conn.execute("DELETE FROM checkpoints WHERE url = ? AND query_key = ? AND period = ?",
+                           (url, query_key, period))
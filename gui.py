@@ -1,12 +1,15 @@
 # gui.py
 import sys
 import locale
+import calendar
+import importlib.util
+import multiprocessing
 import subprocess
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 import requests
 
-from PyQt6.QtCore import QThread
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
 from PyQt6.QtWidgets import (QApplication, QCheckBox, QComboBox, QFileDialog,
                              QFormLayout, QGridLayout, QGroupBox, QHBoxLayout,
                              QLabel, QLineEdit, QMainWindow, QMessageBox,
@@ -15,7 +18,7 @@ from PyQt6.QtWidgets import (QApplication, QCheckBox, QComboBox, QFileDialog,
 from PyQt6.QtGui import QAction
 
 try:
-    from report_logic import SEVERITY_MAP, ReportGenerator
+    from report_logic import DEFAULT_FETCH_WORKERS, OUTPUT_FORMATS, SEVERITY_MAP, ReportGenerator
     from updater import UpdateCheckWorker, UpdateDownloadWorker
     from translations import get_string
 except ImportError as e:
@@ -28,6 +31,23 @@ except ImportError as e:
 __version__ = "1.1.5"
 
 
+class ReportWorker(QObject):
+    """Thin Qt adapter: runs the headless ReportGenerator in a QThread and relays its callbacks as signals."""
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, config):
+        super().__init__()
+        self.engine = ReportGenerator(config)
+        self.engine.progress.connect(self.progress.emit)
+        self.engine.finished.connect(self.finished.emit)
+        self.engine.error.connect(self.error.emit)
+
+    def run(self):
+        self.engine.run()
+
+
 class ZabbixReportApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -181,6 +201,11 @@ class ZabbixReportApp(QMainWindow):
         date_layout.addSpacing(20)
         date_layout.addWidget(QLabel(get_string('month')))
         date_layout.addWidget(self.month_input)
+        date_layout.addSpacing(20)
+        self.months_input = QSpinBox()
+        self.months_input.setRange(1, 24)
+        date_layout.addWidget(QLabel(get_string('months')))
+        date_layout.addWidget(self.months_input)
         date_layout.addStretch()
 
         form_layout.addRow(get_string('report_period'), date_container_widget)
@@ -190,6 +215,16 @@ class ZabbixReportApp(QMainWindow):
         self.sla_input.setValue(20)
         self.sla_input.setSuffix(get_string('sla_suffix'))
         form_layout.addRow(get_string('ack_sla'), self.sla_input)
+
+        self.workers_input = QSpinBox()
+        self.workers_input.setRange(1, 16)
+        self.workers_input.setValue(DEFAULT_FETCH_WORKERS)
+        form_layout.addRow(get_string('fetch_workers'), self.workers_input)
+
+        self.cache_refresh_checkbox = QCheckBox(get_string('cache_refresh'))
+        form_layout.addRow('', self.cache_refresh_checkbox)
+        self.incremental_checkbox = QCheckBox(get_string('incremental_mode'))
+        form_layout.addRow('', self.incremental_checkbox)
         config_group.setLayout(form_layout)
         self.main_layout.addWidget(config_group)
 
@@ -210,12 +245,25 @@ class ZabbixReportApp(QMainWindow):
         self.main_layout.addWidget(severity_group)
 
         output_group = QGroupBox(get_string('output_group'))
-        output_layout = QHBoxLayout()
+        output_layout = QVBoxLayout()
+        path_layout = QHBoxLayout()
         self.output_path_input = QLineEdit(str(Path.home() / "Documents\\Zabbix Reports"))
         browse_btn = QPushButton(get_string('browse_button'))
         browse_btn.clicked.connect(self._browse_folder)
-        output_layout.addWidget(self.output_path_input)
-        output_layout.addWidget(browse_btn)
+        path_layout.addWidget(self.output_path_input)
+        path_layout.addWidget(browse_btn)
+        output_layout.addLayout(path_layout)
+
+        formats_layout = QHBoxLayout()
+        formats_layout.addWidget(QLabel(get_string('output_formats')))
+        self.format_checkboxes = {}
+        for output_format in OUTPUT_FORMATS:
+            checkbox = QCheckBox(get_string(f'format_{output_format}'))
+            checkbox.setChecked(output_format == 'xlsx')
+            self.format_checkboxes[output_format] = checkbox
+            formats_layout.addWidget(checkbox)
+        formats_layout.addStretch()
+        output_layout.addLayout(formats_layout)
         output_group.setLayout(output_layout)
         self.main_layout.addWidget(output_group)
 
@@ -248,6 +296,12 @@ class ZabbixReportApp(QMainWindow):
         if not config['severities']:
             QMessageBox.warning(self, get_string('validation_error_title'), get_string('no_severity_selected'))
             return False
+        if not config['output_formats']:
+            QMessageBox.warning(self, get_string('validation_error_title'), get_string('no_output_format_selected'))
+            return False
+        if 'parquet' in config['output_formats'] and importlib.util.find_spec('pyarrow') is None:
+            QMessageBox.warning(self, get_string('validation_error_title'), get_string('parquet_unavailable'))
+            return False
         try:
             config['output_dir'].mkdir(parents=True, exist_ok=True)
             (config['output_dir'] / ".permission_test").touch()
@@ -271,11 +325,24 @@ class ZabbixReportApp(QMainWindow):
             return False
         return True
 
+    def _selected_range(self):
+        """First and last day covered by the selected start month and number of months."""
+        year, month = self.year_input.value(), self.month_input.currentIndex() + 1
+        last_month_index = year * 12 + month - 1 + self.months_input.value() - 1
+        last_year, last_month = divmod(last_month_index, 12)
+        last_month += 1
+        return date(year, month, 1), date(last_year, last_month, calendar.monthrange(last_year, last_month)[1])
+
     def _start_report_generation(self):
+        date_from, date_till = self._selected_range()
         config = {'url': self.url_input.text().strip(), 'token': self.token_input.text().strip(),
                   'year': self.year_input.value(), 'month': self.month_input.currentIndex() + 1,
-                  'sla_threshold': self.sla_input.value(),
+                  'date_from': date_from, 'date_till': date_till,
+                  'sla_threshold': self.sla_input.value(), 'fetch_workers': self.workers_input.value(),
+                  'cache_refresh': self.cache_refresh_checkbox.isChecked(),
+                  'incremental': self.incremental_checkbox.isChecked(),
                   'severities': [code for code, checkbox in self.severity_checkboxes.items() if checkbox.isChecked()],
+                  'output_formats': [fmt for fmt, checkbox in self.format_checkboxes.items() if checkbox.isChecked()],
                   'output_dir': Path(self.output_path_input.text().strip())}
         self.generate_btn.setEnabled(False)
         self.generate_btn.setText(get_string('validating_button'))
@@ -285,7 +352,7 @@ class ZabbixReportApp(QMainWindow):
             return
         self.generate_btn.setText(get_string('generating_button'))
         self.report_thread = QThread()
-        self.report_worker = ReportGenerator(config)
+        self.report_worker = ReportWorker(config)
         self.report_worker.moveToThread(self.report_thread)
         self.report_thread.started.connect(self.report_worker.run)
         self.report_worker.finished.connect(self._on_finished)
@@ -399,6 +466,8 @@ class ZabbixReportApp(QMainWindow):
             self.update_download_worker.restart_app()
 
 if __name__ == "__main__":
+    # Necessário para os processos de períodos paralelos no executável congelado (PyInstaller)
+    multiprocessing.freeze_support()
     # Define o locale para o padrão do sistema para obter nomes de meses corretos, etc.
     try:
         locale.setlocale(locale.LC_ALL, '')
@@ -0,0 +1,127 @@
+# json_stream.py
+import codecs
+import json
+import re
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_NUMBER_PART = re.compile(r'[-+.eE0-9]*')
+# O que pode sobrar no fim de um corpo cortado ao meio: parte de número, de literal ou de escape \uXXXX
+_CUT_VALUE = re.compile(_NUMBER_PART.pattern + r'|t(r(ue?)?)?|f(a(l(se?)?)?)?|n(u(ll?)?)?|u[0-9a-fA-F]{0,4}')
+
+
+class JsonRpcErrorResponse(Exception):
+    """Raised when the streamed JSON-RPC response carries an 'error' member."""
+
+    def __init__(self, error: dict):
+        super().__init__(error.get('data', 'Unknown Zabbix API error') if isinstance(error, dict) else error)
+        self.error = error
+
+
+class IncompleteJsonStream(ValueError):
+    """Raised when the text chunks end before the JSON document does (connection closed mid-body)."""
+
+
+class _StreamReader:
+    """Minimal pull parser over an iterator of text chunks.
+
+    Only the top-level object and the 'result' array are walked by hand; every other
+    value (including each array item) is decoded with json's raw_decode once it is
+    completely inside the buffer, so only one item is ever held in memory.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise IncompleteJsonStream("Unexpected end of JSON stream")
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} in JSON stream, got {char!r}")
+        self._pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                # Valor cortado no fim do corpo: a conexão terminou antes da resposta
+                if e.msg.startswith('Unterminated') or _CUT_VALUE.fullmatch(self._buffer, e.pos):
+                    raise IncompleteJsonStream(f"Unexpected end of JSON stream ({e.msg})") from e
+                raise
+            # Um número no fim do buffer pode continuar no próximo bloco ('12' + '.5', '1' + 'e3')
+            if isinstance(value, (int, float)) and _NUMBER_PART.fullmatch(self._buffer, end):
+                if self._fill():
+                    continue
+                if end < len(self._buffer):
+                    raise IncompleteJsonStream("Unexpected end of JSON stream (number cut short)")
+            self._pos = end
+            return value
+
+
+def iter_json_rpc_result(text_chunks):
+    """Yields the items of a JSON-RPC 'result' array while the response is still arriving.
+
+    A scalar or object result is yielded as a single item. Raises JsonRpcErrorResponse
+    when the response contains an 'error' member.
+    """
+    reader = _StreamReader(text_chunks)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key == 'result' and reader.peek() == '[':
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.expect(']')
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.expect(',]') == ']':
+                        break
+        elif key == 'result':
+            yield reader.value()
+        elif key == 'error':
+            raise JsonRpcErrorResponse(reader.value())
+        else:
+            reader.value()
+        if reader.expect(',}') == '}':
+            return
+
+
+def iter_response_text(response, chunk_size=64 * 1024):
+    """Decodes a streamed requests response into text chunks without joining them."""
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
@@ -0,0 +1,134 @@
+# quantile_sketch.py
+import math
+
+import numpy as np
+
+# Erro relativo máximo dos quantis estimados: buckets logarítmicos no estilo DDSketch
+RELATIVE_ACCURACY = 0.01
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+# Valores abaixo disso (durações nulas ou negativas) vão para o bucket 0, que representa zero
+MIN_INDEXED_VALUE = 1e-3
+_BUCKET_OFFSET = math.ceil(math.log(MIN_INDEXED_VALUE) / _LOG_GAMMA) - 1
+
+
+def _bucket_of(values: np.ndarray) -> np.ndarray:
+    buckets = np.zeros(len(values), dtype=np.int64)
+    indexed = values >= MIN_INDEXED_VALUE
+    buckets[indexed] = np.ceil(np.log(values[indexed]) / _LOG_GAMMA).astype(np.int64) - _BUCKET_OFFSET
+    return buckets
+
+
+def _bucket_value(buckets: np.ndarray) -> np.ndarray:
+    """Value each bucket stands for: within RELATIVE_ACCURACY of every value counted in it."""
+    values = 2 * _GAMMA ** (buckets + _BUCKET_OFFSET).astype(float) / (_GAMMA + 1)
+    return np.where(buckets > 0, values, 0.0)
+
+
+def _combine(key_codes: np.ndarray, buckets: np.ndarray) -> np.ndarray:
+    return (key_codes.astype(np.int64) << 32) | buckets
+
+
+class QuantileSketches:
+    """Mergeable quantile sketches of many keys, e.g. one per (day, dimension, value).
+
+    Each sketch counts values in logarithmic buckets, so a quantile is estimated within
+    RELATIVE_ACCURACY no matter how many values were added, and two sketches merge exactly
+    by adding their counts. All sketches are kept together as sparse (key, bucket, count)
+    columns sorted by key and bucket, and every operation works on whole columns.
+    """
+
+    def __init__(self, keys: list, key_codes: np.ndarray, buckets: np.ndarray, counts: np.ndarray):
+        self.keys = keys
+        self.key_codes = key_codes
+        self.buckets = buckets
+        self.counts = counts
+
+    @classmethod
+    def _from_columns(cls, key_of, key_codes: np.ndarray, buckets: np.ndarray, weights=None) -> 'QuantileSketches':
+        """Sums (key code, bucket) pairs; key_of turns each distinct key code into its key."""
+        pairs, inverse = np.unique(_combine(key_codes, buckets), return_inverse=True)
+        counts = np.bincount(inverse.reshape(-1), weights=weights, minlength=len(pairs)).astype(np.int64)
+        codes = pairs >> 32
+        distinct, compact = np.unique(codes, return_inverse=True)
+        return cls([key_of(int(code)) for code in distinct], compact.reshape(-1).astype(np.int64),
+                   pairs & 0xFFFFFFFF, counts)
+
+    @classmethod
+    def empty(cls) -> 'QuantileSketches':
+        return cls([], np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int64))
+
+    @classmethod
+    def from_values(cls, key_codes: np.ndarray, values: np.ndarray, key_of) -> 'QuantileSketches':
+        """Sketches of values grouped by integer key_codes; NaN values are left out."""
+        valid = ~np.isnan(values)
+        return cls._from_columns(key_of, key_codes[valid], _bucket_of(values[valid]))
+
+    @classmethod
+    def merge(cls, sketches: list) -> 'QuantileSketches':
+        """One sketch per key of all inputs, adding the counts of keys present in several of them."""
+        positions = {}
+        codes = [np.array([positions.setdefault(key, len(positions)) for key in sketch.keys],
+                          dtype=np.int64)[sketch.key_codes] if len(sketch.keys) else np.empty(0, np.int64)
+                 for sketch in sketches]
+        keys = list(positions)
+        return cls._from_columns(keys.__getitem__, np.concatenate(codes) if codes else np.empty(0, np.int64),
+                                 np.concatenate([s.buckets for s in sketches]) if sketches else np.empty(0, np.int64),
+                                 np.concatenate([s.counts for s in sketches]) if sketches else None)
+
+    def regroup(self, mapper) -> 'QuantileSketches':
+        """Merges the sketches under new keys; mapper returns the new keys (possibly none) of each key."""
+        positions = {}
+        targets = [[positions.setdefault(new_key, len(positions)) for new_key in mapper(key)] for key in self.keys]
+        lengths = np.array([len(keys) for keys in targets], dtype=np.int64)
+        flat = np.array([code for keys in targets for code in keys], dtype=np.int64)
+        starts = np.cumsum(lengths) - lengths
+        per_row = lengths[self.key_codes]
+        first = np.repeat(starts[self.key_codes] - np.cumsum(per_row) + per_row, per_row)
+        new_codes = flat[first + np.arange(per_row.sum())] if len(flat) else np.empty(0, np.int64)
+        new_keys = list(positions)
+        return type(self)._from_columns(new_keys.__getitem__, new_codes, np.repeat(self.buckets, per_row),
+                                        np.repeat(self.counts, per_row))
+
+    def split(self, group_of) -> dict:
+        """The sketches grouped by group_of(key), e.g. by day: {group: QuantileSketches of its keys}."""
+        groups = {}
+        for position, key in enumerate(self.keys):
+            groups.setdefault(group_of(key), []).append(position)
+        parts = {}
+        for group, positions in groups.items():
+            rows = np.isin(self.key_codes, positions)
+            compact = np.full(len(self.keys), -1, dtype=np.int64)
+            compact[positions] = np.arange(len(positions))
+            parts[group] = type(self)([self.keys[position] for position in positions], compact[self.key_codes[rows]],
+                                      self.buckets[rows], self.counts[rows])
+        return parts
+
+    def to_dict(self) -> dict:
+        """JSON-serializable columns; keys must be tuples of JSON values."""
+        return {'keys': [list(key) for key in self.keys], 'key_codes': self.key_codes.tolist(),
+                'buckets': self.buckets.tolist(), 'counts': self.counts.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'QuantileSketches':
+        return cls([tuple(key) for key in data['keys']], np.asarray(data['key_codes'], dtype=np.int64),
+                   np.asarray(data['buckets'], dtype=np.int64), np.asarray(data['counts'], dtype=np.int64))
+
+    def totals(self) -> np.ndarray:
+        """Number of values in each sketch, in the order of keys."""
+        return np.bincount(self.key_codes, weights=self.counts, minlength=len(self.keys)).astype(np.int64)
+
+    def quantiles(self, qs) -> np.ndarray:
+        """Estimated quantiles (0..1) of each sketch: an array of len(keys) rows by len(qs) columns."""
+        totals = self.totals()
+        cumulative = np.cumsum(self.counts)
+        starts = np.searchsorted(self.key_codes, np.arange(len(self.keys)))
+        before = np.where(starts > 0, cumulative[np.maximum(starts - 1, 0)], 0)
+        result = np.empty((len(self.keys), len(qs)))
+        for column, q in enumerate(qs):
+            # Menor bucket cuja contagem acumulada passa do posto q * (n - 1) dentro da chave
+            positions = np.searchsorted(cumulative, before + q * (totals - 1), side='right')
+            result[:, column] = _bucket_value(self.buckets[np.minimum(positions, max(len(self.buckets) - 1, 0))]) \
+                if len(self.buckets) else np.nan
+        result[totals == 0] = np.nan
+        return result
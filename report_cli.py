@@ -0,0 +1,245 @@
+# report_cli.py
+"""Headless entry point: python -m report_cli --url ... --token-file ... --year 2024 --month 5
+
+Several months or a custom range can be requested with --months N or --from/--till;
+the periods are then collected in parallel worker processes and merged in one workbook.
+--servers-file replaces --url/--token-file with a list of Zabbix servers, collected in
+parallel and merged the same way, with a Server column.
+
+Exit codes: 0 report saved, 1 unexpected error, 2 invalid arguments, 3 nothing to report,
+4 authentication failure, 5 other Zabbix API error, 6 connection failure.
+"""
+import argparse
+import calendar
+import importlib.util
+import json
+import logging
+import multiprocessing
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from business_calendar import BusinessCalendar
+from report_logic import (DEFAULT_FETCH_WORKERS, OUTPUT_FORMATS, PROBLEM_COLUMNS, REPORT_SHEETS, SEVERITY_MAP,
+                          NoReportData, ReportGenerator, ZabbixAPIError, ZabbixConnectionError, describe_error,
+                          is_auth_error, report_servers)
+from translations import LANGUAGES, get_string
+
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+EXIT_NO_DATA = 3
+EXIT_AUTH_ERROR = 4
+EXIT_API_ERROR = 5
+EXIT_CONNECTION_ERROR = 6
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    now = datetime.now()
+    parser = argparse.ArgumentParser(prog='python -m report_cli',
+                                     description="Generates the Zabbix SLA report without the GUI.")
+    parser.add_argument('--url', help="Zabbix API URL (…/api_jsonrpc.php)")
+    parser.add_argument('--token-file', type=Path,
+                        help="file containing the Zabbix API token ('-' reads it from stdin)")
+    parser.add_argument('--servers-file', type=Path,
+                        help="JSON list of servers ({\"name\", \"url\", \"token\" or \"token_file\"}) to merge in "
+                             "one report, instead of --url/--token-file")
+    parser.add_argument('--year', type=int, default=now.year)
+    parser.add_argument('--month', type=int, default=now.month, choices=range(1, 13), metavar='1-12')
+    parser.add_argument('--months', type=int, default=1,
+                        help="number of months starting at --year/--month (default: 1)")
+    parser.add_argument('--from', dest='date_from', type=date.fromisoformat, metavar='YYYY-MM-DD',
+                        help="custom range start (overrides --year/--month/--months)")
+    parser.add_argument('--till', dest='date_till', type=date.fromisoformat, metavar='YYYY-MM-DD',
+                        help="custom range end, inclusive (default: same as --from)")
+    parser.add_argument('--period-workers', type=int,
+                        help="worker processes for multi-period or multi-server reports "
+                             "(default: CPU count, at least one per server)")
+    parser.add_argument('--severities', default=','.join(sorted(SEVERITY_MAP)),
+                        help="comma-separated severity codes 0-5 (default: all)")
+    parser.add_argument('--sla', type=int, default=20, dest='sla_threshold',
+                        help="acknowledgement SLA in minutes (default: 20)")
+    parser.add_argument('--output-dir', type=Path, default=Path.cwd())
+    parser.add_argument('--format', default='xlsx', dest='output_formats',
+                        help=f"comma-separated outputs: {', '.join(OUTPUT_FORMATS)} (default: %(default)s); "
+                             "parquet and csv write one file per sheet without Excel formatting")
+    parser.add_argument('--sheets', help=f"comma-separated sheets to include: {', '.join(REPORT_SHEETS)} "
+                                          "(default: all); data only used by other sheets is not downloaded")
+    parser.add_argument('--problem-columns',
+                        help=f"comma-separated Problems sheet columns: {', '.join(PROBLEM_COLUMNS)} (default: all)")
+    parser.add_argument('--breakdown-tags',
+                        help="comma-separated tag names whose values get their own rows in the SLA by dimension "
+                             "sheet, next to the host groups")
+    parser.add_argument('--business-hours',
+                        help="count SLA ack times only within these working hours, e.g. 08:00-12:00,13:00-18:00")
+    parser.add_argument('--business-days', default='0,1,2,3,4',
+                        help="working weekdays with --business-hours, 0 = Monday (default: %(default)s)")
+    parser.add_argument('--holidays', help="comma-separated non-working dates (YYYY-MM-DD) with --business-hours")
+    parser.add_argument('--business-timezone',
+                        help="IANA timezone of the working hours (default: the report timezone)")
+    parser.add_argument('--languages',
+                        help=f"comma-separated report languages: {', '.join(LANGUAGES)} (default: system language); "
+                             "one report is written per language from a single fetch")
+    parser.add_argument('--workers', type=int, default=DEFAULT_FETCH_WORKERS, dest='fetch_workers',
+                        help="parallel API requests per server, shared by the processes of a multi-period "
+                             "report (default: %(default)s)")
+    parser.add_argument('--timezone', help="IANA timezone for report dates (default: system timezone)")
+    parser.add_argument('--refresh-cache', action='store_true', help="ignore the local cache for this run")
+    parser.add_argument('--no-cache', action='store_true', help="do not read or write the local cache")
+    parser.add_argument('--incremental', action='store_true',
+                        help="keep the period's events in the local cache and, on the next run, fetch only new "
+                             "events and re-check the problems still open")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="only print the report path or the error (no progress or API warnings)")
+    return parser
+
+
+def _read_token(token_file: Path) -> str:
+    if str(token_file) == '-':
+        return sys.stdin.readline().strip()
+    return token_file.read_text(encoding='utf-8').strip()
+
+
+def _read_servers(servers_file: Path) -> list[dict]:
+    """Reads the --servers-file list; token_file entries are relative to the servers file."""
+    servers = json.loads(servers_file.read_text(encoding='utf-8'))
+    if not isinstance(servers, list) or not all(isinstance(server, dict) for server in servers):
+        raise ValueError("expected a JSON list of objects")
+    for server in servers:
+        if not server.get('token') and server.get('token_file'):
+            server['token'] = _read_token(servers_file.parent / server.pop('token_file'))
+    return servers
+
+
+def build_config(args, parser) -> dict:
+    """Validates the parsed arguments the same way the GUI does and returns the engine config."""
+    servers = None
+    if args.servers_file:
+        try:
+            servers = _read_servers(args.servers_file)
+        except (OSError, ValueError) as e:
+            parser.error(get_string('invalid_servers', error=e))
+        if not servers:
+            parser.error(get_string('invalid_servers', error=get_string('url_token_empty')))
+        try:
+            report_servers(servers)
+        except ValueError as e:
+            parser.error(str(e))
+        args.url = servers[0].get('url')
+        token = servers[0].get('token')
+    elif args.token_file is None:
+        parser.error(get_string('url_token_empty'))
+    else:
+        try:
+            token = _read_token(args.token_file)
+        except OSError as e:
+            parser.error(str(e))
+    for url, server_token in ([(server.get('url'), server.get('token')) for server in servers] if servers
+                              else [(args.url, token)]):
+        if not url or not server_token:
+            parser.error(get_string('url_token_empty'))
+        if not url.startswith(('http://', 'https://')):
+            parser.error(get_string('url_invalid'))
+    severities = [code.strip() for code in args.severities.split(',') if code.strip()]
+    if not severities or any(code not in SEVERITY_MAP for code in severities):
+        parser.error(get_string('no_severity_selected'))
+    output_formats = [fmt.strip().lower() for fmt in args.output_formats.split(',') if fmt.strip()]
+    if not output_formats:
+        parser.error(get_string('no_output_format_selected'))
+    unknown = [fmt for fmt in output_formats if fmt not in OUTPUT_FORMATS]
+    if unknown:
+        parser.error(get_string('unknown_output_format', formats=', '.join(unknown)))
+    if 'parquet' in output_formats and importlib.util.find_spec('pyarrow') is None:
+        parser.error(get_string('parquet_unavailable'))
+    sheets = [sheet.strip() for sheet in (args.sheets or '').split(',') if sheet.strip()]
+    unknown = [sheet for sheet in sheets if sheet not in REPORT_SHEETS]
+    if unknown:
+        parser.error(get_string('unknown_report_sheet', sheets=', '.join(unknown), choices=', '.join(REPORT_SHEETS)))
+    problem_columns = [col.strip() for col in (args.problem_columns or '').split(',') if col.strip()]
+    unknown = [col for col in problem_columns if col not in PROBLEM_COLUMNS]
+    if unknown:
+        parser.error(get_string('unknown_problem_column', columns=', '.join(unknown),
+                                choices=', '.join(PROBLEM_COLUMNS)))
+    languages = [lang.strip() for lang in (args.languages or '').split(',') if lang.strip()]
+    unknown = [lang for lang in languages if lang not in LANGUAGES]
+    if unknown:
+        parser.error(get_string('unknown_language', languages=', '.join(unknown), choices=', '.join(LANGUAGES)))
+    if args.timezone:
+        try:
+            ZoneInfo(args.timezone)
+        except (ZoneInfoNotFoundError, ValueError) as e:
+            parser.error(str(e))
+    business_hours = None
+    if args.business_hours:
+        business_hours = {'hours': [hours.strip() for hours in args.business_hours.split(',') if hours.strip()],
+                          'holidays': [day.strip() for day in (args.holidays or '').split(',') if day.strip()],
+                          'timezone': args.business_timezone}
+        try:
+            business_hours['weekdays'] = [int(day) for day in args.business_days.split(',') if day.strip()]
+            BusinessCalendar.from_config(business_hours, ZoneInfo(args.business_timezone)
+                                         if args.business_timezone else None)
+        except (ValueError, ZoneInfoNotFoundError) as e:
+            parser.error(get_string('invalid_business_hours', error=e))
+    if args.date_from:
+        date_from, date_till = args.date_from, args.date_till or args.date_from
+    else:
+        if args.months < 1:
+            parser.error("--months must be at least 1")
+        last_year, last_month = divmod(args.year * 12 + args.month - 1 + args.months - 1, 12)
+        date_from = date(args.year, args.month, 1)
+        date_till = date(last_year, last_month + 1, calendar.monthrange(last_year, last_month + 1)[1])
+    if date_till < date_from:
+        parser.error("--till must not be before --from")
+    try:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        parser.error(get_string('cannot_access_output_dir', error=e))
+
+    return {'url': args.url, 'token': token, 'year': args.year, 'month': args.month,
+            'date_from': date_from, 'date_till': date_till, 'period_workers': args.period_workers,
+            'sla_threshold': args.sla_threshold, 'severities': severities, 'output_dir': args.output_dir,
+            'output_formats': output_formats, 'sheets': sheets or None, 'problem_columns': problem_columns or None,
+            'languages': languages or None, 'business_hours': business_hours,
+            'breakdown_tags': [tag.strip() for tag in (args.breakdown_tags or '').split(',') if tag.strip()],
+            'fetch_workers': args.fetch_workers, 'timezone': args.timezone,
+            'cache_refresh': args.refresh_cache, 'cache_enabled': not args.no_cache,
+            'incremental': args.incremental, 'servers': servers}
+
+
+def main(argv=None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    config = build_config(args, parser)
+
+    if args.quiet:
+        # Avisos de novas tentativas da API (logging.warning) também iriam para o stderr
+        logging.getLogger().setLevel(logging.ERROR)
+    engine = ReportGenerator(config)
+    if not args.quiet:
+        engine.progress.connect(lambda message: print(
+            f"{datetime.now().strftime(get_string('log_timestamp_format'))} {message}", file=sys.stderr, flush=True))
+
+    try:
+        outfile = engine.generate()
+    except NoReportData as e:
+        print(e, file=sys.stderr)
+        return EXIT_NO_DATA
+    except ZabbixAPIError as e:
+        print(f"{get_string('log_error_prefix')} {describe_error(e)}", file=sys.stderr)
+        return EXIT_AUTH_ERROR if is_auth_error(e) else EXIT_API_ERROR
+    except ZabbixConnectionError as e:
+        print(f"{get_string('log_error_prefix')} {e}", file=sys.stderr)
+        return EXIT_CONNECTION_ERROR
+    except Exception as e:
+        logging.error(f"Ocorreu um erro inesperado: {e}", exc_info=True)
+        print(f"{get_string('log_error_prefix')} {describe_error(e)}", file=sys.stderr)
+        return EXIT_FAILURE
+
+    print(outfile)
+    return EXIT_OK
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,417 +1,1883 @@
 # report_logic.py
 import calendar
+import importlib.util
+import json
 import logging
+import multiprocessing
+import os
+import re
+import sqlite3
+import threading
 import time
-from datetime import datetime, timezone, timedelta
+from array import array
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from datetime import date, datetime, time as dt_time, timezone, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 import numpy as np
 import pandas as pd
 import requests
-from PyQt6.QtCore import QObject, pyqtSignal
 from requests.exceptions import RequestException
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
 
-from translations import get_string
+from business_calendar import BusinessCalendar
+from event_cache import (DEFAULT_CACHE_MAX_MB, DEFAULT_CHECKPOINT_KEEP, DEFAULT_NAME_MAX_ENTRIES,
+                         DEFAULT_NAME_TTL_HOURS, EventCache, make_query_key)
+from json_stream import JsonRpcErrorResponse
+from quantile_sketch import RELATIVE_ACCURACY, QuantileSketches
+from run_metrics import RunMetrics
+from translations import LANGUAGES, current_language, get_string, translate
+from zabbix_api import (DEFAULT_API_RATE_LIMIT, DEFAULT_API_RETRIES, DEFAULT_API_TIMEOUT, LimiterManager,
+                        ZabbixTransport)
+from xlsx_stream import EXCEL_MAX_DATA_ROWS, column_width, excel_sheet_parts, stream_dataframe, stream_formats
 
 # --- CONFIGURAÇÕES E EXCEÇÕES CUSTOMIZADAS ---
 VERIFY_SSL = False
 if not VERIFY_SSL:
     requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
+# Número padrão de janelas de eventos buscadas em paralelo
+DEFAULT_FETCH_WORKERS = 4
+# Janelas com mais eventos que isso são divididas ao meio; cada janela é paginada por eventid
+MAX_WINDOW_EVENTS = 20000
+EVENT_PAGE_SIZE = 5000
+MIN_WINDOW_SECONDS = 60
+# IDs por requisição nas consultas de dados relacionados, por tipo (host.get e user.get devolvem objetos maiores)
+RELATED_CHUNK_SIZES = {'recovery': 2000, 'host': 1000, 'user': 500, 'host_records': 1000}
+# IDs por requisição ao reconsultar, no modo incremental, os problemas abertos ou recentes
+RECHECK_CHUNK_SIZE = 1000
+# Eventos recentes também são reconsultados no modo incremental, mesmo já recuperados: reconhecimentos
+# e comentários costumam chegar nas horas seguintes ao problema (config 'incremental_recheck_hours')
+DEFAULT_RECHECK_HOURS = 24
+# Versão do formato dos registros guardados no cache (muda quando EventColumnBuilder.record muda)
+CACHE_RECORD_FORMAT = 2
+# A partir deste total de linhas o Excel é gravado em modo constant_memory (config 'xlsx_streaming': 'auto')
+XLSX_STREAMING_MIN_ROWS = 200000
+# Saídas disponíveis (config 'output_formats'): planilha formatada e exportações de dados brutos por aba
+OUTPUT_FORMATS = ('xlsx', 'parquet', 'csv')
+# Abas de dados do relatório (config 'sheets', padrão: todas) e o que cada uma usa de event.get além dos
+# campos básicos (eventid, clock, severity, name, r_eventid, acknowledged e hosts). As abas de SLA e a
+# produtividade dependem do primeiro reconhecimento de cada evento; volume diário e top 10 contam todos os
+# problemas e usam só os campos básicos.
+REPORT_SHEETS = {
+    'problems': (), 'actions': ('acknowledges',),
+    'sla_details': ('first_ack',), 'daily_sla': ('first_ack',), 'daily_volume': (),
+    'top_10': (), 'user_productivity': ('first_ack',), 'period_sla': ('first_ack',),
+    'sla_breakdown': ('first_ack',), 'percentiles': ('first_ack',), 'server_sla': ('first_ack',),
+}
+# Colunas da aba Problems (config 'problem_columns', padrão: todas); algumas exigem dados extras
+PROBLEM_COLUMNS = ('Time', 'Severity', 'Recovery Time', 'Status', 'Host', 'Problem', 'Duration', 'Ack', 'Actions',
+                   'Tags')
+PROBLEM_COLUMN_FIELDS = {'Actions': 'alerts', 'Tags': 'tags'}
+# Percentis dos tempos de reconhecimento e de resolução na aba de percentis
+PERCENTILES = (50, 90, 99)
+# Seleções de event.get de cada dado extra, na ordem de aplicação (acknowledges amplia first_ack)
+EVENT_FIELD_SELECTS = {
+    'tags': {'selectTags': ['tag', 'value']},
+    'alerts': {'select_alerts': 'count'},
+    'first_ack': {'select_acknowledges': ['clock', 'userid']},
+    'acknowledges': {'select_acknowledges': ['clock', 'userid', 'action', 'message']},
+}
+
 
 # Exceção customizada para identificar erros da API
 class ZabbixAPIError(Exception):
     pass
 
 
-# Mapas de tradução (gerados dinamicamente no início da execução)
-ACK_ACTION_MAP = {
-    '1': get_string('ack_close_problem'), '2': get_string('ack_acknowledge_event'),
-    '4': get_string('ack_add_comment'), '8': get_string('ack_change_severity')
-}
-SEVERITY_MAP = {
-    '0': get_string('sev_not_classified'), '1': get_string('sev_information'),
-    '2': get_string('sev_warning'), '3': get_string('sev_average'),
-    '4': get_string('sev_high'), '5': get_string('sev_disaster')
-}
+# Falha de rede/HTTP ao chamar a API (nenhuma resposta JSON-RPC foi obtida)
+class ZabbixConnectionError(Exception):
+    pass
 
 
-class ReportGenerator(QObject):
-    progress = pyqtSignal(str)
-    finished = pyqtSignal(str)
-    error = pyqtSignal(str)
+# O período não tem eventos/dados para gerar um relatório (não é um erro)
+class NoReportData(Exception):
+    pass
 
-    def __init__(self, config):
-        super().__init__()
-        self.config = config
-        self.api_session = requests.Session()
-        self.api_session.headers.update({'Content-Type': 'application/json'})
 
-    def run(self):
-        """Método de execução principal com tratamento de erro aprimorado."""
-        try:
-            self.progress.emit(get_string('log_starting'))
-            start_time = time.time()
+def is_auth_error(error: Exception) -> bool:
+    return isinstance(error, ZabbixAPIError) and (
+            "Session terminated" in str(error) or "Not authorised" in str(error))
 
-            problem_events = self._fetch_all_events()
-            if not problem_events:
-                self.finished.emit(get_string('log_no_events'))
-                return
 
-            self.progress.emit(get_string('log_events_found', count=len(problem_events)))
+def describe_error(error: Exception) -> str:
+    """Turns an exception raised by ReportGenerator.generate() into the message shown to the user."""
+    if is_auth_error(error):
+        return get_string('zabbix_auth_error_friendly')
+    if isinstance(error, ZabbixAPIError):
+        return get_string('zabbix_generic_api_error', details=str(error))
+    return get_string('unexpected_error_details', error=error)
 
-            related_data = self._fetch_related_data(problem_events)
-            problem_rows, ack_rows = self._process_events_to_rows(problem_events, related_data)
 
-            df_problems = pd.DataFrame(problem_rows)
-            df_acks = pd.DataFrame(ack_rows)
+class Signal:
+    """Plain-Python replacement for pyqtSignal: callbacks registered with connect() run on emit()."""
 
-            self.progress.emit(get_string('log_preparing_data'))
-            df_problems_naive, df_acks_naive = self._prepare_dataframes(df_problems, df_acks)
+    def __init__(self):
+        self._slots = []
 
-            all_report_data = self._generate_sla_reports(df_problems_naive)
-            final_data_sheets = self._build_final_sheets(df_problems_naive, df_acks_naive, all_report_data)
+    def connect(self, slot):
+        self._slots.append(slot)
 
-            if not final_data_sheets:
-                self.finished.emit(get_string('log_no_data'))
-                return
+    def emit(self, *args):
+        for slot in list(self._slots):
+            slot(*args)
 
-            self.progress.emit(get_string('log_saving_report'))
-            outfile_consolidated = self._save_report(final_data_sheets, all_report_data)
-            self.progress.emit(get_string('log_report_saved', outfile=outfile_consolidated))
 
-            end_time = time.time()
-            self.progress.emit(get_string('log_process_complete', seconds=end_time - start_time))
-            self.finished.emit(get_string('log_success_message', path=self.config['output_dir']))
+# Os dados processados guardam códigos e chaves de tradução neutros; o texto no idioma de cada
+# relatório só é aplicado em _build_final_sheets e no gravador (config 'languages')
+ACK_ACTION_KEYS = {
+    '1': 'ack_close_problem', '2': 'ack_acknowledge_event', '4': 'ack_add_comment', '8': 'ack_change_severity'
+}
+SEVERITY_KEYS = {
+    '0': 'sev_not_classified', '1': 'sev_information', '2': 'sev_warning',
+    '3': 'sev_average', '4': 'sev_high', '5': 'sev_disaster'
+}
+# Nomes das severidades no idioma da interface (filtros da GUI e da CLI)
+SEVERITY_MAP = {code: get_string(key) for code, key in SEVERITY_KEYS.items()}
+# Separa os itens das listas nos dados neutros (pares tag=valor, grupos de hosts); nas tags é trocado
+# pelo 'tag_separator' do idioma ao montar as abas
+NEUTRAL_TAG_SEPARATOR = '\x1f'
+
+
+def clocks_to_local(clocks: np.ndarray, tz=None) -> np.ndarray:
+    """Converts Unix clocks to naive datetime64[ns] wall-clock times in tz (None = system zone).
+
+    UTC offsets only change on quarter-hour boundaries, so the offset is resolved once per
+    distinct 15-minute bucket instead of once per timestamp. Negative clocks become NaT.
+    """
+    clocks = np.asarray(clocks, dtype=np.int64)
+    valid = clocks >= 0
+    unique_buckets, inverse = np.unique(clocks[valid] // 900, return_inverse=True)
+    offsets = np.array([datetime.fromtimestamp(int(bucket) * 900, tz=timezone.utc).astimezone(tz)
+                        .utcoffset().total_seconds() for bucket in unique_buckets], dtype=np.int64)
+    local = np.full(len(clocks), np.datetime64('NaT'), dtype='datetime64[ns]')
+    local[valid] = (clocks[valid] + offsets[inverse.reshape(-1)]).astype('datetime64[s]')
+    return local
+
+
+def _as_date(value) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+def report_periods(config: dict) -> list[tuple[date, date]]:
+    """Splits the configured report range into calendar-month periods (partial at the edges).
+
+    The range comes from 'date_from'/'date_till' when given, otherwise from 'year'/'month'.
+    """
+    if config.get('date_from'):
+        date_from = _as_date(config['date_from'])
+        date_till = _as_date(config.get('date_till') or date_from)
+    else:
+        year, month = config['year'], config['month']
+        date_from = date(year, month, 1)
+        date_till = date(year, month, calendar.monthrange(year, month)[1])
+    if date_till < date_from:
+        raise ValueError(f"date_till ({date_till}) is before date_from ({date_from})")
+
+    periods = []
+    period_start = date_from
+    while period_start <= date_till:
+        month_end = date(period_start.year, period_start.month,
+                         calendar.monthrange(period_start.year, period_start.month)[1])
+        periods.append((period_start, min(month_end, date_till)))
+        period_start = month_end + timedelta(days=1)
+    return periods
+
+
+def period_label(period: tuple[date, date]) -> str:
+    period_start, period_end = period
+    if period_start.day == 1 and (period_end + timedelta(days=1)).day == 1 \
+            and (period_start.year, period_start.month) == (period_end.year, period_end.month):
+        return period_start.strftime('%Y-%m')
+    return f"{period_start:%Y-%m-%d} – {period_end:%Y-%m-%d}"
+
+
+def concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenates per-period frames, rebuilding Categoricals with the merged sorted categories."""
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    combined = pd.concat(frames, ignore_index=True)
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype) and not isinstance(combined[col].dtype,
+                                                                                     pd.CategoricalDtype):
+            combined[col] = combined[col].astype('category')
+    return combined
+
+
+def report_servers(servers: list[dict]) -> list[dict]:
+    """Checks config 'servers' ({'name', 'url', 'token'} each); the name defaults to the URL host name."""
+    checked = []
+    for server in servers:
+        if not server.get('url') or not server.get('token'):
+            raise ValueError(get_string('invalid_servers', error=get_string('url_token_empty')))
+        checked.append({'name': server.get('name') or urlsplit(server['url']).hostname or server['url'],
+                        'url': server['url'], 'token': server['token']})
+    names = [server['name'] for server in checked]
+    duplicated = sorted({name for name in names if names.count(name) > 1})
+    if duplicated:
+        raise ValueError(get_string('invalid_servers', error=get_string('duplicate_server_names',
+                                                                         names=', '.join(duplicated))))
+    return checked
+
+
+def _init_period_worker(log_level: int):
+    """Worker-process initializer: spawned workers start with a fresh root logger, so the level is copied over."""
+    logging.getLogger().setLevel(log_level)
+
+
+def _run_period_pipeline(config: dict, progress_queue, label: str, limiter=None):
+    """Worker-process entry point: collects one period of one server and relays its progress through a queue."""
+    engine = ReportGenerator(config, limiter=limiter)
+    engine.progress.connect(lambda message: progress_queue.put(f"[{label}] {message}"))
+    try:
+        return engine.collect_period(), engine.metrics.as_dict()
+    except (ZabbixAPIError, ZabbixConnectionError) as e:
+        # Em relatórios com vários servidores o erro precisa dizer de qual servidor veio
+        if config.get('server_name'):
+            raise type(e)(f"[{config['server_name']}] {e}") from e
+        raise
+    finally:
+        engine.metrics.close()
+
+
+def categorical_values(keys, mapper) -> pd.Categorical:
+    """Applies mapper once per distinct key and returns the labels as a Categorical.
+
+    Categories are sorted the same way plain strings would be, so groupby and sort results
+    do not change; keys mapped to None become missing values.
+    """
+    if isinstance(keys, np.ndarray):
+        distinct, key_codes = np.unique(keys, return_inverse=True)
+        distinct, key_codes = distinct.tolist(), key_codes.reshape(-1)
+    else:
+        positions = {}
+        key_codes = np.fromiter((positions.setdefault(key, len(positions)) for key in keys),
+                                dtype=np.int64, count=len(keys))
+        distinct = list(positions)
+    labels = [mapper(key) for key in distinct]
+    categories = sorted({label for label in labels if label is not None})
+    label_codes = {label: code for code, label in enumerate(categories)}
+    remap = np.array([label_codes[label] if label is not None else -1 for label in labels], dtype=np.int32)
+    return pd.Categorical.from_codes(remap[key_codes] if len(remap) else np.empty(0, np.int32),
+                                     categories=categories)
+
+
+def relabel_categorical(values: pd.Series, mapper, missing_label=None) -> pd.Categorical:
+    """Applies mapper once per category of a categorical Series (e.g. to translate neutral codes).
+
+    Categories mapped to the same label are merged and sorted as in categorical_values;
+    missing values become missing_label when one is given.
+    """
+    codes = values.cat.codes.to_numpy()
+    labels = [mapper(category) for category in values.cat.categories]
+    if missing_label is not None:
+        codes = np.where(codes < 0, len(labels), codes)
+        labels.append(missing_label)
+    table = categorical_values(np.arange(len(labels)), labels.__getitem__)
+    return pd.Categorical.from_codes(np.where(codes >= 0, table.codes[codes], -1) if len(codes) else codes,
+                                     categories=table.categories)
+
+
+def category_memberships(values: pd.Categorical, labels_of, labels: dict) -> tuple[np.ndarray, np.ndarray]:
+    """(row, label code) of every label of every row, for labels_of mapping a category to its labels.
+
+    labels_of runs once per category and its labels are numbered in labels (label -> code),
+    so rows with many labels (host groups, tags) are expanded without a Python loop per row.
+    """
+    flat, starts, counts = [], [], []
+    for category in values.categories:
+        category_labels = [labels.setdefault(label, len(labels)) for label in labels_of(category)]
+        starts.append(len(flat))
+        counts.append(len(category_labels))
+        flat.extend(category_labels)
+    codes = values.codes
+    rows = np.flatnonzero(codes >= 0)
+    lengths = np.asarray(counts, dtype=np.int64)[codes[rows]]
+    first = np.repeat(np.asarray(starts, dtype=np.int64)[codes[rows]] - np.cumsum(lengths) + lengths, lengths)
+    label_codes = np.asarray(flat, dtype=np.int64)[first + np.arange(lengths.sum())] if flat else np.empty(0, np.int64)
+    return np.repeat(rows, lengths), label_codes
+
+
+class EventColumnBuilder:
+    """Accumulates event.get results column by column while they are being downloaded.
+
+    Integer fields go into compact arrays and repeated strings (problem names, IDs, tags)
+    are interned, so each distinct value is stored once. Several fetch threads may add
+    events at the same time; the acknowledges of one event are always contiguous.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._interned = {}
+        self.eventid, self.clock, self.r_eventid = array('q'), array('q'), array('q')
+        self.severity, self.acknowledged, self.alerts = array('b'), array('b'), array('q')
+        self.hostids, self.name, self.tags = [], [], []
+        self.ack_start = array('q')
+        self.ack_clock, self.ack_action = array('q'), array('q')
+        self.ack_userid, self.ack_message = [], []
+        self.r_eventids, self.all_hostids, self.userids = set(), set(), set()
+        self._r_eventid_log = []
+
+    def __len__(self):
+        return len(self.eventid)
+
+    def _intern(self, value):
+        return self._interned.setdefault(value, value)
+
+    @staticmethod
+    def record_from_event(event: dict) -> list:
+        """Reduces a raw event.get item to the compact record the report needs."""
+        return [
+            int(event['eventid']), int(event['clock']), int(event.get('severity', '0')),
+            int(event.get('r_eventid') or 0), [h['hostid'] for h in event.get('hosts') or []],
+            event.get('name', ''), event.get('acknowledged') == '1', int(event.get('alerts', 0)),
+            [[t['tag'], t['value']] for t in event.get('tags') or []],
+            [[int(a['clock']), a['userid'], int(a.get('action', '0')), a.get('message', '')]
+             for a in event.get('acknowledges') or []]
+        ]
+
+    def add_event(self, event: dict):
+        self.add_record(self.record_from_event(event))
+
+    def add_record(self, record: list):
+        eventid, clock, severity, r_eventid, hostids, name, acknowledged, alerts, tags, acks = record
+        with self._lock:
+            self.eventid.append(eventid)
+            self.clock.append(clock)
+            self.severity.append(severity)
+            self.r_eventid.append(r_eventid)
+            self.hostids.append(self._intern(tuple(self._intern(h) for h in hostids)))
+            self.name.append(self._intern(name))
+            self.acknowledged.append(acknowledged)
+            self.alerts.append(alerts)
+            self.tags.append(self._intern(tuple(self._intern((tag, value)) for tag, value in tags)))
+            self.ack_start.append(len(self.ack_clock))
+            for ack_clock, userid, action, message in acks:
+                self.ack_clock.append(ack_clock)
+                self.ack_userid.append(self._intern(userid))
+                self.ack_action.append(action)
+                self.ack_message.append(self._intern(message))
+                self.userids.add(userid)
+            if r_eventid and str(r_eventid) not in self.r_eventids:
+                self.r_eventids.add(str(r_eventid))
+                self._r_eventid_log.append(str(r_eventid))
+            self.all_hostids.update(hostids)
+
+    def r_eventids_since(self, position: int) -> tuple[list, int]:
+        """Recovery eventids first seen after position (in arrival order) and the new position."""
+        with self._lock:
+            return self._r_eventid_log[position:], len(self._r_eventid_log)
+
+    def ack_range(self, idx: int) -> range:
+        end = self.ack_start[idx + 1] if idx + 1 < len(self.ack_start) else len(self.ack_clock)
+        return range(self.ack_start[idx], end)
+
+    def record(self, idx: int) -> list:
+        """Rebuilds the compact record of one event (the format stored in the local cache)."""
+        return [
+            self.eventid[idx], self.clock[idx], self.severity[idx], self.r_eventid[idx],
+            list(self.hostids[idx]), self.name[idx], bool(self.acknowledged[idx]), self.alerts[idx],
+            [list(tag) for tag in self.tags[idx]],
+            [[self.ack_clock[a], self.ack_userid[a], self.ack_action[a], self.ack_message[a]]
+             for a in self.ack_range(idx)]
+        ]
+
+    def sorted_indices(self) -> np.ndarray:
+        """Event positions ordered by clock/eventid, without duplicated eventids."""
+        eventids = np.frombuffer(self.eventid, dtype=np.int64) if len(self) else np.empty(0, np.int64)
+        clocks = np.frombuffer(self.clock, dtype=np.int64) if len(self) else np.empty(0, np.int64)
+        order = np.lexsort((eventids, clocks))
+        ordered_ids = eventids[order]
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = ordered_ids[1:] != ordered_ids[:-1]
+        return order[keep]
+
+
+class RelatedLookup:
+    """Resolves IDs of one kind (recoveries, hosts or users) in chunks on a shared worker pool.
+
+    IDs can be requested in several rounds while other work is still running; full
+    chunks are submitted right away and the remainder when result() is called.
+    """
+
+    def __init__(self, pool, fetch_chunk, chunk_size: int, cached_values=None):
+        self.pool = pool
+        self.fetch_chunk = fetch_chunk
+        self.chunk_size = chunk_size
+        self.cached_values = cached_values
+        self.values, self.fetched = {}, {}
+        self.hits, self.missing = 0, 0
+        self._seen = set()
+        self._pending = []
+        self._futures = []
+
+    def request(self, keys):
+        keys = [key for key in dict.fromkeys(keys) if key not in self._seen]
+        if not keys:
+            return
+        self._seen.update(keys)
+        if self.cached_values:
+            found = self.cached_values(keys)
+            self.hits += len(found)
+            self.values.update(found)
+            keys = [key for key in keys if key not in self.values]
+        self.missing += len(keys)
+        self._pending.extend(keys)
+        self._submit(final=False)
+
+    def _submit(self, final: bool):
+        while len(self._pending) >= self.chunk_size or (final and self._pending):
+            chunk, self._pending = self._pending[:self.chunk_size], self._pending[self.chunk_size:]
+            self._futures.append(self.pool.submit(self.fetch_chunk, chunk))
+
+    def result(self) -> dict:
+        """Waits for every submitted chunk and returns all values, cached and fetched."""
+        self._submit(final=True)
+        try:
+            for future in self._futures:
+                self.fetched.update(future.result())
+        except Exception:
+            for future in self._futures:
+                future.cancel()
+            raise
+        self.values.update(self.fetched)
+        return self.values
+
+
+class ReportGenerator:
+    """Headless report engine: fetch, process, SLA analysis and save, without any Qt dependency.
+
+    Progress and outcome are published through the progress/finished/error Signal
+    attributes; callers that prefer exceptions can use generate() directly.
+    """
+
+    def __init__(self, config, limiter=None):
+        self.servers = report_servers(config.get('servers')) if config.get('servers') else [
+            {'name': None, 'url': config['url'], 'token': config['token']}]
+        if config.get('servers'):
+            # Transporte e cache do processo principal usam o primeiro servidor; cada um é coletado com o seu
+            config = dict(config, url=self.servers[0]['url'], token=self.servers[0]['token'])
+        self.config = config
+        self.progress = Signal()
+        self.finished = Signal()
+        self.error = Signal()
+        self.periods = report_periods(config)
+        self.period = (self.periods[0][0], self.periods[-1][1])
+        self.report_sheets, self.problem_columns = self._report_layout()
+        self.languages = self._report_languages()
+        # Chaves de tag e grupos de hosts da aba de SLA por dimensão (config 'breakdown_tags')
+        self.breakdown_tags = list(dict.fromkeys(config.get('breakdown_tags') or []))
+        self.host_groups = bool({'sla_breakdown', 'percentiles'} & set(self.report_sheets))
+        self.event_fields = self._event_fields()
+        self.fetch_workers = max(1, int(config.get('fetch_workers', DEFAULT_FETCH_WORKERS)))
+        self.metrics = RunMetrics()
+        self.max_window_events = int(config.get('max_window_events', MAX_WINDOW_EVENTS))
+        self.event_page_size = int(config.get('event_page_size', EVENT_PAGE_SIZE))
+        self.transport = ZabbixTransport(
+            config['url'], config['token'], pool_size=int(config.get('api_pool_size') or self.fetch_workers),
+            retries=int(config.get('api_retries', DEFAULT_API_RETRIES)),
+            rate_limit=float(config.get('api_rate_limit', DEFAULT_API_RATE_LIMIT)),
+            timeout=float(config.get('api_timeout', DEFAULT_API_TIMEOUT)), verify=VERIFY_SSL,
+            on_retry=self._on_api_retry, metrics=self.metrics, limiter=limiter)
+        self.event_cache = None
+        # Fuso horário das colunas de data do relatório (None = fuso do sistema)
+        self.report_tz = ZoneInfo(config['timezone']) if config.get('timezone') else None
+        # Expediente das equipes (config 'business_hours'): o tempo até o reconhecimento conta só horas úteis
+        self.business_calendar = self._business_calendar()
+        self._fetched_days = []
+        # Dias que não mudam mais (vindos do cache ou gravados nele): os sketches deles também são guardados
+        self._closed_days = set()
+        # Modo incremental (config 'incremental'): checkpoint carregado, quantos eventos vieram dele
+        # sem alteração e o menor eventid que ainda precisa ser buscado
+        self._checkpoint = None
+        self._checkpoint_loaded = 0
+        self._min_eventid = None
+        # (name, surname, alias) dos usuários citados nos dados neutros, formatados por idioma ao montar as abas
+        self.user_records = {}
+        # Sketches por dia dos tempos de reconhecimento/resolução ('ack'/'resolution'), somados entre períodos
+        self.duration_sketches = {}
+
+    def _report_layout(self) -> tuple[list[str], list[str]]:
+        """Returns the configured sheets and Problems columns (default: all), checking their names."""
+        sheets = list(self.config.get('sheets') or REPORT_SHEETS)
+        unknown = [sheet for sheet in sheets if sheet not in REPORT_SHEETS]
+        if unknown:
+            raise ValueError(get_string('unknown_report_sheet', sheets=', '.join(unknown),
+                                        choices=', '.join(REPORT_SHEETS)))
+        columns = list(self.config.get('problem_columns') or PROBLEM_COLUMNS)
+        unknown = [col for col in columns if col not in PROBLEM_COLUMNS]
+        if unknown:
+            raise ValueError(get_string('unknown_problem_column', columns=', '.join(unknown),
+                                        choices=', '.join(PROBLEM_COLUMNS)))
+        return sheets, columns
+
+    def _report_languages(self) -> list[str]:
+        """Returns the configured report languages (default: the system language), checking them."""
+        languages = list(dict.fromkeys(self.config.get('languages') or [current_language()]))
+        unknown = [lang for lang in languages if lang not in LANGUAGES]
+        if unknown:
+            raise ValueError(get_string('unknown_language', languages=', '.join(unknown),
+                                        choices=', '.join(LANGUAGES)))
+        return languages
+
+    def _business_calendar(self) -> BusinessCalendar | None:
+        """Calendar of config 'business_hours' (hours, weekdays, holidays, timezone), or None for wall-clock SLA."""
+        settings = self.config.get('business_hours')
+        if not settings:
+            return None
+        try:
+            timezone = ZoneInfo(settings['timezone']) if settings.get('timezone') else self.report_tz
+            return BusinessCalendar.from_config(settings, timezone)
+        except (ValueError, KeyError, ZoneInfoNotFoundError) as e:
+            raise ValueError(get_string('invalid_business_hours', error=e))
+
+    def _event_fields(self) -> set[str]:
+        """Extra event.get data (keys of EVENT_FIELD_SELECTS) used by the configured sheets and columns."""
+        fields = set()
+        for sheet in self.report_sheets:
+            fields.update(REPORT_SHEETS[sheet])
+        if 'problems' in self.report_sheets:
+            fields.update(PROBLEM_COLUMN_FIELDS[col] for col in self.problem_columns if col in PROBLEM_COLUMN_FIELDS)
+        if 'sla_breakdown' in self.report_sheets and self.breakdown_tags:
+            fields.add('tags')
+        return fields
+
+    def _event_projection(self) -> dict:
+        """event.get output/select* parameters for event_fields; unused selections are not requested at all."""
+        params = {'output': ['eventid', 'clock', 'severity', 'name', 'r_eventid', 'acknowledged'],
+                  'selectHosts': ['hostid']}
+        for field, selects in EVENT_FIELD_SELECTS.items():
+            if field in self.event_fields:
+                params.update(selects)
+        return params
 
+    def run(self):
+        """Método de execução principal: reporta o resultado pelos sinais finished/error."""
+        try:
+            self.generate()
+            self.finished.emit(get_string('log_success_message', path=self.config['output_dir']))
+        except NoReportData as e:
+            self.finished.emit(str(e))
         except ZabbixAPIError as e:
-            error_message = str(e)
-            if "Session terminated" in error_message or "Not authorised" in error_message:
-                friendly_message = get_string('zabbix_auth_error_friendly')
-                self.error.emit(friendly_message)
-            else:
-                self.error.emit(get_string('zabbix_generic_api_error', details=error_message))
+            self.error.emit(describe_error(e))
         except Exception as e:
             logging.error(f"Ocorreu um erro inesperado: {e}", exc_info=True)
-            self.error.emit(get_string('unexpected_error_details', error=e))
+            self.error.emit(describe_error(e))
+
+    def generate(self):
+        """Runs the whole pipeline and returns the path of the saved report.
+
+        Raises NoReportData when the period has nothing to report, and ZabbixAPIError or
+        ZabbixConnectionError when the API fails.
+        """
+        self.progress.emit(get_string('log_starting'))
+        start_time = time.time()
+        # Validado antes da coleta para não perder uma busca longa por falta do pyarrow
+        output_formats = self._output_formats()
+
+        try:
+            df_problems_naive, df_acks_naive = self._collect_all_periods()
+
+            with self.metrics.stage('sla_reports') as stage:
+                stage['events'] = len(df_problems_naive)
+                all_report_data = self._generate_sla_reports(df_problems_naive)
+                if self.duration_sketches:
+                    df_percentiles = self._duration_percentiles()
+                    if not df_percentiles.empty:
+                        all_report_data['Duration Percentiles'] = df_percentiles
+
+            period_stem = f"{self._filename_period()}_{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+            outfile_consolidated = None
+            outputs = []
+            # Uma única coleta e análise; só a tradução e a gravação se repetem por idioma
+            for lang in self.languages:
+                with self.metrics.stage('final_sheets'):
+                    final_data_sheets = self._build_final_sheets(df_problems_naive, df_acks_naive, all_report_data,
+                                                                 lang)
+                if not final_data_sheets:
+                    raise NoReportData(get_string('log_no_data'))
+
+                outfile_stem = f"{translate(lang, 'report_filename_prefix')}_{period_stem}"
+                if len(self.languages) > 1:
+                    outfile_stem += f"_{lang}"
+                report_file = None
+                if 'xlsx' in output_formats:
+                    with self.metrics.stage('write_xlsx') as stage:
+                        stage['events'] = (stage['events'] or 0) + len(df_problems_naive)
+                        sheet_parts = self._plan_sheet_parts(final_data_sheets)
+                        self.progress.emit(get_string('log_saving_report'))
+                        report_file = self._save_report(final_data_sheets, all_report_data, outfile_stem, lang,
+                                                        sheet_parts)
+                    self.progress.emit(get_string('log_report_saved', outfile=report_file))
+                    outputs.append(report_file)
+                data_formats = [fmt for fmt in output_formats if fmt != 'xlsx']
+                if data_formats:
+                    with self.metrics.stage('export_data'):
+                        export_dir = self._export_data_sheets(final_data_sheets, outfile_stem, data_formats)
+                    self.progress.emit(get_string('log_data_exported', formats=', '.join(data_formats),
+                                                  path=export_dir))
+                    report_file = report_file or export_dir
+                    outputs.append(export_dir)
+                outfile_consolidated = outfile_consolidated or report_file
+
+            end_time = time.time()
+            metrics_stem = f"{translate(self.languages[0], 'report_filename_prefix')}_{period_stem}"
+            self._report_metrics(metrics_stem, end_time - start_time, len(df_problems_naive), outputs)
+        finally:
+            self.metrics.close()
+        self.progress.emit(get_string('log_process_complete', seconds=end_time - start_time))
+        return outfile_consolidated
+
+    def _report_metrics(self, outfile_stem: str, total_seconds: float, events: int, outputs: list):
+        """Logs the time, memory and API usage of each stage and saves them as <stem>.metrics.json."""
+        metrics = self.metrics.as_dict()
+        self.progress.emit(get_string('log_metrics_header'))
+        for name, stage in metrics['stages'].items():
+            peak = stage['peak_rss_bytes']
+            self.progress.emit(get_string(
+                'log_metrics_stage', stage=name, seconds=stage['seconds'],
+                rate=f"{stage['events_per_second']:,.0f}" if stage['events_per_second'] else '-',
+                peak_mb=f"{peak / 2 ** 20:,.0f}" if peak else '-'))
+        if metrics['api']:
+            self.progress.emit(get_string('log_metrics_api_header'))
+        for method, stats in metrics['api'].items():
+            self.progress.emit(get_string('log_metrics_api', method=method, calls=stats['calls'],
+                                          retries=stats['retries'], mb=stats['bytes'] / 2 ** 20,
+                                          seconds=stats['seconds']))
+        if not self.config.get('metrics_sidecar', True):
+            return
+        sidecar = self.config['output_dir'] / f"{outfile_stem}.metrics.json"
+        try:
+            self.metrics.write_json(sidecar, total_seconds=round(total_seconds, 3), events=events,
+                                    period={'from': self.period[0], 'till': self.period[1]},
+                                    fetch_workers=self.fetch_workers, outputs=[str(path) for path in outputs])
+            self.progress.emit(get_string('log_metrics_saved', path=sidecar))
+        except OSError as e:
+            logging.warning(f"Não foi possível salvar as métricas: {e}")
+
+    def _collect_all_periods(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Collects every report period of every server, in parallel worker processes when there is more than one.
+
+        With several servers each one's frames get a 'Server' column and their event and
+        user ids are prefixed with the server name, so ids repeated across servers stay apart.
+        """
+        jobs = [(server, period) for server in self.servers for period in self.periods]
+        if len(jobs) == 1:
+            collected = [self.collect_period()]
+        else:
+            with self.metrics.stage('collect_periods'):
+                collected = self._collect_periods_in_processes(jobs)
+
+        if len(self.servers) > 1:
+            collected = [self._namespace_server(frames, server['name'])
+                         for frames, (server, _) in zip(collected, jobs) if frames is not None]
+        collected = [frames for frames in collected if frames is not None]
+        if not collected:
+            raise NoReportData(get_string('log_no_events'))
+        df_problems = concat_frames([df_problems for df_problems, _, _, _ in collected])
+        df_acks = concat_frames([df_acks for _, df_acks, _, _ in collected])
+        for _, _, user_records, _ in collected:
+            self.user_records.update(user_records)
+        # Meses diferentes são combinados somando os sketches de cada dia, sem reprocessar os eventos
+        period_sketches = [sketches for _, _, _, sketches in collected if sketches]
+        for metric in ('ack', 'resolution'):
+            if period_sketches:
+                self.duration_sketches[metric] = QuantileSketches.merge([sketches[metric]
+                                                                         for sketches in period_sketches])
+        if len(self.servers) > 1:
+            self.progress.emit(get_string('log_servers_combined', servers=len(self.servers), count=len(df_problems)))
+        elif len(self.periods) > 1:
+            self.progress.emit(get_string('log_periods_combined', periods=len(collected), count=len(df_problems)))
+        return df_problems, df_acks
+
+    @staticmethod
+    def _namespace_server(frames, server_name: str):
+        """Adds the Server column to one server's collected frames and prefixes its event and user ids."""
+        df_problems, df_acks, user_records, sketches = frames
+
+        def with_server(df):
+            if df.empty:
+                return df
+            df = df.assign(**{col: df[col].cat.rename_categories(lambda userid: f"{server_name}:{userid}")
+                              for col in ('First Ack User', 'User') if col in df})
+            df.insert(0, 'Server', pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8),
+                                                             categories=[server_name]))
+            return df
+
+        df_problems = with_server(df_problems)
+        df_problems['EventID'] = (server_name + ':' + df_problems['EventID'].astype(str)).astype(object)
+        user_records = {f"{server_name}:{userid}": record for userid, record in user_records.items()}
+        return df_problems, with_server(df_acks), user_records, sketches
+
+    def _collect_periods_in_processes(self, jobs: list) -> list:
+        """Runs collect_period for each (server, period) job in a worker process and merges their metrics.
+
+        Jobs mostly wait on the network, so by default every server gets at least one process
+        of its own and the run lasts about as long as the slowest server.
+        """
+        default_workers = max(os.cpu_count() or 1, len(self.servers))
+        workers = max(1, min(len(jobs), int(self.config.get('period_workers') or default_workers)))
+        if len(self.servers) > 1:
+            self.progress.emit(get_string('log_servers_parallel', servers=len(self.servers),
+                                          periods=len(self.periods), workers=workers))
+        else:
+            self.progress.emit(get_string('log_periods_parallel', periods=len(self.periods), workers=workers))
+        # Processos que coletam o mesmo servidor dividem entre si as requisições paralelas e as conexões,
+        # e o limite de requisições por segundo é um só por servidor (TokenBucket do LimiterManager)
+        per_server = min(len(self.periods), workers)
+        pool_size = int(self.config.get('api_pool_size') or self.fetch_workers)
+        rate_limit = float(self.config.get('api_rate_limit', DEFAULT_API_RATE_LIMIT))
+        worker_config = dict(self.config, fetch_workers=max(1, self.fetch_workers // per_server),
+                             api_pool_size=max(1, pool_size // per_server), servers=None)
+        # 'spawn' em todas as plataformas: um fork com threads ativas (pool HTTP, GUI) pode travar o filho
+        context = multiprocessing.get_context('spawn')
+        with LimiterManager(ctx=context) as manager, \
+                ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_period_worker,
+                                    initargs=(logging.getLogger().level,)) as pool:
+            progress_queue = manager.Queue()
+            limiters = {server['name']: manager.TokenBucket(rate_limit, pool_size) if rate_limit > 0 else None
+                        for server in self.servers}
+            futures = []
+            for server, (period_start, period_end) in jobs:
+                job_config = dict(worker_config, url=server['url'], token=server['token'],
+                                  server_name=server['name'], date_from=period_start, date_till=period_end)
+                label = ' '.join(part for part in (server['name'], period_label((period_start, period_end))
+                                                   if len(self.periods) > 1 else None) if part)
+                futures.append(pool.submit(_run_period_pipeline, job_config, progress_queue, label,
+                                           limiters[server['name']]))
+            pending = set(futures)
+            try:
+                while pending:
+                    done, pending = wait(pending, timeout=0.2, return_when=FIRST_EXCEPTION)
+                    self._relay_progress(progress_queue)
+                    for future in done:
+                        future.result()
+            except Exception:
+                for future in pending:
+                    future.cancel()
+                raise
+            self._relay_progress(progress_queue)
+            results = [future.result() for future in futures]
+        for _, period_metrics in results:
+            self.metrics.merge(period_metrics)
+        return [frames for frames, _ in results]
+
+    def _relay_progress(self, progress_queue):
+        while not progress_queue.empty():
+            self.progress.emit(progress_queue.get())
+
+    def collect_period(self):
+        """Fetches and processes the configured period.
+
+        Returns the language-neutral (problems, actions) frames, both with a 'Period' column,
+        the user records their user columns refer to and the per-day duration sketches
+        (None without the percentiles sheet); or None when the period has no events.
+        """
+        try:
+            self._open_event_cache()
+            # Um único pool para janelas de eventos e consultas relacionadas: as recuperações
+            # já conhecidas são buscadas enquanto as janelas restantes ainda estão baixando
+            with ThreadPoolExecutor(max_workers=self.fetch_workers) as pool:
+                recoveries = self._related_lookup(pool, 'recovery')
+                with self.metrics.stage('fetch_events') as stage:
+                    problem_events = self._fetch_all_events(pool, recoveries)
+                    stage['events'] = len(problem_events)
+                if not len(problem_events):
+                    self.progress.emit(get_string('log_no_events'))
+                    return None
+
+                self.progress.emit(get_string('log_events_found', count=len(problem_events.sorted_indices())))
+
+                with self.metrics.stage('fetch_related'):
+                    related_data = self._fetch_related_data(pool, problem_events, recoveries)
+            with self.metrics.stage('build_frames') as stage:
+                stage['events'] = len(problem_events)
+                self._update_event_cache(problem_events, related_data)
+                self._store_checkpoint(problem_events, related_data)
+                df_problems, df_acks = self._build_event_frames(problem_events, related_data)
+            for df in (df_problems, df_acks):
+                if not df.empty:
+                    df['Period'] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8),
+                                                             categories=[period_label(self.period)])
+            sketches = None
+            if 'percentiles' in self.report_sheets:
+                with self.metrics.stage('duration_sketches') as stage:
+                    stage['events'] = len(df_problems)
+                    sketches = self._duration_sketches(df_problems)
+            return df_problems, df_acks, related_data[2], sketches
+        finally:
+            if self.event_cache:
+                self.event_cache.close()
+                self.event_cache = None
+
+    def _open_event_cache(self):
+        """Opens the on-disk event cache; a broken cache only disables caching for this run."""
+        if not self.config.get('cache_enabled', True):
+            return
+        try:
+            self.event_cache = EventCache(self.config.get('cache_path'),
+                                          self.config.get('cache_max_mb', DEFAULT_CACHE_MAX_MB))
+        except (OSError, sqlite3.Error) as e:
+            logging.warning(f"Cache local indisponível: {e}")
+            self.progress.emit(get_string('log_cache_unavailable', error=e))
+
+    def _cache_query_key(self) -> str:
+        query = {'severities': sorted(self.config['severities']), 'record_format': CACHE_RECORD_FORMAT}
+        # Os dias do cache são limitados no fuso do relatório; outro fuso corta os eventos em outros dias
+        query['timezone'] = self.report_tz.key if self.report_tz else '/'.join(time.tzname)
+        # Registros de uma projeção reduzida não servem para um relatório completo (e vice-versa)
+        if self.event_fields != set(EVENT_FIELD_SELECTS):
+            query['fields'] = sorted(self.event_fields)
+        return make_query_key(**query)
+
+    def _use_cached_data(self) -> bool:
+        return self.event_cache is not None and not self.config.get('cache_refresh', False)
 
     def _call_zabbix_api(self, method: str, params: dict) -> list | dict:
         """Função centralizada para chamadas à API, agora lança uma exceção customizada."""
-        payload = {'jsonrpc': '2.0', 'method': method, 'params': params, 'auth': self.config['token'], 'id': 1}
         try:
-            response = self.api_session.post(self.config['url'], json=payload, verify=VERIFY_SSL, timeout=600)
-            response.raise_for_status()
-            result = response.json()
-            if 'error' in result:
-                err_msg = result['error'].get('data', 'Unknown Zabbix API error')
-                raise ZabbixAPIError(get_string('zabbix_api_call_error', method=method, error_message=err_msg))
-            return result.get('result', [])
+            return self.transport.call(method, params)
+        except JsonRpcErrorResponse as e:
+            raise ZabbixAPIError(get_string('zabbix_api_call_error', method=method, error_message=str(e)))
         except RequestException as e:
-            raise Exception(get_string('zabbix_connection_call_error', error=e))
-
-    def _fetch_all_events(self):
-        """Fetches all primary problem events for the month."""
-        year, month = self.config['year'], self.config['month']
-        local_tz = datetime.now().astimezone().tzinfo
-        _, last_day = calendar.monthrange(year, month)
-        start_of_month = datetime(year, month, 1)
-        end_of_month = datetime(year, month, last_day)
-        all_events = []
-
-        total_days = (end_of_month - start_of_month).days + 1
-
-        self.progress.emit(get_string('log_fetching_days', start_date=start_of_month.strftime('%Y-%m-%d'),
-                                      end_date=end_of_month.strftime('%Y-%m-%d')))
-
-        for day_num in range(total_days):
-            current_day = start_of_month + timedelta(days=day_num)
-            time_from = current_day.replace(tzinfo=local_tz)
-            time_till = current_day.replace(hour=23, minute=59, second=59, tzinfo=local_tz)
-
-            self.progress.emit(get_string('log_fetching_day_progress', day_num=day_num + 1, total_days=total_days,
-                                          date=current_day.strftime('%Y-%m-%d')))
-
-            params = {
-                'output': ['eventid', 'clock', 'severity', 'name', 'r_eventid', 'acknowledged'],
-                'severities': self.config['severities'],
-                'source': 0, 'object': 0, 'value': 1,
-                'time_from': int(time_from.timestamp()),
-                'time_till': int(time_till.timestamp()),
-                'selectHosts': ['hostid'], 'selectTags': 'extend',
-                'select_alerts': 'count', 'select_acknowledges': 'extend',
-                'sortfield': ['clock', 'eventid'], 'sortorder': 'ASC'
-            }
-            daily_events = self._call_zabbix_api('event.get', params)
-            all_events.extend(daily_events)
-            time.sleep(0.1)
-        return all_events
-
-    def _chunk_list(self, data: list, size: int):
-        for i in range(0, len(data), size):
-            yield data[i:i + size]
-
-    def _fetch_related_data(self, events: list) -> tuple[dict, dict, dict]:
-        """Fetches related data (recoveries, hosts, users) in batches."""
-        r_eventids = list({e['r_eventid'] for e in events if e.get('r_eventid') and e['r_eventid'] != '0'})
-        hostids = list({h['hostid'] for e in events if e.get('hosts') for h in e['hosts']})
-        userids = list({ack['userid'] for e in events if e.get('acknowledges') for ack in e['acknowledges']})
-
-        recovery_times = {}
-        self.progress.emit(get_string('log_fetching_recoveries', count=len(r_eventids)))
-        for id_chunk in self._chunk_list(r_eventids, 2000):
-            if not id_chunk: continue
-            recovery_events_chunk = self._call_zabbix_api('event.get',
-                                                          {'eventids': id_chunk, 'output': ['eventid', 'clock']})
-            for event in recovery_events_chunk:
-                recovery_times[event['eventid']] = int(event['clock'])
-            time.sleep(0.1)
-
-        self.progress.emit(get_string('log_fetching_hosts', count=len(hostids)))
-        hosts = self._call_zabbix_api('host.get', {'hostids': hostids, 'output': ['hostid', 'name']}) if hostids else []
-        host_map = {h['hostid']: h['name'] for h in hosts}
-
-        self.progress.emit(get_string('log_fetching_users', count=len(userids)))
-        users = self._call_zabbix_api('user.get', {'userids': userids,
-                                                 'output': ['userid', 'alias', 'name', 'surname']}) if userids else []
-        user_map = {
-            u['userid']: get_string(
-                'user_display_format',
-                name=u.get('name', ''),
-                surname=u.get('surname', ''),
-                alias=u.get('alias', get_string('user_alias_fallback'))
-            ).strip() for u in users
-        }
+            raise ZabbixConnectionError(get_string('zabbix_connection_call_error', error=e))
 
-        return recovery_times, host_map, user_map
+    def _iter_zabbix_api(self, method: str, params: dict, resume=None):
+        """Like _call_zabbix_api, but yields result items while the response is still downloading."""
+        try:
+            yield from self.transport.iter_call(method, params, resume=resume)
+        except JsonRpcErrorResponse as e:
+            raise ZabbixAPIError(get_string('zabbix_api_call_error', method=method, error_message=str(e)))
+        except RequestException as e:
+            raise ZabbixConnectionError(get_string('zabbix_connection_call_error', error=e))
+
+    def _on_api_retry(self, method: str, attempt: int, delay: float, error: Exception):
+        self.progress.emit(get_string('log_api_retry', method=method, attempt=attempt, delay=delay, error=error))
+
+    def _fetch_all_events(self, pool, recoveries: RelatedLookup) -> EventColumnBuilder:
+        """Fetches all primary problem events of the period using adaptive, paginated windows.
+
+        Closed days already in the local cache are loaded from disk; only the remaining
+        days are requested from the API, grouped into contiguous ranges. Events are
+        decoded from the response stream straight into an EventColumnBuilder, and the
+        recovery eventids seen so far are handed to recoveries after every window.
+        """
+        period_start, period_end = self.period
+        days = [period_start + timedelta(days=n) for n in range((period_end - period_start).days + 1)]
+        events = EventColumnBuilder()
+
+        self.progress.emit(get_string('log_fetching_days', start_date=days[0].strftime('%Y-%m-%d'),
+                                      end_date=days[-1].strftime('%Y-%m-%d')))
+        skipped = [field for field in EVENT_FIELD_SELECTS if field not in self.event_fields]
+        if skipped:
+            self.progress.emit(get_string('log_event_fields_skipped', fields=', '.join(skipped)))
+
+        self._checkpoint = self._load_checkpoint()
+        if self._checkpoint:
+            self._load_checkpoint_events(pool, events, self._checkpoint)
+            # Só os eventos criados depois do checkpoint, em qualquer dia do período
+            self._fetched_days = []
+            self._closed_days = set()
+            self._min_eventid = self._checkpoint['last_eventid'] + 1
+            fetch_ranges = [[self._day_bounds(days[0])[0], self._day_bounds(days[-1])[1]]]
+        else:
+            cached_days = set()
+            if self._use_cached_data():
+                cached_days = self.event_cache.stored_days(self.config['url'], self._cache_query_key(), days)
+                if cached_days:
+                    for record in self.event_cache.iter_events(self.config['url'], self._cache_query_key(),
+                                                               sorted(cached_days)):
+                        events.add_record(record)
+                    self.progress.emit(get_string('log_cache_days', cached=len(cached_days), total=len(days)))
+            self._fetched_days = [day for day in days if day not in cached_days]
+            self._closed_days = set(cached_days)
+
+            fetch_ranges = []
+            for day in self._fetched_days:
+                day_from, day_till = self._day_bounds(day)
+                if fetch_ranges and fetch_ranges[-1][1] + 1 == day_from:
+                    fetch_ranges[-1][1] = day_till
+                else:
+                    fetch_ranges.append([day_from, day_till])
 
-    def _process_events_to_rows(self, events, related_data):
-        """Processes raw event data into structured lists of rows."""
-        recovery_times, host_map, user_map = related_data
-        problem_rows, ack_rows = [], []
-        self.progress.emit(get_string('log_processing_events'))
+        # Recuperações dos eventos vindos do cache ou do checkpoint já podem ser consultadas
+        new_r_eventids, r_eventid_position = events.r_eventids_since(0)
+        recoveries.request(new_r_eventids)
 
-        for event in events:
-            start_dt = datetime.fromtimestamp(int(event['clock']), tz=timezone.utc).astimezone()
-            is_closed = event.get('r_eventid') and event['r_eventid'] != '0'
-            recovery_ts = recovery_times.get(event.get('r_eventid'))
-            rec_dt = datetime.fromtimestamp(recovery_ts, tz=timezone.utc).astimezone() if recovery_ts else None
-            duration = (rec_dt - start_dt) if rec_dt else None
-            host_id = event['hosts'][0]['hostid'] if event.get('hosts') else None
-
-            first_ack_dt, first_ack_user = None, None
-            if event.get('acknowledges'):
-                first_ack = min(event['acknowledges'], key=lambda x: int(x['clock']))
-                first_ack_dt = datetime.fromtimestamp(int(first_ack['clock']), tz=timezone.utc).astimezone()
-                first_ack_user = user_map.get(first_ack['userid'], f"{get_string('user_id_prefix')}{first_ack['userid']}")
-
-            problem_rows.append({
-                'EventID': event['eventid'], 'Time': start_dt,
-                'Severity': SEVERITY_MAP.get(event.get('severity', '0')), 'Recovery Time': rec_dt,
-                'Status': get_string('status_resolved') if is_closed else get_string('status_problem'),
-                'Host': host_map.get(host_id, get_string('not_applicable')),
-                'Problem': event.get('name', ''), 'Duration': duration,
-                'Ack': get_string('ack_yes') if event.get('acknowledged') == '1' else get_string('ack_no'),
-                'First Ack Time': first_ack_dt, 'First Ack User': first_ack_user,
-                'Actions': get_string('messages_sent_format', count=event.get('alerts', '0')),
-                'Tags': get_string('tag_separator').join(f"{t['tag']}={t['value']}" for t in event.get('tags', []))
-            })
+        windows = []
+        for range_from, range_till in fetch_ranges:
+            windows += self._plan_event_windows(pool, range_from, range_till)
+        if fetch_ranges:
+            self.progress.emit(get_string('log_windows_planned', windows=len(windows),
+                                          count=sum(count for _, _, count in windows)))
 
-            for ack in event.get('acknowledges', []):
-                action_code = ack.get('action', '0')
-                action_desc = [desc for code, desc in ACK_ACTION_MAP.items() if int(action_code) & int(code)]
-                ack_rows.append({
-                    'Event Time': start_dt, 'Host': host_map.get(host_id, get_string('not_applicable')),
-                    'Problem': event.get('name', ''),
-                    'User': user_map.get(ack['userid'], f"{get_string('user_id_prefix')}{ack['userid']}"),
-                    'Action Type': get_string('action_separator').join(action_desc) if action_desc else get_string('ack_unknown'),
-                    'Message': ack.get('message', ''),
-                    'Ack Time': datetime.fromtimestamp(int(ack['clock']), tz=timezone.utc).astimezone()
-                })
-        return problem_rows, ack_rows
+        futures = {pool.submit(self._fetch_event_window, events, time_from, time_till): idx
+                   for idx, (time_from, time_till, _) in enumerate(windows)}
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                time_from, time_till, _ = windows[futures[future]]
+                self.progress.emit(get_string(
+                    'log_window_fetched', done=done, total=len(windows),
+                    start=datetime.fromtimestamp(time_from, self.report_tz).strftime('%Y-%m-%d %H:%M'),
+                    end=datetime.fromtimestamp(time_till, self.report_tz).strftime('%Y-%m-%d %H:%M'),
+                    count=future.result()))
+                new_r_eventids, r_eventid_position = events.r_eventids_since(r_eventid_position)
+                recoveries.request(new_r_eventids)
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+
+        # A ordenação final por clock/eventid e a remoção de duplicatas nas fronteiras
+        # das janelas ficam a cargo de EventColumnBuilder.sorted_indices()
+        return events
+
+    def _period_key(self) -> str:
+        return f"{self.period[0].isoformat()}..{self.period[1].isoformat()}"
+
+    def _load_checkpoint(self) -> dict | None:
+        """Checkpoint left by the previous incremental run of this period, if incremental mode is on."""
+        if not self.config.get('incremental') or not self._use_cached_data():
+            return None
+        return self.event_cache.load_checkpoint(self.config['url'], self._cache_query_key(), self._period_key())
+
+    def _load_checkpoint_events(self, pool, events: EventColumnBuilder, checkpoint: dict):
+        """Loads the stored events of the period and re-fetches the open and the recent problems."""
+        recheck_ids = checkpoint['recheck_eventids']
+        for record in self.event_cache.iter_checkpoint_events(self.config['url'], self._cache_query_key(),
+                                                              self._period_key(), skip=recheck_ids):
+            events.add_record(record)
+        self._checkpoint_loaded = len(events)
+        self.progress.emit(get_string(
+            'log_checkpoint_loaded', stored=len(events), recheck=len(recheck_ids),
+            since=datetime.fromtimestamp(checkpoint['last_clock'], self.report_tz).strftime('%Y-%m-%d %H:%M')))
+        chunks = [recheck_ids[i:i + RECHECK_CHUNK_SIZE] for i in range(0, len(recheck_ids), RECHECK_CHUNK_SIZE)]
+        for _ in pool.map(lambda chunk: self._refetch_events(events, chunk), chunks):
+            pass
+
+    def _refetch_events(self, events: EventColumnBuilder, eventids: list) -> int:
+        """Re-fetches stored problems by eventid; deleted ones (or now filtered out) are simply not returned.
+
+        Like the event windows, a chunk interrupted mid-stream resumes after the last event received.
+        """
+        params = dict({'eventids': [str(eventid) for eventid in eventids], 'severities': self.config['severities'],
+                       'source': 0, 'object': 0, 'value': 1, 'sortfield': 'eventid', 'sortorder': 'ASC'},
+                      **self._event_projection())
+        received = 0
+        for event in self._iter_zabbix_api('event.get', params, resume=self._resume_after_event):
+            events.add_event(event)
+            received += 1
+        return received
+
+    def _store_checkpoint(self, events: EventColumnBuilder, related_data: tuple):
+        """Merges this run's events into the stored period and records where the next run starts."""
+        if not self.config.get('incremental') or not self.event_cache or not len(events):
+            return
+        eventids = np.frombuffer(events.eventid, dtype=np.int64)
+        clocks = np.frombuffer(events.clock, dtype=np.int64)
+        recheck_seconds = float(self.config.get('incremental_recheck_hours', DEFAULT_RECHECK_HOURS)) * 3600
+        recent = clocks >= clocks.max() - recheck_seconds
+        recheck_ids = np.unique(eventids[~self._recovered_events(events, related_data[0]) | recent])
+        previous = self._checkpoint or {'last_eventid': 0, 'recheck_eventids': []}
+        checkpoint = {'last_eventid': max(int(eventids.max()), previous['last_eventid']),
+                      'last_clock': int(clocks.max()), 'recheck_eventids': recheck_ids.tolist()}
+        deleted = set(previous['recheck_eventids']) - set(eventids.tolist())
+        # Posições sem eventids repetidos nas fronteiras das janelas
+        positions = events.sorted_indices()
+        changed = ((events.eventid[idx], events.record(idx)) for idx in positions[positions >= self._checkpoint_loaded])
+        stored = self.event_cache.store_checkpoint(
+            self.config['url'], self._cache_query_key(), self._period_key(), checkpoint, changed,
+            replace=self._checkpoint is None, deleted=deleted,
+            keep=int(self.config.get('checkpoint_keep', DEFAULT_CHECKPOINT_KEEP)))
+        self.progress.emit(get_string('log_checkpoint_saved', count=stored, recheck=len(recheck_ids)))
+
+    @staticmethod
+    def _recovered_events(events: EventColumnBuilder, recovery_times: dict) -> np.ndarray:
+        """Per event position: True when its recovery event is known."""
+        return np.fromiter((r != 0 and str(r) in recovery_times for r in events.r_eventid),
+                           dtype=bool, count=len(events))
+
+    def _day_bounds(self, day: date) -> tuple[int, int]:
+        """Returns the first and last second of a calendar day in the report timezone as Unix timestamps."""
+        # Fim do dia = início do dia seguinte - 1: dias de 23 ou 25 horas (horário de verão) saem certos
+        day_start, next_start = (datetime.combine(d, dt_time.min, tzinfo=self.report_tz) for d in
+                                 (day, day + timedelta(days=1)))
+        if self.report_tz is None:
+            day_start, next_start = day_start.astimezone(), next_start.astimezone()
+        return int(day_start.timestamp()), int(next_start.timestamp()) - 1
+
+    def _event_days(self, events: EventColumnBuilder) -> np.ndarray:
+        """Calendar day of every event in the report timezone, as a day number since the Unix epoch."""
+        local = clocks_to_local(np.frombuffer(events.clock, dtype=np.int64), self.report_tz)
+        return local.astype('datetime64[D]').astype(np.int64)
+
+    def _update_event_cache(self, events: EventColumnBuilder, related_data: tuple):
+        """Stores the freshly fetched days that can no longer change (past and fully recovered)."""
+        if not self.event_cache or not self._fetched_days or not len(events):
+            return
+        event_days = self._event_days(events)
+        recovered = self._recovered_events(events, related_data[0])
+
+        now = time.time()
+        epoch = date(1970, 1, 1)
+        closed_days = {}
+        for day in self._fetched_days:
+            if self._day_bounds(day)[1] >= now:
+                continue
+            day_indices = np.flatnonzero(event_days == (day - epoch).days)
+            if recovered[day_indices].all():
+                closed_days[day] = ((events.eventid[idx], events.record(idx)) for idx in day_indices)
+        if closed_days:
+            self.event_cache.store_days(self.config['url'], self._cache_query_key(), closed_days)
+            self._closed_days.update(closed_days)
+            self.progress.emit(get_string('log_cache_stored', count=len(closed_days)))
+
+    def _event_filter(self, time_from: int, time_till: int) -> dict:
+        event_filter = {
+            'severities': self.config['severities'],
+            'source': 0, 'object': 0, 'value': 1,
+            'time_from': time_from, 'time_till': time_till
+        }
+        if self._min_eventid:
+            event_filter['eventid_from'] = str(self._min_eventid)
+        return event_filter
+
+    def _count_events(self, time_from: int, time_till: int) -> int:
+        params = dict(self._event_filter(time_from, time_till), countOutput=True)
+        return int(self._call_zabbix_api('event.get', params))
+
+    def _plan_event_windows(self, pool, time_from: int, time_till: int) -> list[tuple[int, int, int]]:
+        """Splits the period in halves until no window holds more than max_window_events.
+
+        Quiet stretches are never split, so they stay merged into a single request,
+        while an alert-storm day keeps being halved down to MIN_WINDOW_SECONDS.
+        Returns (time_from, time_till, event_count) tuples in chronological order.
+        """
+        windows, pending = [], [(time_from, time_till)]
+        while pending:
+            counts = list(pool.map(lambda window: self._count_events(*window), pending))
+            next_level = []
+            for (w_from, w_till), count in zip(pending, counts):
+                if count == 0:
+                    continue
+                if count > self.max_window_events and w_till - w_from >= 2 * MIN_WINDOW_SECONDS:
+                    middle = (w_from + w_till) // 2
+                    next_level += [(w_from, middle), (middle + 1, w_till)]
+                else:
+                    windows.append((w_from, w_till, count))
+            pending = next_level
+        return sorted(windows)
+
+    def _fetch_event_window(self, events: EventColumnBuilder, time_from: int, time_till: int) -> int:
+        """Streams one time window into the builder, page by page with an eventid cursor.
+
+        A page interrupted mid-stream resumes after the last event received, so a retry
+        never downloads or adds an event twice. Runs inside the worker pool and returns
+        the number of events received.
+        """
+        params = dict(self._event_filter(time_from, time_till), **{
+            'sortfield': 'eventid', 'sortorder': 'ASC', 'limit': self.event_page_size
+        }, **self._event_projection())
+        received = 0
+        while True:
+            page_size, last_eventid = 0, None
+            for event in self._iter_zabbix_api('event.get', params, resume=self._resume_after_event):
+                events.add_event(event)
+                page_size += 1
+                last_eventid = event['eventid']
+            received += page_size
+            if page_size < self.event_page_size:
+                break
+            params['eventid_from'] = str(int(last_eventid) + 1)
+        return received
+
+    @staticmethod
+    def _resume_after_event(params: dict, last_event: dict) -> dict:
+        return dict(params, eventid_from=str(int(last_event['eventid']) + 1))
+
+    def _related_lookup(self, pool, kind: str) -> RelatedLookup:
+        fetch_chunk = {'recovery': self._fetch_recovery_chunk, 'host': self._fetch_host_chunk,
+                       'user': self._fetch_user_chunk, 'host_records': self._fetch_host_records_chunk}[kind]
+        return RelatedLookup(pool, fetch_chunk, RELATED_CHUNK_SIZES[kind],
+                             cached_values=lambda keys: self._cached_lookup(kind, keys))
+
+    def _fetch_related_data(self, pool, events: EventColumnBuilder,
+                            recoveries: RelatedLookup) -> tuple[dict, dict, dict, dict]:
+        """Resolves recoveries, hosts, users and (when needed) host groups concurrently in chunks.
+
+        Cached values are reused. Host groups are only requested for the SLA breakdown and percentiles sheets,
+        in the same host.get call as the host names.
+
+        recoveries already holds the lookups started during the event fetch; the host and
+        user chunks are queued behind them on the same pool.
+        """
+        recoveries.request(list(events.r_eventids))
+        hosts = self._related_lookup(pool, 'host_records' if self.host_groups else 'host')
+        hosts.request(list(events.all_hostids))
+        users = self._related_lookup(pool, 'user')
+        users.request(list(events.userids))
+
+        if self._use_cached_data():
+            self.progress.emit(get_string('log_name_cache', host_hits=hosts.hits, host_misses=hosts.missing,
+                                          user_hits=users.hits, user_misses=users.missing))
+        self.progress.emit(get_string('log_fetching_recoveries', count=recoveries.missing))
+        recovery_times = {k: int(v) for k, v in recoveries.result().items()}
+        self._remember_lookup('recovery', recoveries.fetched)
+
+        self.progress.emit(get_string('log_fetching_hosts', count=hosts.missing))
+        host_map = hosts.result()
+        group_map = {}
+        if self.host_groups:
+            group_map = {hostid: groups for hostid, (_, groups) in host_map.items()}
+            host_map = {hostid: name for hostid, (name, _) in host_map.items()}
+            self._remember_lookup('host_groups', {hostid: groups for hostid, (_, groups) in hosts.fetched.items()})
+            self._remember_lookup('host', {hostid: name for hostid, (name, _) in hosts.fetched.items()})
+        else:
+            self._remember_lookup('host', hosts.fetched)
+
+        self.progress.emit(get_string('log_fetching_users', count=users.missing))
+        user_map = users.result()
+        self._remember_lookup('user', users.fetched)
+
+        return recovery_times, host_map, user_map, group_map
+
+    def _fetch_recovery_chunk(self, eventids: list) -> dict:
+        recovery_events = self._call_zabbix_api('event.get', {'eventids': eventids, 'output': ['eventid', 'clock']})
+        return {event['eventid']: int(event['clock']) for event in recovery_events}
+
+    def _fetch_host_chunk(self, hostids: list) -> dict:
+        hosts = self._call_zabbix_api('host.get', {'hostids': hostids, 'output': ['hostid', 'name']})
+        return {h['hostid']: h['name'] for h in hosts}
+
+    def _fetch_host_records_chunk(self, hostids: list) -> dict:
+        """(name, sorted host group names) of each host (Zabbix 6.2+ also answers selectGroups as 'hostgroups')."""
+        hosts = self._call_zabbix_api('host.get', {'hostids': hostids, 'output': ['hostid', 'name'],
+                                                   'selectGroups': ['name']})
+        return {h['hostid']: (h['name'], tuple(sorted(g['name'] for g in h.get('groups') or h.get('hostgroups') or [])))
+                for h in hosts}
+
+    def _fetch_user_chunk(self, userids: list) -> dict:
+        """(name, surname, alias) of each user; the display text is formatted per report language."""
+        users = self._call_zabbix_api('user.get', {'userids': userids,
+                                                   'output': ['userid', 'alias', 'name', 'surname']})
+        return {u['userid']: (u.get('name', ''), u.get('surname', ''), u.get('alias')) for u in users}
+
+    def _cached_lookup(self, kind: str, keys: list) -> dict:
+        """Cached values of keys; host and user names older than the configured TTL count as missing."""
+        if not self._use_cached_data() or not keys:
+            return {}
+        if kind == 'host_records':
+            # Nome e grupos vêm da mesma chamada host.get, mas ficam guardados como dois tipos de consulta
+            names = self._cached_lookup('host', keys)
+            groups = self._cached_lookup('host_groups', list(names))
+            return {hostid: (names[hostid], groups[hostid]) for hostid in groups}
+        max_age = None
+        if kind in ('host', 'user', 'host_groups'):
+            max_age = float(self.config.get('name_cache_ttl_hours', DEFAULT_NAME_TTL_HOURS)) * 3600
+        found = self.event_cache.get_lookup(self.config['url'], kind, keys, max_age=max_age)
+        if kind not in ('user', 'host_groups'):
+            return found
+        records = {}
+        for key, value in found.items():
+            try:
+                records[key] = tuple(json.loads(value))
+            except (ValueError, TypeError):
+                # Formato antigo (nome já formatado em um idioma): o usuário é buscado de novo
+                pass
+        return records
+
+    def _remember_lookup(self, kind: str, mapping: dict):
+        if self.event_cache and mapping:
+            # Recuperações nunca mudam; nomes são limitados para o cache não crescer sem fim
+            max_entries = None
+            if kind in ('host', 'user', 'host_groups'):
+                max_entries = int(self.config.get('name_cache_max_entries', DEFAULT_NAME_MAX_ENTRIES))
+            if kind in ('user', 'host_groups'):
+                mapping = {key: json.dumps(record) for key, record in mapping.items()}
+            self.event_cache.put_lookup(self.config['url'], kind, mapping, max_entries=max_entries)
+
+    def _build_event_frames(self, events: EventColumnBuilder, related_data) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Builds the Problems and Actions frames from the event columns with bulk array operations.
+
+        Timestamps are converted once per column into the report timezone and left naive,
+        ready for Excel. Repeated values (severity, status, host, problem, user, tags...)
+        are built as Categoricals: one label per distinct value plus integer codes per row.
+        The labels are language-neutral (translation keys, user ids, action codes) and are
+        only translated by _build_final_sheets.
+        """
+        recovery_times, host_map, _, group_map = related_data
+        self.progress.emit(get_string('log_processing_events'))
 
-    def _prepare_dataframes(self, df_problems, df_acks):
-        df_problems_naive = df_problems.copy()
-        for col in ['Time', 'Recovery Time', 'First Ack Time']:
-            if col in df_problems_naive.columns and not df_problems_naive[col].isnull().all():
-                df_problems_naive[col] = pd.to_datetime(df_problems_naive[col]).dt.tz_localize(None)
+        order = events.sorted_indices()
+        clock = np.frombuffer(events.clock, dtype=np.int64)[order]
+        r_eventid = np.frombuffer(events.r_eventid, dtype=np.int64)[order]
+        severity = np.frombuffer(events.severity, dtype=np.int8)[order]
+        acknowledged = np.frombuffer(events.acknowledged, dtype=np.int8)[order]
+        alerts = np.frombuffer(events.alerts, dtype=np.int64)[order]
+
+        # Recuperações: busca binária dos r_eventid nas chaves ordenadas do mapa
+        rec_ids = np.fromiter((int(k) for k in recovery_times), dtype=np.int64, count=len(recovery_times))
+        rec_clocks = np.fromiter(recovery_times.values(), dtype=np.int64, count=len(recovery_times))
+        rec_order = np.argsort(rec_ids)
+        rec_ids, rec_clocks = rec_ids[rec_order], rec_clocks[rec_order]
+        pos = np.minimum(np.searchsorted(rec_ids, r_eventid), max(len(rec_ids) - 1, 0))
+        found = (r_eventid != 0) & (len(rec_ids) > 0)
+        if len(rec_ids):
+            found &= (rec_ids[pos] == r_eventid) & (rec_clocks[pos] > 0)
+        recovery_clock = np.where(found, rec_clocks[pos] if len(rec_ids) else -1, -1)
+
+        # Reconhecimentos: evento de cada ack e o primeiro ack (menor clock) de cada evento
+        ack_count = len(events.ack_clock)
+        ack_start = np.frombuffer(events.ack_start, dtype=np.int64)
+        ack_event = np.repeat(np.arange(len(events)), np.diff(ack_start, append=ack_count))
+        ack_clock = np.frombuffer(events.ack_clock, dtype=np.int64) if ack_count else np.empty(0, np.int64)
+        rank = np.full(len(events), -1, dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        ack_rank = rank[ack_event]
+        # lexsort é estável: em caso de empate no clock vale o primeiro ack, como no min() original
+        by_event_clock = np.lexsort((ack_clock, ack_rank))
+        by_event_clock = by_event_clock[ack_rank[by_event_clock] >= 0]
+        is_first = np.ones(len(by_event_clock), dtype=bool)
+        is_first[1:] = ack_rank[by_event_clock][1:] != ack_rank[by_event_clock][:-1]
+        first_ack = np.full(len(order), -1, dtype=np.int64)
+        first_ack[ack_rank[by_event_clock[is_first]]] = by_event_clock[is_first]
+        has_ack = first_ack >= 0
+
+        # Hosts desconhecidos ficam ausentes (traduzidos como 'not_applicable')
+        host_names = categorical_values([events.hostids[i] for i in order],
+                                        lambda ids: host_map.get(ids[0] if ids else None))
+        names = categorical_values([events.name[i] for i in order], lambda name: name)
+        first_ack_user = categorical_values(
+            [events.ack_userid[a] if a >= 0 else None for a in first_ack.tolist()], lambda userid: userid)
+
+        event_time = clocks_to_local(clock, self.report_tz)
+        recovery_time = clocks_to_local(recovery_clock, self.report_tz)
+        first_ack_clock = np.where(has_ack, ack_clock[first_ack] if ack_count else -1, -1)
+        first_ack_time = clocks_to_local(first_ack_clock, self.report_tz)
+        df_problems = pd.DataFrame({
+            'EventID': np.frombuffer(events.eventid, dtype=np.int64)[order].astype(str).astype(object),
+            'Time': event_time,
+            'Severity': categorical_values(severity, lambda code: SEVERITY_KEYS.get(str(code))),
+            'Recovery Time': recovery_time,
+            'Status': categorical_values(r_eventid != 0,
+                                         lambda closed: 'status_resolved' if closed else 'status_problem'),
+            'Host': host_names,
+            'Problem': names,
+            'Duration': pd.to_timedelta(np.where(recovery_clock >= 0, recovery_clock - clock, np.nan), unit='s'),
+            'Ack': categorical_values(acknowledged == 1, lambda acked: 'ack_yes' if acked else 'ack_no'),
+            'First Ack Time': first_ack_time,
+            'First Ack User': first_ack_user,
+            'Actions': categorical_values(alerts, lambda count: count),
+            'Tags': categorical_values([events.tags[i] for i in order], lambda tags: NEUTRAL_TAG_SEPARATOR.join(
+                f"{tag}={value}" for tag, value in tags)),
+        })
 
-        df_acks_naive = df_acks.copy()
-        if not df_acks_naive.empty:
-            for col in ['Event Time', 'Ack Time']:
-                if col in df_acks_naive.columns and not df_acks_naive[col].isnull().all():
-                    df_acks_naive[col] = pd.to_datetime(df_acks_naive[col]).dt.tz_localize(None)
-        return df_problems_naive, df_acks_naive
+        if self.business_calendar is not None:
+            # Horas úteis no fuso do calendário, que pode ser outro que o das colunas do relatório
+            df_problems['Business Ack Minutes'] = self.business_calendar.working_seconds(clock, first_ack_clock) / 60
+
+        if self.host_groups:
+            # Grupos de todos os hosts do evento; fora das colunas da aba Problems, usados na aba por dimensão
+            df_problems['Host Groups'] = categorical_values(
+                [events.hostids[i] for i in order],
+                lambda ids: NEUTRAL_TAG_SEPARATOR.join(sorted({g for h in ids for g in group_map.get(h, ())})) or None)
+
+        # Ações na ordem dos eventos e, dentro de cada evento, na ordem recebida da API
+        ack_rows = np.flatnonzero(ack_rank >= 0)
+        ack_rows = ack_rows[np.argsort(ack_rank[ack_rows], kind='stable')]
+        if not len(ack_rows):
+            return df_problems, pd.DataFrame()
+        ack_event_pos = ack_rank[ack_rows]
+
+        df_acks = pd.DataFrame({
+            'Event Time': event_time[ack_event_pos],
+            'Host': host_names[ack_event_pos],
+            'Problem': names[ack_event_pos],
+            'User': categorical_values([events.ack_userid[a] for a in ack_rows], lambda userid: userid),
+            'Action Type': categorical_values(np.frombuffer(events.ack_action, dtype=np.int64)[ack_rows],
+                                              lambda action_code: action_code),
+            'Message': np.array(events.ack_message, dtype=object)[ack_rows],
+            'Ack Time': clocks_to_local(ack_clock[ack_rows], self.report_tz),
+        })
+        return df_problems, df_acks
 
     def _generate_sla_reports(self, df_problems: pd.DataFrame) -> dict:
-        """Generates all DataFrames for the multi-sheet SLA analysis report."""
+        """Generates all DataFrames for the multi-sheet SLA analysis report.
+
+        Every summary is counted with np.bincount over integer codes (day since the epoch,
+        user, problem, period) and a boolean met array, in time linear in the number of
+        events; the resulting frames are the same as the groupby/pivot formulation.
+        Daily volume and top 10 count every problem, so they are built even without acks.
+        """
+        if df_problems.empty:
+            return {}
         self.progress.emit(get_string('log_generating_sla'))
         sla_threshold_minutes = self.config['sla_threshold']
 
-        df_acknowledged = df_problems[df_problems['First Ack Time'].notna()].copy()
-        if df_acknowledged.empty:
+        # Dias: número de dias desde a época das datas locais (sem fuso), deslocado para começar em 0
+        event_days = df_problems['Time'].to_numpy().astype('datetime64[D]').astype(np.int64)
+        first_day = int(event_days.min())
+        event_days -= first_day
+
+        day_volume = np.bincount(event_days)
+        days = np.flatnonzero(day_volume)
+        df_daily_volume = pd.DataFrame({'Date': self._day_dates(days, first_day), 'Total Events': day_volume[days]})
+
+        problems = df_problems['Problem'].array
+        problem_counts = np.bincount(problems.codes[problems.codes >= 0], minlength=len(problems.categories))
+        seen = np.flatnonzero(problem_counts)
+        df_top_10 = pd.Series(problem_counts[seen], name='Count',
+                              index=pd.CategoricalIndex(pd.Categorical.from_codes(seen, dtype=problems.dtype),
+                                                        name='Problem')).nlargest(10).reset_index()
+        volume_data = {'Daily Event Volume': df_daily_volume, 'Top 10 Problems': df_top_10}
+
+        if 'first_ack' not in self.event_fields:
+            return volume_data
+        acked = np.flatnonzero(df_problems['First Ack Time'].notna().to_numpy())
+        if not len(acked):
             self.progress.emit(get_string('log_warn_no_acks'))
-            return {}
-
-        df_acknowledged['Ack Duration (min)'] = (
-                (df_acknowledged['First Ack Time'] - df_acknowledged['Time']).dt.total_seconds() / 60)
-        df_acknowledged['SLA Status'] = np.where(df_acknowledged['Ack Duration (min)'] <= sla_threshold_minutes,
-                                                 get_string('sla_met'), get_string('sla_violated'))
-
-        df_sla_details = df_acknowledged[
-            ['EventID', 'Host', 'Problem', 'Time', 'First Ack Time', 'First Ack User', 'Ack Duration (min)',
-             'SLA Status']].copy()
-        df_sla_details['Ack Duration (min)'] = df_sla_details['Ack Duration (min)'].round(2)
-
+            return volume_data
+
+        detail_columns = ['EventID', 'Host', 'Problem', 'Time', 'First Ack Time', 'First Ack User']
+        if 'Server' in df_problems:
+            detail_columns.insert(0, 'Server')
+        df_sla_details = df_problems.iloc[acked][detail_columns].reset_index(drop=True)
+        if 'Business Ack Minutes' in df_problems:
+            self.progress.emit(get_string('log_business_hours'))
+            ack_minutes = df_problems['Business Ack Minutes'].iloc[acked].reset_index(drop=True)
+        else:
+            ack_minutes = (df_sla_details['First Ack Time'] - df_sla_details['Time']).dt.total_seconds() / 60
+        met = (ack_minutes <= sla_threshold_minutes).to_numpy()
+        met_col, violated_col = 'sla_met', 'sla_violated'
+        df_sla_details['Ack Duration (min)'] = ack_minutes.round(2)
+        df_sla_details['SLA Status'] = pd.Categorical.from_codes(np.where(met, 0, 1).astype(np.int8),
+                                                                 categories=[met_col, violated_col])
         df_sla_details['Date'] = df_sla_details['Time'].dt.normalize()
-        df_daily_sla = df_sla_details.groupby(['Date', 'SLA Status']).size().unstack(fill_value=0)
-
-        met_col, violated_col = get_string('sla_met'), get_string('sla_violated')
-        if met_col not in df_daily_sla.columns: df_daily_sla[met_col] = 0
-        if violated_col not in df_daily_sla.columns: df_daily_sla[violated_col] = 0
 
+        ack_days = event_days[acked]
+        day_met = np.bincount(ack_days[met], minlength=event_days.max() + 1)
+        day_violated = np.bincount(ack_days[~met], minlength=event_days.max() + 1)
+
+        days = np.flatnonzero(day_met + day_violated)
+        # Colunas na ordem do pivot original: status presentes primeiro, os ausentes acrescentados depois
+        status_columns = [col for col, seen in ((met_col, met.any()), (violated_col, not met.all())) if seen]
+        status_columns += [col for col in (met_col, violated_col) if col not in status_columns]
+        daily_counts = {met_col: day_met[days], violated_col: day_violated[days]}
+        df_daily_sla = pd.DataFrame({'Date': self._day_dates(days, first_day),
+                                     **{col: daily_counts[col] for col in status_columns}})
         df_daily_sla['Total Acks'] = df_daily_sla[met_col] + df_daily_sla[violated_col]
         df_daily_sla['% Met'] = (df_daily_sla[met_col] / df_daily_sla['Total Acks'] * 100).round(2)
-        df_daily_sla = df_daily_sla.reset_index()
-
-        df_problems['Date'] = df_problems['Time'].dt.normalize()
-        df_daily_volume = df_problems.groupby('Date').size().reset_index(name='Total Events')
-        df_top_10 = df_problems.groupby('Problem').size().nlargest(10).reset_index(name='Count')
-        df_user_prod = df_sla_details.groupby('First Ack User').agg(
-            Total_Acks=('EventID', 'count'),
-            SLA_Violations=('SLA Status', lambda x: (x == violated_col).sum())
-        ).reset_index().sort_values(by='Total_Acks', ascending=False)
+        df_daily_sla.columns.name = 'SLA Status'
+
+        users = df_sla_details['First Ack User'].array
+        user_codes = users.codes
+        has_user = user_codes >= 0
+        user_acks = np.bincount(user_codes[has_user], minlength=len(users.categories))
+        user_violations = np.bincount(user_codes[has_user & ~met], minlength=len(users.categories))
+        seen = np.flatnonzero(user_acks)
+        df_user_prod = pd.DataFrame({
+            'First Ack User': pd.Categorical.from_codes(seen, dtype=users.dtype),
+            'Total_Acks': user_acks[seen], 'SLA_Violations': user_violations[seen],
+        }).sort_values(by='Total_Acks', ascending=False)
 
         df_monthly_summary = pd.DataFrame(
             {'Status': [met_col, violated_col],
              'Count': [df_daily_sla[met_col].sum(), df_daily_sla[violated_col].sum()]})
 
-        return {
-            'SLA Details': df_sla_details, 'Daily SLA Summary': df_daily_sla,
-            'Daily Event Volume': df_daily_volume, 'Top 10 Problems': df_top_10,
+        report_data = {
+            'SLA Details': df_sla_details, 'Daily SLA Summary': df_daily_sla, **volume_data,
             'User Productivity': df_user_prod, 'Monthly Summary Data': df_monthly_summary
         }
+        if len(self.periods) > 1:
+            report_data['Period SLA Summary'] = self._group_sla_summary(df_problems, 'Period', acked, met,
+                                                                        met_col, violated_col)
+        if len(self.servers) > 1:
+            report_data['Server SLA Summary'] = self._group_sla_summary(df_problems, 'Server', acked, met,
+                                                                        met_col, violated_col)
+        if 'sla_breakdown' in self.report_sheets:
+            df_breakdown = self._sla_breakdown(df_problems, acked, met, ack_minutes.to_numpy(), met_col, violated_col)
+            if not df_breakdown.empty:
+                report_data['SLA Breakdown'] = df_breakdown
+        return report_data
+
+    def _breakdown_dimensions(self, df_problems: pd.DataFrame) -> list:
+        """(column, labels of a category) per coded column the breakdown reads; each label is (dimension, value).
+
+        All selected tag keys come from the same Tags column, so another key adds labels, not another scan.
+        """
+        dimensions = []
+        if 'Host Groups' in df_problems:
+            dimensions.append(('Host Groups', lambda groups: [('host_group', group)
+                                                              for group in groups.split(NEUTRAL_TAG_SEPARATOR)]))
+        if self.breakdown_tags and 'Tags' in df_problems:
+            wanted = set(self.breakdown_tags)
+
+            def tag_labels(tags):
+                pairs = (pair.partition('=') for pair in tags.split(NEUTRAL_TAG_SEPARATOR) if pair)
+                return list(dict.fromkeys((f"tag:{tag}", value) for tag, _, value in pairs if tag in wanted))
+            dimensions.append(('Tags', tag_labels))
+        return dimensions
+
+    def _sla_breakdown(self, df_problems, acked, met, ack_minutes, met_col, violated_col) -> pd.DataFrame:
+        """Event volume and SLA per host group and per value of the breakdown tags, counted in one pass.
+
+        Every (event, label) membership of every dimension goes into one pair of code arrays,
+        so a single np.bincount per measure yields the counts of all breakdowns at once.
+        """
+        labels, member_rows, member_labels = {}, [], []
+        for column, labels_of in self._breakdown_dimensions(df_problems):
+            rows, label_codes = category_memberships(df_problems[column].array, labels_of, labels)
+            member_rows.append(rows)
+            member_labels.append(label_codes)
+        if not labels:
+            return pd.DataFrame()
+        member_rows, member_labels = np.concatenate(member_rows), np.concatenate(member_labels)
+
+        # Medidas por linha do quadro de problemas (zero nos eventos sem reconhecimento)
+        row_met = np.zeros(len(df_problems), dtype=np.int64)
+        row_violated = np.zeros(len(df_problems), dtype=np.int64)
+        row_minutes = np.zeros(len(df_problems))
+        row_met[acked] = met
+        row_violated[acked] = ~met
+        row_minutes[acked] = ack_minutes
+        size = len(labels)
+        volume = np.bincount(member_labels, minlength=size)
+        label_met = np.bincount(member_labels, weights=row_met[member_rows], minlength=size).astype(np.int64)
+        label_violated = np.bincount(member_labels, weights=row_violated[member_rows], minlength=size).astype(np.int64)
+        label_minutes = np.bincount(member_labels, weights=row_minutes[member_rows], minlength=size)
+
+        keys = list(labels)
+        dimension_order = {dimension: i for i, dimension in
+                           enumerate(dict.fromkeys(['host_group'] + [f"tag:{tag}" for tag in self.breakdown_tags]))}
+        order = sorted((i for i in range(size) if volume[i]),
+                       key=lambda i: (dimension_order[keys[i][0]], keys[i][1]))
+        total = label_met[order] + label_violated[order]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percent = np.where(total > 0, np.round(label_met[order] / total * 100, 2), 0.0)
+            average = np.where(total > 0, np.round(label_minutes[order] / total, 2), np.nan)
+        return pd.DataFrame({
+            'Dimension': pd.Categorical([keys[i][0] for i in order], categories=list(dimension_order)),
+            'Value': [keys[i][1] for i in order],
+            'Total Events': volume[order], met_col: label_met[order], violated_col: label_violated[order],
+            'Total Acks': total, '% Met': percent, 'Avg Ack Duration (min)': average,
+        })
 
-    def _build_final_sheets(self, df_problems_naive, df_acks_naive, all_report_data):
-        """Prepares final dataframes for saving, translating sheet names and column headers."""
+    def _duration_sketches(self, df_problems: pd.DataFrame) -> dict:
+        """Quantile sketches of the ack and resolution times (minutes), one per (day, dimension, value).
+
+        Dimensions are the severity (each event once) and its host groups. Sketches of other
+        periods merge into these, and the per-severity, per-day and per-group tables are
+        merges of the daily sketches. Closed days reuse the sketches stored by an earlier
+        run; the ones computed here are stored for the next.
+        """
+        event_days = df_problems['Time'].to_numpy().astype('datetime64[D]').astype(np.int64)
+        stored = self._cached_day_sketches()
+        if stored:
+            self.progress.emit(get_string('log_sketches_cached', count=len(stored)))
+        epoch = date(1970, 1, 1)
+        fresh = ~np.isin(event_days, [(day - epoch).days for day in stored])
+
+        labels, rows, label_codes = {}, [], []
+        for column, labels_of in (('Severity', lambda severity: [('severity', severity)]),
+                                  ('Host Groups', lambda groups: [('host_group', group) for group in
+                                                                  groups.split(NEUTRAL_TAG_SEPARATOR)])):
+            if column in df_problems:
+                column_rows, column_labels = category_memberships(df_problems[column].array, labels_of, labels)
+                rows.append(column_rows)
+                label_codes.append(column_labels)
+        rows, label_codes = np.concatenate(rows), np.concatenate(label_codes)
+        # Eventos de dias com sketch guardado ficam de fora; só os demais dias são calculados
+        label_codes = label_codes[fresh[rows]]
+        rows = rows[fresh[rows]]
+
+        first_day = int(event_days.min()) if len(event_days) else 0
+        span = int(event_days.max()) - first_day + 1 if len(event_days) else 1
+        key_codes = label_codes * span + (event_days[rows] - first_day)
+        label_list = list(labels)
+
+        def key_of(code):
+            dimension, value = label_list[code // span]
+            return str(np.datetime64(first_day + code % span, 'D')), dimension, value
+
+        if 'Business Ack Minutes' in df_problems:
+            ack_minutes = df_problems['Business Ack Minutes'].to_numpy()
+        else:
+            ack_minutes = (df_problems['First Ack Time'] - df_problems['Time']).dt.total_seconds().to_numpy() / 60
+        resolution_minutes = df_problems['Duration'].dt.total_seconds().to_numpy() / 60
+        sketches = {'ack': QuantileSketches.from_values(key_codes, ack_minutes[rows], key_of),
+                    'resolution': QuantileSketches.from_values(key_codes, resolution_minutes[rows], key_of)}
+        self._remember_day_sketches(sketches)
+        return {metric: QuantileSketches.merge([sketches[metric]] + [day[metric] for day in stored.values()])
+                for metric in sketches}
+
+    def _sketch_cache_key(self) -> str:
+        """Key of the stored day sketches: the cached events plus the settings that turn them into durations."""
+        return make_query_key(events=self._cache_query_key(), business_hours=self.config.get('business_hours'),
+                              host_groups=self.host_groups, accuracy=RELATIVE_ACCURACY)
+
+    def _cached_day_sketches(self) -> dict:
+        """{day: {'ack': sketches, 'resolution': sketches}} stored for the closed days of the period."""
+        if not self._closed_days:
+            return {}
+        key = self._sketch_cache_key()
+        days = {f"{key}:{day.isoformat()}": day for day in self._closed_days}
+        stored = {}
+        for lookup_key, value in self._cached_lookup('duration_sketches', list(days)).items():
+            try:
+                stored[days[lookup_key]] = {metric: QuantileSketches.from_dict(data)
+                                            for metric, data in json.loads(value).items()}
+            except (ValueError, TypeError, KeyError):
+                # Registro ilegível: o dia é calculado de novo a partir dos eventos
+                pass
+        return stored
+
+    def _remember_day_sketches(self, sketches: dict):
+        """Stores the freshly computed sketches of the closed days, one lookup entry per day."""
+        if not self.event_cache or not self._closed_days:
+            return
+        closed = {day.isoformat() for day in self._closed_days}
+        by_day = {metric: sketches[metric].split(lambda key: key[0]) for metric in sketches}
+        key = self._sketch_cache_key()
+        mapping = {}
+        # Um dia sem nenhum reconhecimento só tem sketch de resolução
+        for day in closed & set().union(*by_day.values()):
+            mapping[f"{key}:{day}"] = json.dumps({metric: parts.get(day, QuantileSketches.empty()).to_dict()
+                                                  for metric, parts in by_day.items()})
+        self._remember_lookup('duration_sketches', mapping)
+
+    def _duration_percentiles(self) -> pd.DataFrame:
+        """PERCENTILES of the ack and resolution times by severity, by day and by host group."""
+        def table_keys(key):
+            day, dimension, value = key
+            if dimension == 'severity':
+                return [('severity', value), ('day', day)]
+            return [(dimension, value)]
+
+        severity_rank = {key: rank for rank, key in enumerate(reversed(SEVERITY_KEYS.values()))}
+        dimension_rank = {'severity': 0, 'day': 1, 'host_group': 2}
+        columns, keys = {}, set()
+        for metric, prefix, count_col in (('ack', 'Ack', 'Acks'), ('resolution', 'Resolution', 'Resolved')):
+            sketches = self.duration_sketches[metric].regroup(table_keys)
+            values = dict(zip(sketches.keys, zip(sketches.totals(),
+                                                 sketches.quantiles([q / 100 for q in PERCENTILES]))))
+            columns[metric] = (prefix, count_col, values)
+            keys.update(values)
+        order = sorted(keys, key=lambda key: (dimension_rank[key[0]], severity_rank.get(key[1], 0), key[1]))
+        df = pd.DataFrame({'Dimension': pd.Categorical([key[0] for key in order], categories=list(dimension_rank)),
+                           'Value': [key[1] for key in order]})
+        for prefix, count_col, values in columns.values():
+            df[count_col] = [values[key][0] if key in values else 0 for key in order]
+            quantiles = np.array([values[key][1] if key in values else [np.nan] * len(PERCENTILES) for key in order])
+            for i, q in enumerate(PERCENTILES):
+                df[f"{prefix} p{q} (min)"] = quantiles[:, i].round(2) if len(order) else []
+        return df
+
+    @staticmethod
+    def _day_dates(days: np.ndarray, first_day: int) -> np.ndarray:
+        """Midnight timestamps (datetime64[ns]) of day offsets from first_day."""
+        return (days + first_day).astype('datetime64[D]').astype('datetime64[ns]')
+
+    def _group_sla_summary(self, df_problems, column: str, acked, met, met_col, violated_col) -> pd.DataFrame:
+        """One row per report period or server (column): event volume and SLA counts, to compare them."""
+        groups = df_problems[column].array
+        group_codes = groups.codes
+        size = len(groups.categories)
+        volume = np.bincount(group_codes[group_codes >= 0], minlength=size)
+        ack_codes = group_codes[acked]
+        group_met = np.bincount(ack_codes[met & (ack_codes >= 0)], minlength=size)
+        group_violated = np.bincount(ack_codes[~met & (ack_codes >= 0)], minlength=size)
+        rows = np.flatnonzero(volume)
+        total = group_met[rows] + group_violated[rows]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percent = np.where(total > 0, np.round(group_met[rows] / total * 100, 2), 0.0)
+        df_summary = pd.DataFrame({
+            column: groups.categories[rows].astype(str), 'Total Events': volume[rows],
+            met_col: group_met[rows], violated_col: group_violated[rows], 'Total Acks': total, '% Met': percent,
+        })
+        if (total == 0).any():
+            # Grupos sem reconhecimentos vinham da junção com NaN (depois zerado): contagens como float
+            df_summary = df_summary.astype({met_col: float, violated_col: float, 'Total Acks': float})
+        return df_summary
+
+    def _build_final_sheets(self, df_problems_naive, df_acks_naive, all_report_data, lang: str):
+        """Prepares final dataframes for saving in lang, translating values, sheet names and column headers."""
         final_data_sheets = {}
 
+        def text(key, **kwargs):
+            return translate(lang, key, **kwargs)
+
         column_map = {
-            'Time': get_string('col_time'), 'Severity': get_string('col_severity'),
-            'Recovery Time': get_string('col_recovery_time'),
-            'Status': get_string('col_status'), 'Host': get_string('col_host'), 'Problem': get_string('col_problem'),
-            'Duration': get_string('col_duration'), 'Ack': get_string('col_ack'), 'Actions': get_string('col_actions'),
-            'Tags': get_string('col_tags'), 'Event Time': get_string('col_event_time'), 'User': get_string('col_user'),
-            'Action Type': get_string('col_action_type'), 'Message': get_string('col_message'),
-            'Ack Time': get_string('col_ack_time'),
-            'EventID': get_string('col_event_id'), 'First Ack Time': get_string('col_first_ack_time'),
-            'First Ack User': get_string('col_first_ack_user'),
-            'Ack Duration (min)': get_string('col_ack_duration_min'),
-            'SLA Status': get_string('col_sla_status'), 'Date': get_string('col_date'),
-            get_string('sla_met'): get_string('col_met'),
-            get_string('sla_violated'): get_string('col_violated'), 'Total Acks': get_string('col_total_acks'),
-            '% Met': get_string('col_percent_met'),
-            'Total Events': get_string('col_total_events'), 'Count': get_string('col_count'),
-            'SLA_Violations': get_string('col_sla_violations')
+            'Time': text('col_time'), 'Severity': text('col_severity'), 'Recovery Time': text('col_recovery_time'),
+            'Status': text('col_status'), 'Host': text('col_host'), 'Problem': text('col_problem'),
+            'Duration': text('col_duration'), 'Ack': text('col_ack'), 'Actions': text('col_actions'),
+            'Tags': text('col_tags'), 'Event Time': text('col_event_time'), 'User': text('col_user'),
+            'Action Type': text('col_action_type'), 'Message': text('col_message'), 'Ack Time': text('col_ack_time'),
+            'EventID': text('col_event_id'), 'First Ack Time': text('col_first_ack_time'),
+            'First Ack User': text('col_first_ack_user'), 'Ack Duration (min)': text('col_ack_duration_min'),
+            'SLA Status': text('col_sla_status'), 'Date': text('col_date'),
+            'sla_met': text('col_met'), 'sla_violated': text('col_violated'), 'Total Acks': text('col_total_acks'),
+            '% Met': text('col_percent_met'),
+            'Total Events': text('col_total_events'), 'Count': text('col_count'),
+            'SLA_Violations': text('col_sla_violations'), 'Period': text('col_period'),
+            'Dimension': text('col_dimension'), 'Value': text('col_value'),
+            'Avg Ack Duration (min)': text('col_avg_ack_duration_min'),
+            'Acks': text('col_total_acks'), 'Resolved': text('col_resolved'), 'Server': text('col_server'),
         }
-
-        if not df_problems_naive.empty:
-            df_problems_to_save = df_problems_naive.drop(
-                columns=['EventID', 'First Ack Time', 'First Ack User', 'Date'], errors='ignore'
-            ).rename(columns=column_map)
-            final_data_sheets[get_string('sheet_problems')] = df_problems_to_save
-
-        if not df_acks_naive.empty:
-            df_acks_to_save = df_acks_naive.rename(columns=column_map)
-            final_data_sheets[get_string('sheet_actions')] = df_acks_to_save
+        for q in PERCENTILES:
+            column_map[f"Ack p{q} (min)"] = text('col_ack_percentile', q=q)
+            column_map[f"Resolution p{q} (min)"] = text('col_resolution_percentile', q=q)
+
+        # Servidor e período abrem as listas de problemas e de ações quando o relatório tem mais de um
+        leading = [col for col in ('Server', 'Period') if col != 'Period' or len(self.periods) > 1]
+        if not df_problems_naive.empty and 'problems' in self.report_sheets:
+            columns = [col for col in leading if col in df_problems_naive]
+            columns += [col for col in PROBLEM_COLUMNS if col in self.problem_columns]
+            df_problems_to_save = self._localize_frame(df_problems_naive[columns], lang).rename(columns=column_map)
+            final_data_sheets[text('sheet_problems')] = df_problems_to_save
+
+        if not df_acks_naive.empty and 'actions' in self.report_sheets:
+            columns = [col for col in leading if col in df_acks_naive]
+            columns += [col for col in df_acks_naive if col not in ('Server', 'Period')]
+            df_acks_to_save = self._localize_frame(df_acks_naive[columns], lang).rename(columns=column_map)
+            final_data_sheets[text('sheet_actions')] = df_acks_to_save
 
         if all_report_data:
             chart_data_key = 'Monthly Summary Data'
             sheet_name_map = {
-                'SLA Details': get_string('sheet_sla_details'), 'Daily SLA Summary': get_string('sheet_daily_sla'),
-                'Daily Event Volume': get_string('sheet_daily_volume'), 'Top 10 Problems': get_string('sheet_top_10'),
-                'User Productivity': get_string('sheet_user_prod')
+                'SLA Details': text('sheet_sla_details'), 'Daily SLA Summary': text('sheet_daily_sla'),
+                'Daily Event Volume': text('sheet_daily_volume'), 'Top 10 Problems': text('sheet_top_10'),
+                'User Productivity': text('sheet_user_prod'), 'Period SLA Summary': text('sheet_period_sla'),
+                'SLA Breakdown': text('sheet_sla_breakdown'), 'Duration Percentiles': text('sheet_percentiles'),
+                'Server SLA Summary': text('sheet_server_sla'),
+            }
+            sheet_key_map = {
+                'SLA Details': 'sla_details', 'Daily SLA Summary': 'daily_sla', 'Daily Event Volume': 'daily_volume',
+                'Top 10 Problems': 'top_10', 'User Productivity': 'user_productivity',
+                'Period SLA Summary': 'period_sla', 'SLA Breakdown': 'sla_breakdown',
+                'Duration Percentiles': 'percentiles', 'Server SLA Summary': 'server_sla',
             }
             for key, df in all_report_data.items():
-                if key != chart_data_key:
-                    df_to_save = df.rename(columns=column_map)
-                    final_data_sheets[sheet_name_map[key]] = df_to_save
+                if key != chart_data_key and sheet_key_map[key] in self.report_sheets:
+                    if key == 'Duration Percentiles':
+                        df = df.assign(Value=[text(value) if dimension == 'severity' else value
+                                              for dimension, value in zip(df['Dimension'], df['Value'])])
+                    df = self._localize_frame(df, lang)
+                    if key == 'User Productivity':
+                        # Ids diferentes podem ter o mesmo nome de exibição: agrupados de novo depois da tradução
+                        df = df.groupby('First Ack User', observed=True)[['Total_Acks', 'SLA_Violations']].sum(
+                        ).reset_index().sort_values(by='Total_Acks', ascending=False)
+                    final_data_sheets[sheet_name_map[key]] = df.rename(columns=column_map)
         return final_data_sheets
 
-    def _save_report(self, final_data_sheets, all_report_data):
-        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-        filename_prefix = get_string('report_filename_prefix')
-        outfile = self.config[
-                      'output_dir'] / f"{filename_prefix}_{self.config['year']}_{self.config['month']:02d}_{timestamp}.xlsx"
-
-        with pd.ExcelWriter(str(outfile), engine='xlsxwriter', engine_kwargs={'options': {'strings_to_urls': False}},
+    def _localize_frame(self, df: pd.DataFrame, lang: str) -> pd.DataFrame:
+        """Translates the language-neutral columns of a frame (codes, keys, user ids) into lang."""
+        def text(key, **kwargs):
+            return translate(lang, key, **kwargs)
+
+        def user_name(userid):
+            if userid not in self.user_records:
+                # Com vários servidores o id leva o nome do servidor como prefixo; a coluna Server já o mostra
+                return f"{text('user_id_prefix')}{str(userid).rpartition(':')[2]}"
+            name, surname, alias = self.user_records[userid]
+            return text('user_display_format', name=name, surname=surname,
+                        alias=text('user_alias_fallback') if alias is None else alias).strip()
+
+        action_separator = text('action_separator')
+
+        def action_type(action_code):
+            action_desc = [text(key) for code, key in ACK_ACTION_KEYS.items() if action_code & int(code)]
+            return action_separator.join(action_desc) if action_desc else text('ack_unknown')
+
+        tag_separator = text('tag_separator')
+
+        def dimension_name(dimension):
+            if dimension in ('host_group', 'severity', 'day'):
+                return text(f"dimension_{dimension}")
+            return text('dimension_tag', tag=dimension.partition(':')[2])
+
+        translators = {
+            'Severity': text, 'Status': text, 'Ack': text, 'SLA Status': text,
+            'Actions': lambda count: text('messages_sent_format', count=count),
+            'Tags': lambda tags: tags.replace(NEUTRAL_TAG_SEPARATOR, tag_separator),
+            'First Ack User': user_name, 'User': user_name, 'Action Type': action_type, 'Dimension': dimension_name,
+        }
+        localized = {}
+        for col in df.columns:
+            if col in translators:
+                localized[col] = relabel_categorical(df[col], translators[col])
+            elif col == 'Host':
+                localized[col] = relabel_categorical(df[col], lambda host: host, missing_label=text('not_applicable'))
+        return df.assign(**localized) if localized else df
+
+    def _output_formats(self) -> list[str]:
+        """Returns the selected config 'output_formats' (default: xlsx only), checking they can be written."""
+        output_formats = [str(fmt).lower() for fmt in self.config.get('output_formats') or ['xlsx']]
+        unknown = [fmt for fmt in output_formats if fmt not in OUTPUT_FORMATS]
+        if unknown:
+            raise ValueError(get_string('unknown_output_format', formats=', '.join(unknown)))
+        if 'parquet' in output_formats and importlib.util.find_spec('pyarrow') is None:
+            raise RuntimeError(get_string('parquet_unavailable'))
+        return output_formats
+
+    def _export_data_sheets(self, final_data_sheets: dict, outfile_stem: str, data_formats: list) -> Path:
+        """Writes each final sheet as <stem>/<sheet>.parquet and/or <sheet>.csv.gz, without any formatting."""
+        export_dir = self.config['output_dir'] / outfile_stem
+        export_dir.mkdir(parents=True, exist_ok=True)
+        for sheet_name, df in final_data_sheets.items():
+            file_stem = re.sub(r'\W+', '_', sheet_name).strip('_').lower()
+            if 'parquet' in data_formats:
+                df.to_parquet(export_dir / f"{file_stem}.parquet", index=False)
+            if 'csv' in data_formats:
+                df.to_csv(export_dir / f"{file_stem}.csv.gz", index=False, compression='gzip')
+        return export_dir
+
+    def _save_report(self, final_data_sheets, all_report_data, outfile_stem: str, lang: str, sheet_parts=None):
+        outfile = self.config['output_dir'] / f"{outfile_stem}.xlsx"
+
+        total_rows = sum(len(df) for df in final_data_sheets.values())
+        streaming = self._use_xlsx_streaming(total_rows)
+        if streaming:
+            self.progress.emit(get_string('log_xlsx_streaming', rows=total_rows))
+
+        options = {'strings_to_urls': False, 'constant_memory': streaming}
+        with pd.ExcelWriter(str(outfile), engine='xlsxwriter', engine_kwargs={'options': options},
                             datetime_format='yyyy-mm-dd hh:mm:ss', date_format='yyyy-mm-dd') as writer:
-            self._write_formatted_sheets(writer, final_data_sheets)
-            self._add_charts_to_report(writer, all_report_data)
+            self._write_formatted_sheets(writer, final_data_sheets, lang, streaming, sheet_parts)
+            self._add_charts_to_report(writer, all_report_data, lang)
 
         return outfile
 
-    def _write_formatted_sheets(self, writer, dataframes_dict: dict):
-        """Writes and formats multiple DataFrames to a single Excel writer object."""
-        workbook = writer.book
+    def _use_xlsx_streaming(self, total_rows: int) -> bool:
+        """Resolves config 'xlsx_streaming' ('auto', 'on' or 'off') for a report of total_rows rows."""
+        mode = str(self.config.get('xlsx_streaming', 'auto')).lower()
+        if mode in ('on', 'true'):
+            return True
+        if mode in ('off', 'false'):
+            return False
+        return total_rows >= XLSX_STREAMING_MIN_ROWS
+
+    def _filename_period(self) -> str:
+        period_start, period_end = self.period
+        if len(self.periods) == 1 and period_label(self.period) == period_start.strftime('%Y-%m'):
+            return period_start.strftime('%Y_%m')
+        return f"{period_start:%Y%m%d}-{period_end:%Y%m%d}"
+
+    def _plan_sheet_parts(self, final_data_sheets: dict) -> dict:
+        """Splits sheets longer than Excel's row limit into continuation sheets, from row counts alone."""
+        max_rows = min(int(self.config.get('max_sheet_rows', EXCEL_MAX_DATA_ROWS)), EXCEL_MAX_DATA_ROWS)
+        sheet_parts = {}
+        for sheet_name, df in final_data_sheets.items():
+            sheet_parts[sheet_name] = excel_sheet_parts(sheet_name, len(df), max_rows)
+            if len(sheet_parts[sheet_name]) > 1:
+                self.progress.emit(get_string('log_sheet_split', sheet_name=sheet_name, rows=len(df),
+                                              parts=len(sheet_parts[sheet_name])))
+        return sheet_parts
+
+    def _column_widths(self, df: pd.DataFrame, lang: str) -> list:
+        widths = []
+        for col in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                widths.append(20)
+            elif str(col) == translate(lang, 'col_tags'):
+                widths.append(80)
+            else:
+                widths.append(column_width(df[col], col))
+        return widths
+
+    def _write_formatted_sheets(self, writer, dataframes_dict: dict, lang: str, streaming: bool = False,
+                                sheet_parts=None):
+        """Writes and formats multiple DataFrames to a single Excel writer object.
+
+        Sheets listed in sheet_parts with several parts are written as continuation sheets
+        ("Problems (2)", ...) sharing the column widths computed once for the whole sheet.
+        """
+        formats = stream_formats(writer.book) if streaming else None
         for sheet_name, df in dataframes_dict.items():
             if df.empty:
                 self.progress.emit(get_string('log_warn_empty_sheet', sheet_name=sheet_name))
                 continue
 
+            column_widths = self._column_widths(df, lang)
+            parts = (sheet_parts or {}).get(sheet_name) or [(sheet_name, 0, len(df))]
+            for part_name, start, stop in parts:
+                part = df if (start, stop) == (0, len(df)) else df.iloc[start:stop]
+                self._write_formatted_sheet(writer, part_name, part, column_widths, lang, formats)
+
+    def _write_formatted_sheet(self, writer, sheet_name: str, df: pd.DataFrame, column_widths: list, lang: str,
+                               formats=None):
+        """Writes one sheet as a styled table with frozen header and severity/SLA colors.
+
+        With formats (streaming mode, xlsxwriter constant_memory) rows are written in order
+        straight from the columns, and the table, which that mode does not support, becomes
+        a styled header, an autofilter and banded rows.
+        """
+        workbook = writer.book
+        streaming = formats is not None
+        (max_row, max_col) = df.shape
+        if streaming:
+            worksheet = workbook.add_worksheet(sheet_name)
+            stream_dataframe(worksheet, df, formats)
+            worksheet.autofilter(0, 0, max_row, max_col - 1)
+        else:
             df.to_excel(writer, sheet_name=sheet_name, index=False, header=False, startrow=1)
             worksheet = writer.sheets[sheet_name]
-
-            (max_row, max_col) = df.shape
             column_settings = [{'header': str(column)} for column in df.columns]
             worksheet.add_table(0, 0, max_row, max_col - 1,
                                 {'columns': column_settings, 'style': 'Table Style Medium 9'})
 
-            for i, col in enumerate(df.columns):
-                if pd.api.types.is_datetime64_any_dtype(df[col]):
-                    worksheet.set_column(i, i, 20)
-                elif str(col) == get_string('col_tags'):
-                    worksheet.set_column(i, i, 80)
-                else:
-                    column_len = max(df[col].astype(str).str.len().max(), len(str(col)))
-                    worksheet.set_column(i, i, min(column_len + 2, 60))
-
-            severity_col_name = get_string('col_severity')
-            if severity_col_name in df.columns:
-                severity_col_idx = df.columns.get_loc(severity_col_name)
-                severity_formats = {
-                    get_string('sev_disaster'): workbook.add_format({'bg_color': '#FFC7CE', 'font_color': '#9C0006'}),
-                    get_string('sev_high'): workbook.add_format({'bg_color': '#FFEB9C', 'font_color': '#9C6500'}),
-                    get_string('sev_average'): workbook.add_format({'bg_color': '#FFFFCC', 'font_color': '#595959'}),
-                }
-                for severity_text, style_format in severity_formats.items():
-                    worksheet.conditional_format(1, severity_col_idx, max_row, severity_col_idx, {
-                        'type': 'cell', 'criteria': '==', 'value': f'"{severity_text}"', 'format': style_format
-                    })
-
-            sla_col_name = get_string('col_sla_status')
-            if sla_col_name in df.columns:
-                sla_col_idx = df.columns.get_loc(sla_col_name)
-                sla_formats = {
-                    get_string('sla_met'): workbook.add_format({'bg_color': '#C6EFCE', 'font_color': '#006100'}),
-                    get_string('sla_violated'): workbook.add_format({'bg_color': '#FFC7CE', 'font_color': '#9C0006'})
-                }
-                for status_text, style_format in sla_formats.items():
-                    worksheet.conditional_format(1, sla_col_idx, max_row, sla_col_idx, {
-                        'type': 'cell', 'criteria': '==', 'value': f'"{status_text}"', 'format': style_format
-                    })
-            worksheet.freeze_panes(1, 0)
-
-    def _add_charts_to_report(self, writer, report_data: dict):
+        for i, width in enumerate(column_widths):
+            worksheet.set_column(i, i, width)
+
+        severity_col_name = translate(lang, 'col_severity')
+        if severity_col_name in df.columns:
+            severity_col_idx = df.columns.get_loc(severity_col_name)
+            severity_formats = {
+                translate(lang, 'sev_disaster'): workbook.add_format({'bg_color': '#FFC7CE', 'font_color': '#9C0006'}),
+                translate(lang, 'sev_high'): workbook.add_format({'bg_color': '#FFEB9C', 'font_color': '#9C6500'}),
+                translate(lang, 'sev_average'): workbook.add_format({'bg_color': '#FFFFCC', 'font_color': '#595959'}),
+            }
+            for severity_text, style_format in severity_formats.items():
+                worksheet.conditional_format(1, severity_col_idx, max_row, severity_col_idx, {
+                    'type': 'cell', 'criteria': '==', 'value': f'"{severity_text}"', 'format': style_format
+                })
+
+        sla_col_name = translate(lang, 'col_sla_status')
+        if sla_col_name in df.columns:
+            sla_col_idx = df.columns.get_loc(sla_col_name)
+            sla_formats = {
+                translate(lang, 'sla_met'): workbook.add_format({'bg_color': '#C6EFCE', 'font_color': '#006100'}),
+                translate(lang, 'sla_violated'): workbook.add_format({'bg_color': '#FFC7CE', 'font_color': '#9C0006'})
+            }
+            for status_text, style_format in sla_formats.items():
+                worksheet.conditional_format(1, sla_col_idx, max_row, sla_col_idx, {
+                    'type': 'cell', 'criteria': '==', 'value': f'"{status_text}"', 'format': style_format
+                })
+        if streaming:
+            # Adicionado por último para não ter prioridade sobre as cores de severidade/SLA
+            worksheet.conditional_format(1, 0, max_row, max_col - 1, {
+                'type': 'formula', 'criteria': '=MOD(ROW(),2)=0', 'format': formats['band']
+            })
+        worksheet.freeze_panes(1, 0)
+
+    def _add_charts_to_report(self, writer, report_data: dict, lang: str):
         """Adds dashboard charts to the Excel report."""
+        # Os gráficos ficam na aba de SLA diário; sem ela (config 'sheets') não há dashboard
+        if 'daily_sla' not in self.report_sheets:
+            return
         if 'Daily SLA Summary' not in report_data or 'Monthly Summary Data' not in report_data:
             self.progress.emit(get_string('log_warn_no_sla_data'))
             return
 
         workbook = writer.book
 
-        daily_sheet_name = get_string('sheet_daily_sla')
-        met_col, violated_col = get_string('col_met'), get_string('col_violated')
-        percent_met_col = get_string('col_percent_met')
+        daily_sheet_name = translate(lang, 'sheet_daily_sla')
+        met_col, violated_col = translate(lang, 'col_met'), translate(lang, 'col_violated')
+        percent_met_col = translate(lang, 'col_percent_met')
 
         daily_df_orig = report_data['Daily SLA Summary']
         worksheet = writer.sheets[daily_sheet_name]
@@ -419,10 +1885,10 @@ class ReportGenerator(QObject):
         num_rows = len(daily_df_orig)
 
         daily_df = daily_df_orig.rename(columns={
-            get_string('sla_met'): met_col,
-            get_string('sla_violated'): violated_col,
+            'sla_met': met_col,
+            'sla_violated': violated_col,
             '% Met': percent_met_col,
-            'Date': get_string('col_date')
+            'Date': translate(lang, 'col_date')
         })
 
         column_chart.add_series({
@@ -451,14 +1917,15 @@ class ReportGenerator(QObject):
         })
 
         column_chart.combine(line_chart)
-        column_chart.set_title({'name': get_string('chart_daily_sla_title')})
-        column_chart.set_x_axis({'name': get_string('chart_daily_sla_x'), 'date_axis': True})
-        column_chart.set_y_axis({'name': get_string('chart_daily_sla_y')})
-        column_chart.set_y2_axis({'name': get_string('chart_daily_sla_y2'), 'min': 0, 'max': 100})
+        column_chart.set_title({'name': translate(lang, 'chart_daily_sla_title')})
+        column_chart.set_x_axis({'name': translate(lang, 'chart_daily_sla_x'), 'date_axis': True})
+        column_chart.set_y_axis({'name': translate(lang, 'chart_daily_sla_y')})
+        column_chart.set_y2_axis({'name': translate(lang, 'chart_daily_sla_y2'), 'min': 0, 'max': 100})
         worksheet.insert_chart('G2', column_chart, {'x_scale': 2.5, 'y_scale': 1.5})
 
         monthly_df = report_data['Monthly Summary Data']
-        sheet_name = get_string('sheet_dashboard')
+        monthly_df = monthly_df.assign(Status=[translate(lang, status) for status in monthly_df['Status']])
+        sheet_name = translate(lang, 'sheet_dashboard')
         worksheet = workbook.add_worksheet(sheet_name)
         worksheet.write_row('A1', monthly_df.columns)
         for r, row in enumerate(monthly_df.values):
@@ -467,21 +1934,21 @@ class ReportGenerator(QObject):
 
         col_chart_monthly = workbook.add_chart({'type': 'column'})
         col_chart_monthly.add_series({
-            'name': get_string('chart_monthly_bar_name'),
+            'name': translate(lang, 'chart_monthly_bar_name'),
             'categories': [sheet_name, 1, 0, num_rows, 0],
             'values': [sheet_name, 1, 1, num_rows, 1],
             'points': [{'fill': {'color': '#00B050'}}, {'fill': {'color': '#C00000'}}],
         })
-        col_chart_monthly.set_title({'name': get_string('chart_monthly_bar_title')})
+        col_chart_monthly.set_title({'name': translate(lang, 'chart_monthly_bar_title')})
         worksheet.insert_chart('D2', col_chart_monthly, {'x_scale': 1.5, 'y_scale': 1.5})
 
         pie_chart = workbook.add_chart({'type': 'pie'})
         pie_chart.add_series({
-            'name': get_string('chart_monthly_pie_name'),
+            'name': translate(lang, 'chart_monthly_pie_name'),
             'categories': [sheet_name, 1, 0, num_rows, 0],
             'values': [sheet_name, 1, 1, num_rows, 1],
             'points': [{'fill': {'color': '#00B050'}}, {'fill': {'color': '#C00000'}}],
             'data_labels': {'percentage': True, 'leader_lines': True},
         })
-        pie_chart.set_title({'name': get_string('chart_monthly_pie_title')})
+        pie_chart.set_title({'name': translate(lang, 'chart_monthly_pie_title')})
         worksheet.insert_chart('M2', pie_chart, {'x_scale': 1.5, 'y_scale': 1.5})
\ No newline at end of file
@@ -0,0 +1,123 @@
+# run_metrics.py
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import psutil
+except ImportError:  # Opcional: sem psutil a memória vem de /proc ou de getrusage
+    psutil = None
+
+# Intervalo de amostragem da memória residente durante as etapas
+RSS_SAMPLE_SECONDS = 0.05
+
+
+def current_rss_bytes() -> int | None:
+    """Resident memory of this process, or the peak so far where only that is available."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RunMetrics:
+    """Per-stage and per-API-method counters of one report run.
+
+    Stages are timed with the stage() context manager while a background thread samples
+    the resident memory, so each stage gets its own peak. API calls are recorded from any
+    thread with record_api().
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now().astimezone().isoformat(timespec='seconds')
+        self.stages = {}
+        self.api = {}
+        self._lock = threading.Lock()
+        self._current = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def _sample_memory(self):
+        while not self._stop.wait(RSS_SAMPLE_SECONDS):
+            self._update_peak()
+
+    def _update_peak(self):
+        rss = current_rss_bytes()
+        with self._lock:
+            if rss is not None and self._current is not None:
+                stage = self.stages[self._current]
+                stage['peak_rss_bytes'] = max(stage['peak_rss_bytes'] or 0, rss)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Times the enclosed block; the yielded dict may receive an 'events' count."""
+        with self._lock:
+            record = self.stages.setdefault(name, {'seconds': 0.0, 'events': None, 'peak_rss_bytes': None})
+            previous, self._current = self._current, name
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample_memory, daemon=True)
+                self._sampler.start()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self._update_peak()
+            with self._lock:
+                record['seconds'] += time.perf_counter() - start
+                self._current = previous
+
+    def record_api(self, method: str, seconds: float, received_bytes: int, retried: bool = False,
+                   failed: bool = False):
+        with self._lock:
+            stats = self.api.setdefault(method, {'calls': 0, 'retries': 0, 'errors': 0, 'seconds': 0.0, 'bytes': 0})
+            stats['calls'] += 1
+            stats['retries'] += int(retried)
+            stats['errors'] += int(failed)
+            stats['seconds'] += seconds
+            stats['bytes'] += received_bytes
+
+    def merge(self, other: dict):
+        """Adds the counters of another run (e.g. a period collected in a worker process)."""
+        with self._lock:
+            for name, theirs in other.get('stages', {}).items():
+                ours = self.stages.setdefault(name, {'seconds': 0.0, 'events': None, 'peak_rss_bytes': None})
+                ours['seconds'] += theirs['seconds']
+                if theirs['events'] is not None:
+                    ours['events'] = (ours['events'] or 0) + theirs['events']
+                if theirs['peak_rss_bytes'] is not None:
+                    ours['peak_rss_bytes'] = max(ours['peak_rss_bytes'] or 0, theirs['peak_rss_bytes'])
+            for method, theirs in other.get('api', {}).items():
+                ours = self.api.setdefault(method, {'calls': 0, 'retries': 0, 'errors': 0, 'seconds': 0.0, 'bytes': 0})
+                for key in ours:
+                    ours[key] += theirs[key]
+
+    def close(self):
+        self._stop.set()
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            stages = {}
+            for name, stage in self.stages.items():
+                rate = stage['events'] / stage['seconds'] if stage['events'] and stage['seconds'] else None
+                stages[name] = dict(stage, seconds=round(stage['seconds'], 3),
+                                    events_per_second=round(rate, 1) if rate else None)
+            return {'started_at': self.started_at, 'stages': stages,
+                    'api': {method: dict(stats, seconds=round(stats['seconds'], 3))
+                            for method, stats in self.api.items()}}
+
+    def write_json(self, path, **extra):
+        with open(path, 'w', encoding='utf-8') as sidecar:
+            json.dump(dict(self.as_dict(), **extra), sidecar, indent=2, default=str)
@@ -0,0 +1,56 @@
+# tests/conftest.py
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+# Módulos do projeto e o servidor Zabbix falso dos benchmarks, sem instalação
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from fake_zabbix import serve  # noqa: E402
+
+
+@pytest.fixture
+def utc_host(monkeypatch):
+    """Runs the test as if the host were configured for UTC."""
+    monkeypatch.setenv('TZ', 'UTC')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture
+def fake_zabbix():
+    """Starts fake Zabbix servers: fake_zabbix(data, **options) -> (fake, url); all stop with the test."""
+    servers = []
+
+    def start(data, **options):
+        server, fake, url = serve(data, **options)
+        servers.append(server)
+        return fake, url
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+@pytest.fixture
+def report_config(tmp_path):
+    """report_config(url, **overrides): engine config of an English February 2024 report, without the cache."""
+    def build(url, **config):
+        return dict({'url': url, 'token': 'token', 'year': 2024, 'month': 2, 'sla_threshold': 20,
+                     'severities': ['3', '4', '5'], 'output_dir': tmp_path, 'cache_enabled': False,
+                     'languages': ['en_US'], 'metrics_sidecar': False}, **config)
+    return build
+
+
+@pytest.fixture
+def exported_sheets():
+    """exported_sheets(export_dir): {file stem: DataFrame} of the .csv.gz sheets the engine exported there."""
+    def read(export_dir):
+        return {path.name[:-len('.csv.gz')]: pd.read_csv(path) for path in sorted(Path(export_dir).glob('*.csv.gz'))}
+    return read
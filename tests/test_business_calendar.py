@@ -0,0 +1,84 @@
+# tests/test_business_calendar.py
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+
+from business_calendar import BusinessCalendar
+
+BERLIN = ZoneInfo('Europe/Berlin')
+OFFICE = {'hours': ['08:00-12:00', '13:00-18:00'], 'holidays': ['2024-12-25', '2024-12-26']}
+
+
+def _clock(*parts) -> int:
+    return int(datetime(*parts, tzinfo=BERLIN).timestamp())
+
+
+def _minute_by_minute(calendar: BusinessCalendar, start: int, end: int) -> int:
+    """Reference W(end) - W(start): every minute whose local wall-clock time is inside a working window."""
+    seconds = 0
+    for minute in range(start, end, 60):
+        local = datetime.fromtimestamp(minute, calendar.timezone)
+        into_day = local.hour * 3600 + local.minute * 60
+        if local.weekday() in calendar.weekdays and local.date() not in calendar.holidays and any(
+                window_start <= into_day < window_end for window_start, window_end in calendar.windows):
+            seconds += 60
+    return seconds
+
+
+def _check(calendar: BusinessCalendar, intervals: list):
+    start, end = (np.array(clocks, dtype=np.int64) for clocks in zip(*intervals))
+    expected = [_minute_by_minute(calendar, s, e) for s, e in intervals]
+    assert calendar.working_seconds(start, end).tolist() == expected
+    return expected
+
+
+def test_overnight_weekend_and_holiday_intervals():
+    calendar = BusinessCalendar.from_config(OFFICE, BERLIN)
+    expected = _check(calendar, [
+        (_clock(2024, 6, 4, 17, 30), _clock(2024, 6, 5, 9, 15)),      # noite de terça para quarta
+        (_clock(2024, 6, 7, 17, 0), _clock(2024, 6, 10, 8, 30)),      # fim de semana
+        (_clock(2024, 6, 8, 10, 0), _clock(2024, 6, 9, 20, 0)),       # só sábado e domingo
+        (_clock(2024, 12, 24, 17, 0), _clock(2024, 12, 27, 9, 0)),    # Natal
+        (_clock(2024, 6, 4, 12, 10), _clock(2024, 6, 4, 12, 50)),     # almoço
+        (_clock(2024, 6, 4, 9, 0), _clock(2024, 6, 18, 9, 0)),        # duas semanas
+    ])
+    assert expected[:5] == [105 * 60, 90 * 60, 0, 2 * 3600, 0]
+    assert expected[5] == 10 * 9 * 3600
+
+
+def test_dst_days_count_their_real_length():
+    always = BusinessCalendar.from_config({'hours': '00:00-24:00', 'weekdays': list(range(7))}, BERLIN)
+    expected = _check(always, [
+        (_clock(2024, 3, 30, 12, 0), _clock(2024, 3, 31, 12, 0)),
+        (_clock(2024, 10, 26, 12, 0), _clock(2024, 10, 27, 12, 0)),
+        (_clock(2024, 3, 31, 1, 30), _clock(2024, 3, 31, 3, 30)),
+    ])
+    assert expected == [23 * 3600, 25 * 3600, 3600]
+
+    # Janela noturna que contém a mudança de horário: 02:00-03:00 não existe em março e se repete em outubro
+    night = BusinessCalendar.from_config({'hours': '01:00-04:00', 'weekdays': list(range(7))}, BERLIN)
+    expected = _check(night, [(_clock(2024, 3, 30, 12, 0), _clock(2024, 3, 31, 12, 0)),
+                              (_clock(2024, 10, 26, 12, 0), _clock(2024, 10, 27, 12, 0))])
+    assert expected == [2 * 3600, 4 * 3600]
+
+
+@pytest.mark.parametrize('timezone', ['Europe/Berlin', 'America/Sao_Paulo', 'Australia/Lord_Howe'])
+def test_random_intervals_around_dst_transitions(timezone):
+    calendar = BusinessCalendar(hours=['00:30-02:45', '08:00-18:00'], weekdays=[0, 1, 2, 3, 4, 6],
+                                holidays=['2024-04-01'], timezone=ZoneInfo(timezone))
+    rng = np.random.default_rng(5)
+    # Março e abril de 2024 (Berlim e Lord Howe mudam o horário); em São Paulo, o fim do horário de verão de 2019
+    base = 1548979200 if timezone == 'America/Sao_Paulo' else 1709251200
+    starts = base + rng.integers(0, 45 * 86400, 40) // 60 * 60
+    ends = starts + rng.integers(-3600, 3 * 86400, 40) // 60 * 60
+    _check(calendar, list(zip(starts.tolist(), ends.tolist())))
+
+
+def test_missing_clocks_and_reversed_intervals():
+    calendar = BusinessCalendar.from_config(OFFICE, BERLIN)
+    result = calendar.working_seconds(np.array([_clock(2024, 6, 4, 9, 0), -1, _clock(2024, 6, 4, 11, 0)]),
+                                      np.array([-1, _clock(2024, 6, 4, 9, 0), _clock(2024, 6, 4, 9, 0)]))
+    assert np.isnan(result[:2]).all()
+    assert result[2] == 0
@@ -0,0 +1,74 @@
+# tests/test_categorical_frames.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from fake_zabbix import SyntheticEvents
+from report_logic import ReportGenerator, categorical_values, relabel_categorical
+
+PROBLEM_CATEGORIES = ['Severity', 'Status', 'Host', 'Problem', 'Ack', 'First Ack User', 'Actions', 'Tags', 'Period']
+ACK_CATEGORIES = ['Host', 'Problem', 'User', 'Action Type', 'Period']
+
+
+@pytest.fixture
+def collected(utc_host, fake_zabbix, report_config):
+    data = SyntheticEvents(2024, 2, events_per_day=200, ack_rate=0.7)
+    _, url = fake_zabbix(data)
+    generator = ReportGenerator(report_config(url, sheets=['problems', 'actions', 'top_10', 'user_productivity']))
+    df_problems, df_acks = generator.collect_period()[:2]
+    return data, generator, df_problems, df_acks
+
+
+def test_repeated_columns_are_categorical_and_compact(collected):
+    data, _, df_problems, df_acks = collected
+    assert all(isinstance(df_problems[col].dtype, pd.CategoricalDtype) for col in PROBLEM_CATEGORIES)
+    assert all(isinstance(df_acks[col].dtype, pd.CategoricalDtype) for col in ACK_CATEGORIES)
+
+    # Os códigos decodificam para os mesmos valores que o servidor mandou
+    positions = (df_problems['EventID'].astype(int).to_numpy() - 1002) // 2
+    host_names = {int(host['hostid']): host['name'] for host in data.hosts}
+    assert df_problems['Problem'].astype(str).tolist() == [data.names[data.name_idx[i]] for i in positions]
+    assert df_problems['Host'].astype(str).tolist() == [host_names[10000 + int(data.host_idx[i])] for i in positions]
+    assert df_problems['Problem'].cat.categories.is_monotonic_increasing
+
+    for df, columns in ((df_problems, PROBLEM_CATEGORIES), (df_acks, ACK_CATEGORIES)):
+        categorical = df[columns].memory_usage(deep=True).sum()
+        as_strings = df[columns].astype(object).memory_usage(deep=True).sum()
+        assert as_strings > 5 * categorical
+
+
+def test_groupings_on_codes_match_plain_strings(collected):
+    _, generator, df_problems, _ = collected
+    reports = generator._generate_sla_reports(df_problems)
+    plain = df_problems.astype({col: object for col in ('Problem', 'First Ack User')})
+
+    top_10 = reports['Top 10 Problems']
+    expected = plain.groupby('Problem').size().sort_values(ascending=False, kind='stable').head(10)
+    assert top_10['Count'].tolist() == expected.tolist()
+    assert set(top_10['Problem'].astype(str)) <= set(plain['Problem'])
+
+    acked = plain[plain['First Ack Time'].notna()]
+    by_user = reports['User Productivity'].set_index('First Ack User')['Total_Acks']
+    assert {str(user): count for user, count in by_user.items()} == acked.groupby('First Ack User').size().to_dict()
+
+
+def test_final_sheets_stay_categorical_after_translation(collected):
+    _, generator, df_problems, df_acks = collected
+    sheets = generator._build_final_sheets(df_problems, df_acks, generator._generate_sla_reports(df_problems),
+                                           'en_US')
+    problems = sheets['Problems']
+    assert isinstance(problems['Severity'].dtype, pd.CategoricalDtype)
+    assert set(problems['Severity'].cat.categories) <= {'Average', 'High', 'Disaster'}
+    assert (problems['Status'].astype(str).isin(['Resolved', 'Problem'])).all()
+
+
+def test_relabeling_merges_categories_and_fills_missing_values():
+    values = pd.Series(categorical_values(['b', 'a', None, 'c', 'a'], lambda key: key))
+    assert values.cat.categories.tolist() == ['a', 'b', 'c'] and values.isna().sum() == 1
+
+    relabeled = pd.Series(relabel_categorical(values, lambda key: 'x' if key in ('a', 'c') else key.upper(),
+                                              missing_label='-'))
+    assert relabeled.tolist() == ['B', 'x', '-', 'x', 'x']
+    assert relabeled.cat.categories.tolist() == ['-', 'B', 'x']
+    assert relabel_categorical(values, str.upper).isna().sum() == 1
+    assert len(relabel_categorical(values.iloc[:0], str.upper)) == 0
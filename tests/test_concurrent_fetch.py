@@ -0,0 +1,60 @@
+# tests/test_concurrent_fetch.py
+import re
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from fake_zabbix import SyntheticEvents
+from report_logic import ReportGenerator
+
+
+class InFlight:
+    """Wraps FakeZabbix.handle to measure how many event.get pages the server answers at once."""
+
+    def __init__(self, handle, delay: float):
+        self.handle, self.delay = handle, delay
+        self.current = self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, method, params):
+        if method != 'event.get' or params.get('countOutput') or 'eventids' in params:
+            return self.handle(method, params)
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        try:
+            time.sleep(self.delay)
+            return self.handle(method, params)
+        finally:
+            with self._lock:
+                self.current -= 1
+
+
+@pytest.mark.parametrize('fetch_workers', [1, 4])
+def test_windows_are_fetched_concurrently_and_merged_in_order(utc_host, fake_zabbix, report_config, fetch_workers):
+    data = SyntheticEvents(2024, 2, events_per_day=30)
+    fake, url = fake_zabbix(data)
+    in_flight = fake.handle = InFlight(fake.handle, delay=0.05)
+    # Sem limite de taxa: só o pool de busca limita as páginas simultâneas
+    generator = ReportGenerator(report_config(url, max_window_events=60, fetch_workers=fetch_workers,
+                                              api_rate_limit=0))
+    messages = []
+    generator.progress.connect(messages.append)
+    df_problems = generator.collect_period()[0]
+
+    # Nunca mais páginas ao mesmo tempo do que fetch_workers, e de fato em paralelo quando há mais de um
+    assert in_flight.peak == fetch_workers
+
+    # Uma mensagem de progresso por janela concluída, numeradas na ordem de conclusão
+    planned = int(re.search(r'into (\d+) fetch windows', ' '.join(messages)).group(1))
+    done = [re.match(r'Window (\d+)/(\d+) done', message) for message in messages]
+    done = [(int(match.group(1)), int(match.group(2))) for match in done if match]
+    assert planned > fetch_workers
+    assert done == [(number, planned) for number in range(1, planned + 1)]
+
+    # A tabela final segue clock/eventid, qualquer que seja a ordem de chegada das janelas
+    expected = data.eventid[np.isin(data.severity, [3, 4, 5])]
+    assert df_problems['EventID'].astype(int).tolist() == expected.tolist()
+    assert df_problems['Time'].is_monotonic_increasing
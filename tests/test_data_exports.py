@@ -0,0 +1,51 @@
+# tests/test_data_exports.py
+import io
+
+import pandas as pd
+import pytest
+
+from fake_zabbix import SyntheticEvents
+from report_logic import ReportGenerator
+
+
+def test_parquet_and_csv_read_back_as_the_final_sheets(utc_host, fake_zabbix, report_config, exported_sheets):
+    _, url = fake_zabbix(SyntheticEvents(2024, 2, events_per_day=40, tags_per_event=1.5))
+    config = report_config(url, output_formats=['parquet', 'csv'])
+    generator = ReportGenerator(config)
+    final_sheets = {}
+    build_final_sheets = generator._build_final_sheets
+
+    def keep_final_sheets(*args):
+        final_sheets.update(build_final_sheets(*args))
+        return final_sheets
+    generator._build_final_sheets = keep_final_sheets
+    export_dir = generator.generate()
+
+    # Sem xlsx: nada de planilha, nem a etapa de formatação
+    assert not list(config['output_dir'].glob('*.xlsx'))
+    assert 'write_xlsx' not in generator.metrics.as_dict()['stages']
+    assert export_dir.parent == config['output_dir']
+
+    stems = {'Problems': 'problems', 'Actions': 'actions', 'SLA Details': 'sla_details',
+             'Top 10 Problems': 'top_10_problems', 'User Productivity': 'user_productivity'}
+    assert set(stems) <= set(final_sheets)
+    exported_csv = exported_sheets(export_dir)
+    assert sorted(path.stem for path in export_dir.glob('*.parquet')) == sorted(exported_csv)
+    for sheet, stem in stems.items():
+        df = final_sheets[sheet].reset_index(drop=True)
+        # Parquet guarda os tipos: datas, durações e categorias voltam iguais
+        parquet = pd.read_parquet(export_dir / f"{stem}.parquet")
+        pd.testing.assert_frame_equal(parquet, df, check_categorical=False, obj=stem)
+        # CSV guarda o texto: o mesmo que o frame escrito e lido de volta sem compressão
+        pd.testing.assert_frame_equal(exported_csv[stem], pd.read_csv(io.StringIO(df.to_csv(index=False))), obj=stem)
+
+    problems = pd.read_parquet(export_dir / 'problems.parquet')
+    assert isinstance(problems['Severity'].dtype, pd.CategoricalDtype)
+    assert str(problems['Time'].dtype).startswith('datetime64')
+    assert str(problems['Duration'].dtype).startswith('timedelta64')
+
+
+def test_unknown_output_format_is_rejected_before_fetching(report_config):
+    generator = ReportGenerator(report_config('http://zabbix.invalid/api_jsonrpc.php', output_formats=['xlsx', 'ods']))
+    with pytest.raises(ValueError, match='ods'):
+        generator.generate()
@@ -0,0 +1,198 @@
+# tests/test_event_cache.py
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+import event_cache
+from event_cache import EventCache
+
+URL = 'http://zabbix.example/api_jsonrpc.php'
+
+
+def _events(first_eventid: int, count: int, size: int = 100) -> list:
+    return [(eventid, [eventid, 'x' * size]) for eventid in range(first_eventid, first_eventid + count)]
+
+
+def _checkpoint(last_eventid: int) -> dict:
+    return {'last_eventid': last_eventid, 'last_clock': 0, 'recheck_eventids': []}
+
+
+def _period_bytes(cache: EventCache, period: str) -> tuple:
+    """(size recorded in the checkpoint, size of the payloads actually stored) of a period."""
+    return cache._conn.execute(
+        "SELECT size_bytes, (SELECT SUM(LENGTH(payload)) FROM checkpoint_events e WHERE e.period = c.period) "
+        "FROM checkpoints c WHERE period = ?", (period,)).fetchone()
+
+
+def _run_in_thread(func, timeout: float = 5.0) -> bool:
+    """Runs func in another thread; True when it finished within timeout."""
+    thread = threading.Thread(target=func, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+def test_days_round_trip_in_eventid_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_cache, 'READ_PAGE_ROWS', 7)
+    cache = EventCache(tmp_path / 'cache.sqlite3')
+    day = date(2024, 2, 1)
+    cache.store_days(URL, 'q', {day: reversed(_events(1, 30))})
+    assert cache.stored_days(URL, 'q', [day, day + timedelta(days=1)]) == {day}
+    assert [payload[0] for payload in cache.iter_events(URL, 'q', [day])] == list(range(1, 31))
+    cache.close()
+
+
+def test_paused_iteration_does_not_block_other_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_cache, 'READ_PAGE_ROWS', 10)
+    cache = EventCache(tmp_path / 'cache.sqlite3')
+    day = date(2024, 2, 1)
+    cache.store_days(URL, 'q', {day: _events(1, 25)})
+    cache.store_checkpoint(URL, 'q', 'p', {'last_eventid': 25, 'last_clock': 0, 'recheck_eventids': [3]},
+                           _events(1, 25), replace=True)
+
+    for paused in (cache.iter_events(URL, 'q', [day]), cache.iter_checkpoint_events(URL, 'q', 'p', skip=[1])):
+        first = next(paused)
+        assert _run_in_thread(lambda: cache.put_lookup(URL, 'host', {'10001': 'host-1'}))
+        assert _run_in_thread(lambda: cache.stored_days(URL, 'q', [day]))
+        assert len([first, *paused]) in (25, 24)
+    # Uma iteração abandonada também não pode deixar o lock preso
+    abandoned = cache.iter_events(URL, 'q', [day])
+    next(abandoned)
+    del abandoned
+    assert _run_in_thread(lambda: cache.get_lookup(URL, 'host', ['10001']))
+    cache.close()
+
+
+def test_checkpoint_iteration_skips_rechecked_events(tmp_path):
+    cache = EventCache(tmp_path / 'cache.sqlite3')
+    cache.store_checkpoint(URL, 'q', 'p', {'last_eventid': 5, 'last_clock': 0, 'recheck_eventids': []},
+                           _events(1, 5), replace=True)
+    assert [payload[0] for payload in cache.iter_checkpoint_events(URL, 'q', 'p', skip=['2', 4])] == [1, 3, 5]
+    cache.close()
+
+
+def test_eviction_drops_least_recently_used_days_first(tmp_path):
+    cache = EventCache(tmp_path / 'cache.sqlite3', max_mb=0.01)
+    days = [date(2024, 2, 1) + timedelta(days=n) for n in range(4)]
+    for day in days:
+        cache.store_days(URL, 'q', {day: _events(1, 20, size=150)})
+        time.sleep(0.01)
+    # Cada dia tem ~3 kB: cabem três nos ~10 kB, e o primeiro, usado há mais tempo, sai
+    assert cache.stored_days(URL, 'q', days) == set(days[1:])
+    assert cache.stored_bytes() <= cache.max_bytes
+    cache.close()
+
+
+def test_lookups_count_against_the_size_limit(tmp_path):
+    cache = EventCache(tmp_path / 'cache.sqlite3', max_mb=0.01)
+    cache.put_lookup(URL, 'recovery', {str(eventid): '1700000000' for eventid in range(100)})
+    time.sleep(0.01)
+    cache.put_lookup(URL, 'recovery', {str(eventid): '1700000000' for eventid in range(1000, 1700)})
+    assert cache.stored_bytes() <= cache.max_bytes
+    # As recuperações mais antigas saem antes das recentes
+    assert not cache.get_lookup(URL, 'recovery', ['0', '1'])
+    assert cache.get_lookup(URL, 'recovery', ['1699']) == {'1699': '1700000000'}
+
+    time.sleep(0.01)
+    cache.store_days(URL, 'q', {date(2024, 2, 1): _events(1, 20)})
+    assert cache.stored_days(URL, 'q', [date(2024, 2, 1)]) == {date(2024, 2, 1)}
+    assert cache.stored_bytes() <= cache.max_bytes
+    cache.close()
+
+
+def test_expired_names_count_as_missing(tmp_path):
+    cache = EventCache(tmp_path / 'cache.sqlite3')
+    cache.put_lookup(URL, 'host', {'10001': 'old-host', '10002': 'web'})
+    time.sleep(0.2)
+    cache.put_lookup(URL, 'host', {'10002': 'web-renamed', '10003': 'db'})
+    assert cache.get_lookup(URL, 'host', ['10001', '10002', '10003'], max_age=0.1) == {
+        '10002': 'web-renamed', '10003': 'db'}
+    # Sem TTL a entrada antiga continua valendo; outro servidor ou tipo não enxerga nada
+    assert cache.get_lookup(URL, 'host', ['10001'])['10001'] == 'old-host'
+    assert not cache.get_lookup('http://other.example/api_jsonrpc.php', 'host', ['10002'])
+    assert not cache.get_lookup(URL, 'user', ['10002'])
+    cache.close()
+
+
+def test_name_entries_beyond_the_bound_drop_the_oldest(tmp_path):
+    cache = EventCache(tmp_path / 'cache.sqlite3')
+    for first in range(0, 30, 10):
+        cache.put_lookup(URL, 'user', {str(userid): f"user{userid}" for userid in range(first, first + 10)},
+                         max_entries=15)
+        time.sleep(0.01)
+    cache.put_lookup(URL, 'host', {'1': 'h'}, max_entries=15)
+    found = cache.get_lookup(URL, 'user', [str(userid) for userid in range(30)])
+    assert len(found) == 15 and {str(userid) for userid in range(20, 30)} <= set(found)
+    assert not set(found) & {str(userid) for userid in range(10)}
+    # O limite vale por tipo: os usuários não expulsam os hosts
+    assert cache.get_lookup(URL, 'host', ['1']) == {'1': 'h'}
+    cache.close()
+
+
+def test_checkpoint_size_follows_rewritten_and_deleted_events(tmp_path):
+    cache = EventCache(tmp_path / 'cache.sqlite3')
+    cache.store_checkpoint(URL, 'q', 'p', _checkpoint(30), _events(1, 30), replace=True)
+    recorded, actual = _period_bytes(cache, 'p')
+    assert recorded == actual
+    # Reconsultados com payload maior, novos eventos e eventos apagados no Zabbix
+    cache.store_checkpoint(URL, 'q', 'p', _checkpoint(40), _events(25, 16, size=300), deleted=[2, 3, 26])
+    recorded, actual = _period_bytes(cache, 'p')
+    assert recorded == actual
+    assert cache.stored_bytes() == actual
+    cache.close()
+
+
+def test_stored_periods_are_evicted_before_days(tmp_path):
+    cache = EventCache(tmp_path / 'cache.sqlite3', max_mb=0.01)
+    cache.store_days(URL, 'q', {date(2024, 2, 1): _events(1, 20, size=200)})
+    time.sleep(0.01)
+    cache.store_checkpoint(URL, 'q', '2024-01', _checkpoint(20), _events(1, 20, size=200), replace=True)
+    time.sleep(0.01)
+    cache.store_checkpoint(URL, 'q', '2024-02', _checkpoint(20), _events(1, 20, size=200), replace=True)
+    # O período mais antigo sai, mesmo tendo sido atualizado depois do dia guardado
+    assert cache.load_checkpoint(URL, 'q', '2024-01') is None
+    assert cache.load_checkpoint(URL, 'q', '2024-02') is not None
+    assert cache.stored_days(URL, 'q', [date(2024, 2, 1)]) == {date(2024, 2, 1)}
+    assert cache.stored_bytes() <= cache.max_bytes
+
+    # O período que acabou de ser gravado fica, mesmo acima do limite
+    cache.store_checkpoint(URL, 'q', '2024-03', _checkpoint(80), _events(1, 80, size=200), replace=True)
+    assert cache.load_checkpoint(URL, 'q', '2024-03') is not None
+    assert cache.load_checkpoint(URL, 'q', '2024-02') is None
+    assert not cache.stored_days(URL, 'q', [date(2024, 2, 1)])
+    cache.close()
+
+
+def test_only_the_most_recent_periods_are_kept(tmp_path):
+    cache = EventCache(tmp_path / 'cache.sqlite3')
+    for month in range(1, 5):
+        cache.store_checkpoint(URL, 'q', f"2024-0{month}", _checkpoint(5), _events(1, 5), replace=True, keep=2)
+        time.sleep(0.01)
+    assert [month for month in range(1, 5) if cache.load_checkpoint(URL, 'q', f"2024-0{month}")] == [3, 4]
+    assert cache._conn.execute("SELECT COUNT(DISTINCT period) FROM checkpoint_events").fetchone()[0] == 2
+    cache.close()
+
+
+def test_caches_without_period_sizes_are_migrated(tmp_path):
+    path = tmp_path / 'cache.sqlite3'
+    conn = sqlite3.connect(str(path))
+    conn.executescript("""
+        CREATE TABLE checkpoints (
+            url TEXT NOT NULL, query_key TEXT NOT NULL, period TEXT NOT NULL,
+            last_eventid INTEGER NOT NULL, last_clock INTEGER NOT NULL, recheck_eventids TEXT NOT NULL,
+            event_count INTEGER NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (url, query_key, period));
+        CREATE TABLE checkpoint_events (
+            url TEXT NOT NULL, query_key TEXT NOT NULL, period TEXT NOT NULL,
+            eventid INTEGER NOT NULL, payload TEXT NOT NULL, PRIMARY KEY (url, query_key, period, eventid));
+    """)
+    conn.execute("INSERT INTO checkpoints VALUES (?, 'q', 'p', 2, 0, '[]', 2, 0)", (URL,))
+    conn.executemany("INSERT INTO checkpoint_events VALUES (?, 'q', 'p', ?, ?)",
+                     [(URL, 1, 'x' * 10), (URL, 2, 'y' * 5)])
+    conn.commit()
+    conn.close()
+
+    cache = EventCache(path)
+    assert cache.stored_bytes() == 15
+    assert cache.load_checkpoint(URL, 'q', 'p')['last_eventid'] == 2
+    cache.close()
@@ -0,0 +1,74 @@
+# tests/test_event_projection.py
+import pandas as pd
+import pytest
+
+from fake_zabbix import SyntheticEvents
+from report_logic import ReportGenerator
+
+BASIC = {'output': ['eventid', 'clock', 'severity', 'name', 'r_eventid', 'acknowledged'], 'selectHosts': ['hostid']}
+FIRST_ACK = {'select_acknowledges': ['clock', 'userid']}
+ALL_ACKS = {'select_acknowledges': ['clock', 'userid', 'action', 'message']}
+TAGS = {'selectTags': ['tag', 'value']}
+ALERTS = {'select_alerts': 'count'}
+
+
+def _projection(**config) -> dict:
+    return ReportGenerator(dict({'url': 'http://zabbix.invalid/api_jsonrpc.php', 'token': 'token', 'year': 2024,
+                                 'month': 2}, **config))._event_projection()
+
+
+@pytest.mark.parametrize('config, selects', [
+    ({'sheets': ['daily_volume', 'top_10']}, {}),
+    ({'sheets': ['problems'], 'problem_columns': ['Time', 'Host', 'Problem']}, {}),
+    ({'sheets': ['problems'], 'problem_columns': ['Time', 'Tags']}, TAGS),
+    ({'sheets': ['problems']}, dict(TAGS, **ALERTS)),
+    ({'sheets': ['sla_details', 'user_productivity']}, FIRST_ACK),
+    ({'sheets': ['actions', 'sla_details']}, ALL_ACKS),
+    ({'sheets': ['sla_breakdown']}, FIRST_ACK),
+    ({'sheets': ['sla_breakdown'], 'breakdown_tags': ['service']}, dict(FIRST_ACK, **TAGS)),
+    ({'sheets': ['top_10'], 'breakdown_tags': ['service']}, {}),
+    ({}, dict(TAGS, **ALERTS, **ALL_ACKS)),
+])
+def test_only_the_fields_of_the_selected_outputs_are_requested(config, selects):
+    assert _projection(**config) == dict(BASIC, **selects)
+
+
+def test_unknown_sheets_and_columns_are_rejected():
+    with pytest.raises(ValueError, match='dashboard'):
+        _projection(sheets=['problems', 'dashboard'])
+    with pytest.raises(ValueError, match='Owner'):
+        _projection(problem_columns=['Time', 'Owner'])
+
+
+def test_projected_runs_match_the_full_report(utc_host, fake_zabbix, report_config, exported_sheets, tmp_path):
+    fake, url = fake_zabbix(SyntheticEvents(2024, 2, events_per_day=60, ack_rate=0.8, tags_per_event=4.0))
+    pages = []
+    handle = fake.handle
+
+    def record_pages(method, params):
+        if method == 'event.get' and 'time_from' in params and not params.get('countOutput'):
+            pages.append(params)
+        return handle(method, params)
+    fake.handle = record_pages
+
+    def run(name, **config):
+        pages.clear()
+        generator = ReportGenerator(report_config(url, output_formats=['csv'], output_dir=tmp_path / name, **config))
+        sheets = exported_sheets(generator.generate())
+        return sheets, list(pages), generator.metrics.as_dict()['api']['event.get']['bytes']
+
+    full, full_pages, full_bytes = run('full')
+    volume, volume_pages, volume_bytes = run('volume', sheets=['daily_volume', 'top_10'])
+    columns = ['Time', 'Severity', 'Problem']
+    narrow, narrow_pages, narrow_bytes = run('narrow', sheets=['problems'], problem_columns=columns)
+
+    assert all('select_acknowledges' in page and 'selectTags' in page for page in full_pages)
+    for page in volume_pages + narrow_pages:
+        assert page.keys() & {'select_acknowledges', 'selectTags', 'select_alerts'} == set()
+    # Menos bytes na rede, mesmo resultado nas abas que não precisam dos campos omitidos
+    assert volume_bytes < full_bytes / 2 and narrow_bytes < full_bytes / 2
+    for stem in ('daily_event_volume', 'top_10_problems'):
+        pd.testing.assert_frame_equal(volume[stem], full[stem], obj=stem)
+    assert list(volume) == ['daily_event_volume', 'top_10_problems']
+    assert list(narrow['problems'].columns) == columns
+    pd.testing.assert_frame_equal(narrow['problems'], full['problems'][columns])
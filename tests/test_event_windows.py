@@ -0,0 +1,74 @@
+# tests/test_event_windows.py
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import numpy as np
+import pytest
+
+from fake_zabbix import SyntheticEvents
+from report_logic import MIN_WINDOW_SECONDS, ReportGenerator
+
+SEVERITIES = [3, 4, 5]
+
+
+def _reference_windows(clocks: np.ndarray, time_from: int, time_till: int, max_events: int) -> list:
+    """Halves [time_from, time_till] recursively until each part holds max_events or is too short to split."""
+    count = int(((clocks >= time_from) & (clocks <= time_till)).sum())
+    if count == 0:
+        return []
+    if count <= max_events or time_till - time_from < 2 * MIN_WINDOW_SECONDS:
+        return [(time_from, time_till, count)]
+    middle = (time_from + time_till) // 2
+    return (_reference_windows(clocks, time_from, middle, max_events)
+            + _reference_windows(clocks, middle + 1, time_till, max_events))
+
+
+@pytest.fixture
+def storm_server(utc_host, fake_zabbix):
+    """February 2024 with quiet days and two alert storms of 600 events in ten minutes."""
+    data = SyntheticEvents(2024, 2, events_per_day=20, storms=2, storm_size=600)
+    fake, url = fake_zabbix(data)
+    return data, fake, url
+
+
+@pytest.mark.parametrize('max_window_events', [200, 5])
+def test_windows_are_halved_only_where_events_pile_up(storm_server, report_config, max_window_events):
+    data, _, url = storm_server
+    generator = ReportGenerator(report_config(url, max_window_events=max_window_events))
+    time_from = generator._day_bounds(date(2024, 2, 1))[0]
+    time_till = generator._day_bounds(date(2024, 2, 29))[1]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        windows = generator._plan_event_windows(pool, time_from, time_till)
+
+    clocks = data.clock[np.isin(data.severity, SEVERITIES)]
+    assert windows == _reference_windows(clocks, time_from, time_till, max_window_events)
+    # Janelas em ordem, sem sobreposição, cobrindo cada evento exatamente uma vez
+    assert all(previous[1] < current[0] for previous, current in zip(windows, windows[1:]))
+    assert sum(count for _, _, count in windows) == len(clocks)
+    for w_from, w_till, count in windows:
+        assert count <= max_window_events or w_till - w_from < 2 * MIN_WINDOW_SECONDS
+    # Só as tempestades descem a poucos minutos; com 200 eventos os dias calmos ficam em janelas de vários dias
+    assert min(w_till - w_from for w_from, w_till, _ in windows) < 600
+    if max_window_events == 200:
+        assert max(w_till - w_from for w_from, w_till, _ in windows) > 7 * 86400
+    else:
+        # Piso de MIN_WINDOW_SECONDS: uma tempestade não é dividida em janelas de segundos
+        assert any(count > 5 for _, _, count in windows)
+        assert min(w_till - w_from for w_from, w_till, _ in windows) >= MIN_WINDOW_SECONDS - 1
+
+
+def test_every_event_arrives_exactly_once(storm_server, report_config):
+    data, fake, url = storm_server
+    generator = ReportGenerator(report_config(url, max_window_events=200, event_page_size=50, fetch_workers=4))
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        events = generator._fetch_all_events(pool, generator._related_lookup(pool, 'recovery'))
+        windows = generator._plan_event_windows(pool, generator._day_bounds(date(2024, 2, 1))[0],
+                                                generator._day_bounds(date(2024, 2, 29))[1])
+
+    eventids = np.frombuffer(events.eventid, dtype=np.int64)
+    expected = data.eventid[np.isin(data.severity, SEVERITIES)]
+    # Várias páginas por janela (cursor de eventid) e nenhuma repetida ou perdida
+    assert any(count > 50 for _, _, count in windows)
+    assert len(eventids) == len(expected)
+    assert sorted(eventids.tolist()) == expected.tolist()
+    assert len(events.sorted_indices()) == len(expected)
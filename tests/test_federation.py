@@ -0,0 +1,36 @@
+# tests/test_federation.py
+import numpy as np
+
+from fake_zabbix import SyntheticEvents
+from report_logic import ReportGenerator
+
+
+def test_servers_are_collected_into_one_report(utc_host, fake_zabbix, report_config, exported_sheets):
+    # Os dois servidores numeram eventos e usuários do mesmo jeito: os ids colidem
+    data = {'a': SyntheticEvents(2024, 2, events_per_day=20, seed=1),
+            'b': SyntheticEvents(2024, 2, events_per_day=30, seed=2)}
+    servers = [{'name': name, 'url': fake_zabbix(events)[1], 'token': 'token'} for name, events in data.items()]
+    generator = ReportGenerator(report_config(None, servers=servers, output_formats=['csv']))
+    sheets = exported_sheets(generator.generate())
+
+    expected = {name: int(np.isin(events.severity, [3, 4, 5]).sum()) for name, events in data.items()}
+    assert sheets['problems']['Server'].value_counts().to_dict() == expected
+    assert list(sheets['problems'].columns[:2]) == ['Server', 'Time']
+    by_server = sheets['sla_by_server'].set_index('Server')
+    assert by_server['Total Events'].to_dict() == expected
+    assert (by_server['Met'] + by_server['Violated'] == by_server['Total Acks']).all()
+    for name, group in sheets['sla_details'].groupby('Server'):
+        assert by_server.loc[name, 'Total Acks'] == len(group)
+
+    details = sheets['sla_details']
+    assert details['EventID'].is_unique
+    assert (details['EventID'].str.split(':').str[0] == details['Server']).all()
+    raw_ids = details['EventID'].str.split(':').str[1]
+    assert set(raw_ids[details['Server'] == 'a']) & set(raw_ids[details['Server'] == 'b'])
+
+    # Usuário 1 existe nos dois servidores e continua separado por servidor
+    assert {'a:1', 'b:1'} <= set(generator.user_records)
+    assert not any(userid.startswith(('a:9', 'b:9')) for userid in generator.user_records)
+    # Usuários removidos aparecem pelo id do Zabbix, sem o prefixo do servidor
+    labels = set(details['First Ack User'].dropna())
+    assert 'ID:9' in labels and not any(label.startswith(('ID:a:', 'ID:b:')) for label in labels)
@@ -0,0 +1,40 @@
+# tests/test_json_stream.py
+import json
+
+import pytest
+
+from json_stream import IncompleteJsonStream, JsonRpcErrorResponse, iter_json_rpc_result
+
+RESULT = [{'eventid': '1', 'tags': [{'tag': 'a', 'value': '{"x": [1, 2]}'}], 'acknowledges': []},
+          {'eventid': '2', 'nested': {'deep': [[1, 2.5e3], {'k': None, 'b': True}]}, 'name': 'ção \\ "q"'},
+          -12.75, 'text', None, False, []]
+
+
+def _chunks(text: str, size: int) -> list:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize('size', [1, 2, 7, 64, 10 ** 6])
+def test_nested_items_survive_any_chunk_boundary(size):
+    body = json.dumps({'jsonrpc': '2.0', 'result': RESULT, 'id': 1}, ensure_ascii=False)
+    assert list(iter_json_rpc_result(_chunks(body, size))) == RESULT
+
+
+def test_scalar_result_and_error_member():
+    assert list(iter_json_rpc_result(['{"jsonrpc": "2.0", "result": "7", "id": 1}'])) == ['7']
+    with pytest.raises(JsonRpcErrorResponse) as error:
+        list(iter_json_rpc_result(['{"jsonrpc": "2.0", "error": {"code": -32602, "data": "No permissions."}}']))
+    assert str(error.value) == 'No permissions.'
+
+
+def test_every_truncation_is_reported_as_incomplete():
+    body = json.dumps({'jsonrpc': '2.0', 'result': RESULT, 'id': 1})
+    for cut in range(len(body)):
+        with pytest.raises(IncompleteJsonStream):
+            list(iter_json_rpc_result(_chunks(body[:cut], 5)))
+
+
+def test_malformed_json_is_not_mistaken_for_truncation():
+    with pytest.raises(ValueError) as error:
+        list(iter_json_rpc_result(['{"result": [1, }']))
+    assert not isinstance(error.value, IncompleteJsonStream)
@@ -0,0 +1,61 @@
+# tests/test_multi_period.py
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from fake_zabbix import SyntheticEvents
+from report_logic import ReportGenerator, period_label, report_periods
+
+RANGE = {'date_from': date(2024, 1, 15), 'date_till': date(2024, 3, 10)}
+PERIODS = [(date(2024, 1, 15), date(2024, 1, 31)), (date(2024, 2, 1), date(2024, 2, 29)),
+           (date(2024, 3, 1), date(2024, 3, 10))]
+
+
+def test_ranges_are_split_into_calendar_months():
+    assert report_periods(RANGE) == PERIODS
+    assert report_periods({'year': 2024, 'month': 2}) == [(date(2024, 2, 1), date(2024, 2, 29))]
+    assert report_periods({'date_from': '2023-12-31'}) == [(date(2023, 12, 31), date(2023, 12, 31))]
+    assert len(report_periods({'date_from': date(2023, 1, 1), 'date_till': date(2023, 12, 31)})) == 12
+    with pytest.raises(ValueError):
+        report_periods({'date_from': date(2024, 3, 1), 'date_till': date(2024, 2, 1)})
+    assert [period_label(period) for period in PERIODS] == ['2024-01-15 – 2024-01-31', '2024-02',
+                                                            '2024-03-01 – 2024-03-10']
+
+
+def test_periods_run_in_parallel_and_combine_like_separate_reports(utc_host, fake_zabbix, report_config,
+                                                                   exported_sheets):
+    _, url = fake_zabbix(SyntheticEvents(2024, 1, months=3, events_per_day=30))
+    generator = ReportGenerator(report_config(url, output_formats=['csv'], period_workers=3, **RANGE))
+    messages = []
+    generator.progress.connect(messages.append)
+    combined = exported_sheets(generator.generate())
+    assert 'Processing 3 periods in 3 parallel processes...' in messages
+
+    separate = []
+    for period_from, period_till in PERIODS:
+        config = report_config(url, output_formats=['csv'], date_from=period_from, date_till=period_till)
+        config['output_dir'] = config['output_dir'] / str(period_from)
+        separate.append(exported_sheets(ReportGenerator(config).generate()))
+
+    # As linhas de cada período são as do relatório daquele período sozinho, na ordem dos períodos;
+    # só o relatório combinado tem a coluna Period
+    for stem in ('problems', 'actions', 'sla_details', 'daily_event_volume', 'daily_sla_summary'):
+        expected = pd.concat([sheets[stem] for sheets in separate], ignore_index=True)
+        pd.testing.assert_frame_equal(combined[stem].drop(columns='Period', errors='ignore'), expected, obj=stem)
+    labels = [period_label(period) for period in PERIODS]
+    assert combined['problems']['Period'].unique().tolist() == labels
+
+    # Uma linha por período e os totais batem com os relatórios separados
+    by_period = combined['sla_by_period']
+    assert by_period['Period'].tolist() == labels
+    assert by_period['Total Events'].tolist() == [len(sheets['problems']) for sheets in separate]
+    assert by_period['Met'].tolist() == [sheets['daily_sla_summary']['Met'].sum() for sheets in separate]
+    assert by_period['Total Acks'].tolist() == [len(sheets['sla_details']) for sheets in separate]
+    assert 'sla_by_period' not in separate[0]
+
+    # Top 10 e produtividade somam os três períodos
+    user_acks = pd.concat([sheets['user_productivity'] for sheets in separate]).groupby('First Ack User')[
+        'Total_Acks'].sum()
+    assert combined['user_productivity'].set_index('First Ack User')['Total_Acks'].sort_index().equals(
+        user_acks.sort_index())
@@ -0,0 +1,54 @@
+# tests/test_name_cache.py
+import time
+
+import numpy as np
+
+from event_cache import EventCache
+from fake_zabbix import SyntheticEvents
+from report_logic import ReportGenerator
+from translations import get_string
+
+
+def _run(config: dict, fake) -> tuple:
+    """collect_period with a fresh generator; returns (name cache log line, host.get/user.get calls)."""
+    fake.calls.clear()
+    generator = ReportGenerator(config)
+    messages = []
+    generator.progress.connect(messages.append)
+    generator.collect_period()
+    prefix = get_string('log_name_cache', host_hits=0, host_misses=0, user_hits=0, user_misses=0).split('0')[0]
+    return next(message for message in messages if message.startswith(prefix)), (
+        fake.calls.get('host.get', 0), fake.calls.get('user.get', 0))
+
+
+def _log(host_hits, host_misses, user_hits, user_misses) -> str:
+    return get_string('log_name_cache', host_hits=host_hits, host_misses=host_misses, user_hits=user_hits,
+                      user_misses=user_misses)
+
+
+def test_names_are_fetched_again_only_when_missing_or_expired(utc_host, fake_zabbix, report_config, tmp_path):
+    data = SyntheticEvents(2024, 2, events_per_day=40, ack_rate=0.9)
+    fake, url = fake_zabbix(data)
+    config = report_config(url, cache_enabled=True, cache_path=tmp_path / 'cache.sqlite3')
+    in_report = np.isin(data.severity, [3, 4, 5])
+    hosts = len(np.unique(data.host_idx[in_report]))
+    # Usuários 9 e 10 não existem no servidor: nunca entram no cache e são buscados a cada execução
+    users = 10
+
+    assert _run(config, fake) == (_log(0, hosts, 0, users), (1, 1))
+    assert _run(config, fake) == (_log(hosts, 0, 8, 2), (0, 1))
+
+    # TTL vencido: todos os nomes são buscados de novo
+    time.sleep(0.1)
+    expired = dict(config, name_cache_ttl_hours=0.05 / 3600)
+    assert _run(expired, fake) == (_log(0, hosts, 0, users), (1, 1))
+
+    # Limite de entradas por tipo: ao gravar, só os nomes mais recentes ficam
+    bounded = dict(config, name_cache_max_entries=5, cache_path=tmp_path / 'bounded.sqlite3')
+    _run(bounded, fake)
+    cache = EventCache(bounded['cache_path'])
+    counts = dict(cache._conn.execute("SELECT kind, COUNT(*) FROM lookups WHERE kind IN ('host', 'user') "
+                                      "GROUP BY kind").fetchall())
+    cache.close()
+    assert counts == {'host': 5, 'user': 5}
+    assert _run(bounded, fake) == (_log(5, hosts - 5, 5, users - 5), (1, 1))
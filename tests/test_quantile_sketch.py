@@ -0,0 +1,98 @@
+# tests/test_quantile_sketch.py
+import time
+
+import numpy as np
+import pytest
+
+from fake_zabbix import SyntheticEvents, serve
+from quantile_sketch import RELATIVE_ACCURACY, QuantileSketches
+from report_logic import ReportGenerator
+from translations import get_string
+
+QS = [0.0, 0.01, 0.25, 0.5, 0.9, 0.99, 1.0]
+
+
+def _sketches(values_by_key: dict) -> QuantileSketches:
+    keys = list(values_by_key)
+    key_codes = np.concatenate([np.full(len(values), code) for code, values in enumerate(values_by_key.values())])
+    return QuantileSketches.from_values(key_codes, np.concatenate(list(values_by_key.values())), keys.__getitem__)
+
+
+def _by_key(sketches: QuantileSketches) -> dict:
+    return {key: (total, list(row)) for key, total, row in zip(sketches.keys, sketches.totals(),
+                                                               sketches.quantiles(QS))}
+
+
+def test_quantiles_stay_within_the_relative_accuracy():
+    rng = np.random.default_rng(7)
+    samples = {'lognormal': rng.lognormal(3, 2, 20000), 'uniform': rng.uniform(0.5, 1e5, 5000),
+               'few': np.array([2.0, 3.0, 1000.0]), 'one': np.array([42.0])}
+    sketches = _sketches(samples)
+    for key, (total, estimates) in _by_key(sketches).items():
+        assert total == len(samples[key])
+        exact = np.quantile(samples[key], QS, method='lower')
+        assert np.all(np.abs(np.array(estimates) - exact) <= RELATIVE_ACCURACY * exact + 1e-12), key
+
+
+def test_zero_negative_and_missing_values():
+    sketches = _sketches({'a': np.array([0.0, -5.0, np.nan, 10.0])})
+    total, estimates = _by_key(sketches)['a']
+    assert total == 3
+    assert estimates[0] == 0.0
+    assert estimates[-1] == pytest.approx(10.0, rel=RELATIVE_ACCURACY)
+
+
+def test_merge_equals_the_sketch_of_all_values():
+    rng = np.random.default_rng(11)
+    first = {'a': rng.exponential(30, 1000), 'b': rng.exponential(5, 300)}
+    second = {'b': rng.exponential(50, 700), 'c': rng.exponential(1, 10)}
+    merged = QuantileSketches.merge([_sketches(first), _sketches(second), QuantileSketches.empty()])
+    combined = _sketches({'a': first['a'], 'b': np.concatenate([first['b'], second['b']]), 'c': second['c']})
+    assert _by_key(merged) == _by_key(combined)
+
+
+def test_regroup_split_and_round_trip():
+    rng = np.random.default_rng(3)
+    values = {('2024-02-01', 'x'): rng.exponential(10, 200), ('2024-02-01', 'y'): rng.exponential(20, 100),
+              ('2024-02-02', 'x'): rng.exponential(30, 50)}
+    sketches = _sketches(values)
+
+    by_dimension = sketches.regroup(lambda key: [key[1]])
+    assert _by_key(by_dimension) == _by_key(_sketches({
+        'x': np.concatenate([values[('2024-02-01', 'x')], values[('2024-02-02', 'x')]]),
+        'y': values[('2024-02-01', 'y')]}))
+
+    days = sketches.split(lambda key: key[0])
+    assert sorted(days) == ['2024-02-01', '2024-02-02']
+    restored = [QuantileSketches.from_dict(days[day].to_dict()) for day in days]
+    assert _by_key(QuantileSketches.merge(restored)) == _by_key(sketches)
+
+
+def test_closed_days_reuse_stored_sketches(monkeypatch, tmp_path):
+    monkeypatch.setenv('TZ', 'UTC')
+    time.tzset()
+    data = SyntheticEvents(2024, 1, months=3, events_per_day=50, recover_rate=1.0)
+    server, _, url = serve(data)
+    try:
+        def run(**config):
+            messages = []
+            generator = ReportGenerator(dict({
+                'url': url, 'token': 'token', 'year': 2024, 'month': 2, 'sla_threshold': 20,
+                'severities': ['3', '4', '5'], 'output_dir': tmp_path, 'sheets': ['percentiles'],
+                'cache_path': tmp_path / 'cache.sqlite3'}, **config))
+            generator.progress.connect(messages.append)
+            sketches = generator.collect_period()[3]
+            return {metric: _by_key(sketches[metric]) for metric in sketches}, messages
+
+        uncached, _ = run(cache_enabled=False)
+        first, messages = run()
+        assert get_string('log_sketches_cached', count=29) not in messages
+        second, messages = run()
+        assert get_string('log_sketches_cached', count=29) in messages
+        assert first == second == uncached
+        # Os grupos de hosts entram nos sketches mesmo sem a aba de SLA por dimensão
+        assert any(key[1] == 'host_group' for key in second['resolution'])
+    finally:
+        server.shutdown()
+        monkeypatch.undo()
+        time.tzset()
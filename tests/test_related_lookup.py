@@ -0,0 +1,95 @@
+# tests/test_related_lookup.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from report_logic import RelatedLookup
+
+
+class ChunkRecorder:
+    """fetch_chunk that answers f"value-{key}" for every key except the ones in absent, recording each chunk."""
+
+    def __init__(self, absent=()):
+        self.absent = set(absent)
+        self.chunks = []
+        self._lock = threading.Lock()
+
+    def __call__(self, chunk):
+        with self._lock:
+            self.chunks.append(list(chunk))
+        return {key: f"value-{key}" for key in chunk if key not in self.absent}
+
+
+@pytest.mark.parametrize('count', [0, 1, 9, 10, 11, 30, 31])
+def test_keys_are_fetched_in_chunks_of_chunk_size(count):
+    fetch = ChunkRecorder()
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        lookup = RelatedLookup(pool, fetch, chunk_size=10)
+        lookup.request(str(key) for key in range(count))
+        # Só os blocos completos saem antes de result(); o resto espera por mais chaves
+        assert len(lookup._futures) == count // 10
+        values = lookup.result()
+
+    expected_sizes = [10] * (count // 10) + ([count % 10] if count % 10 else [])
+    assert sorted(len(chunk) for chunk in fetch.chunks) == sorted(expected_sizes)
+    assert sorted(key for chunk in fetch.chunks for key in chunk) == sorted(str(key) for key in range(count))
+    assert values == {str(key): f"value-{key}" for key in range(count)}
+    assert (lookup.hits, lookup.missing) == (0, count)
+
+
+def test_rounds_fill_chunks_and_repeated_keys_are_fetched_once():
+    fetch = ChunkRecorder(absent={'7'})
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        lookup = RelatedLookup(pool, fetch, chunk_size=4)
+        lookup.request(['1', '2', '3'])
+        assert not lookup._futures
+        # Repetidas dentro da rodada, entre rodadas e de chave sem resposta: uma consulta só
+        lookup.request(['3', '4', '4', '5', '1'])
+        lookup.request(['7', '2', '7'])
+        lookup.request(['7', '5'])
+        values = lookup.result()
+
+    keys = [key for chunk in fetch.chunks for key in chunk]
+    assert sorted(keys) == ['1', '2', '3', '4', '5', '7']
+    assert fetch.chunks[0] == ['1', '2', '3', '4']
+    assert set(values) == {'1', '2', '3', '4', '5'}
+    assert lookup.missing == 6
+
+
+def test_cached_values_are_not_fetched_again():
+    cache = {str(key): f"cached-{key}" for key in range(0, 20, 2)}
+    asked = []
+
+    def cached_values(keys):
+        asked.append(list(keys))
+        return {key: cache[key] for key in keys if key in cache}
+
+    fetch = ChunkRecorder()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        lookup = RelatedLookup(pool, fetch, chunk_size=3, cached_values=cached_values)
+        lookup.request(str(key) for key in range(10))
+        lookup.request(str(key) for key in range(5, 20))
+        values = lookup.result()
+
+    # O cache só é consultado pelas chaves novas de cada rodada, e a API só pelas que faltam nele
+    assert asked == [[str(key) for key in range(10)], [str(key) for key in range(10, 20)]]
+    fetched = [key for chunk in fetch.chunks for key in chunk]
+    assert sorted(fetched, key=int) == [str(key) for key in range(1, 20, 2)]
+    assert all(len(chunk) == 3 for chunk in fetch.chunks[:-1])
+    assert values == {key: cache.get(key, f"value-{key}") for key in map(str, range(20))}
+    assert lookup.fetched.keys() == set(fetched)
+    assert (lookup.hits, lookup.missing) == (10, 10)
+
+
+def test_a_failed_chunk_is_raised_by_result():
+    def fetch_chunk(chunk):
+        if '5' in chunk:
+            raise RuntimeError('chunk failed')
+        return {key: key for key in chunk}
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        lookup = RelatedLookup(pool, fetch_chunk, chunk_size=2)
+        lookup.request(str(key) for key in range(9))
+        with pytest.raises(RuntimeError, match='chunk failed'):
+            lookup.result()
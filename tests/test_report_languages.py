@@ -0,0 +1,52 @@
+# tests/test_report_languages.py
+import pandas as pd
+
+from fake_zabbix import SyntheticEvents
+from report_logic import ACK_ACTION_KEYS, SEVERITY_KEYS, ReportGenerator
+from translations import LANGUAGES, translate
+
+
+def _sheet(workbook_path, lang: str, sheet_key: str) -> pd.DataFrame:
+    return pd.read_excel(workbook_path, sheet_name=translate(lang, sheet_key), dtype=str)
+
+
+def test_one_run_writes_a_translated_workbook_per_language(utc_host, fake_zabbix, report_config):
+    fake, url = fake_zabbix(SyntheticEvents(2024, 2, events_per_day=30, ack_rate=0.8, recover_rate=0.6))
+    config = report_config(url, languages=list(LANGUAGES), sheets=['problems', 'actions'])
+    ReportGenerator(config).generate()
+    calls = dict(fake.calls)
+
+    workbooks = {lang: next(config['output_dir'].glob(f"{translate(lang, 'report_filename_prefix')}_*_{lang}.xlsx"))
+                 for lang in LANGUAGES}
+    problems = {lang: _sheet(path, lang, 'sheet_problems') for lang, path in workbooks.items()}
+    actions = {lang: _sheet(path, lang, 'sheet_actions') for lang, path in workbooks.items()}
+
+    # As mesmas linhas, na mesma ordem, em todos os idiomas; só o texto muda
+    times = [df[translate(lang, 'col_time')].tolist() for lang, df in problems.items()]
+    assert all(column == times[0] for column in times) and times[0]
+    for lang, df in problems.items():
+        severities = {translate(lang, key) for key in SEVERITY_KEYS.values()}
+        statuses = {translate(lang, 'status_resolved'), translate(lang, 'status_problem')}
+        assert set(df[translate(lang, 'col_severity')]) <= severities
+        assert set(df[translate(lang, 'col_status')]) == statuses
+        assert set(df[translate(lang, 'col_ack')]) == {translate(lang, 'ack_yes'), translate(lang, 'ack_no')}
+
+    # Cada texto de um idioma corresponde a uma única chave e, portanto, a um único texto no outro
+    pt, en = problems['pt_BR'], problems['en_US']
+    for column in ('col_severity', 'col_status'):
+        pairs = set(zip(pt[translate('pt_BR', column)], en[translate('en_US', column)]))
+        keys = set(SEVERITY_KEYS.values()) | {'status_resolved', 'status_problem'}
+        assert pairs <= {(translate('pt_BR', key), translate('en_US', key)) for key in keys}
+        assert any(pt_text != en_text for pt_text, en_text in pairs)
+
+    for lang, df in actions.items():
+        names = {translate(lang, key) for key in ACK_ACTION_KEYS.values()}
+        separator = translate(lang, 'action_separator')
+        action_types = df[translate(lang, 'col_action_type')]
+        assert all(set(value.split(separator)) <= names for value in action_types)
+    assert len(actions['pt_BR']) == len(actions['en_US']) > 0
+
+    # Uma única coleta: a segunda língua não repete nenhuma chamada à API
+    fake.calls.clear()
+    ReportGenerator(report_config(url, languages=['en_US'], sheets=['problems', 'actions'])).generate()
+    assert dict(fake.calls) == calls
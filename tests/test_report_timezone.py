@@ -0,0 +1,46 @@
+# tests/test_report_timezone.py
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from fake_zabbix import SyntheticEvents, serve
+from report_logic import ReportGenerator
+
+SEVERITIES = ['3', '4', '5']
+
+
+def _generator(url: str, tmp_path, **config) -> ReportGenerator:
+    return ReportGenerator(dict({'url': url, 'token': 'token', 'year': 2024, 'month': 2, 'sla_threshold': 20,
+                                 'severities': SEVERITIES, 'output_dir': tmp_path,
+                                 'cache_path': tmp_path / 'cache.sqlite3'}, **config))
+
+
+def test_period_days_follow_report_timezone(utc_host, tmp_path):
+    data = SyntheticEvents(2024, 1, months=3, events_per_day=50)
+    server, _, url = serve(data)
+    try:
+        tokyo = ZoneInfo('Asia/Tokyo')
+        start = int(datetime(2024, 2, 1, tzinfo=tokyo).timestamp())
+        end = int(datetime(2024, 3, 1, tzinfo=tokyo).timestamp())
+        in_window = (data.clock >= start) & (data.clock < end) & np.isin(data.severity, [int(s) for s in SEVERITIES])
+
+        # A segunda execução lê os dias fechados do cache, indexados pelos mesmos limites
+        for _ in range(2):
+            df_problems = _generator(url, tmp_path, timezone='Asia/Tokyo').collect_period()[0]
+            assert df_problems['Time'].min() >= datetime(2024, 2, 1)
+            assert df_problems['Time'].max() < datetime(2024, 3, 1)
+            assert df_problems['Time'].dt.date.min() == date(2024, 2, 1)
+            assert df_problems['Time'].dt.date.max() == date(2024, 2, 29)
+            assert len(df_problems) == in_window.sum()
+    finally:
+        server.shutdown()
+
+
+def test_day_bounds_cover_dst_transitions(utc_host, tmp_path):
+    berlin = ZoneInfo('Europe/Berlin')
+    generator = _generator('http://zabbix.invalid/api_jsonrpc.php', tmp_path, timezone='Europe/Berlin')
+    for day, hours in ((date(2024, 3, 31), 23), (date(2024, 10, 27), 25), (date(2024, 6, 1), 24)):
+        day_from, day_till = generator._day_bounds(day)
+        assert day_till - day_from + 1 == hours * 3600
+        assert datetime.fromtimestamp(day_from, berlin) == datetime(day.year, day.month, day.day, tzinfo=berlin)
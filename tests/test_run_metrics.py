@@ -0,0 +1,85 @@
+# tests/test_run_metrics.py
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from fake_zabbix import SyntheticEvents
+from report_logic import ReportGenerator
+from run_metrics import RunMetrics
+
+STAGE_FIELDS = {'seconds', 'events', 'peak_rss_bytes', 'events_per_second'}
+API_FIELDS = {'calls', 'retries', 'errors', 'seconds', 'bytes'}
+
+
+def test_sidecar_schema_and_counters(utc_host, fake_zabbix, report_config, exported_sheets):
+    fake, url = fake_zabbix(SyntheticEvents(2024, 2, events_per_day=40), fail_rate=0.2)
+    config = report_config(url, metrics_sidecar=True, output_formats=['xlsx', 'csv'], api_retries=8,
+                           sheets=['problems', 'actions', 'top_10'])
+    report_file = ReportGenerator(config).generate()
+
+    sidecars = list(config['output_dir'].glob('*.metrics.json'))
+    assert [path.name[:-len('.metrics.json')] for path in sidecars] == [report_file.stem]
+    metrics = json.loads(sidecars[0].read_text(encoding='utf-8'))
+
+    assert set(metrics) == {'started_at', 'stages', 'api', 'total_seconds', 'events', 'period', 'fetch_workers',
+                            'outputs'}
+    assert datetime.fromisoformat(metrics['started_at']).tzinfo is not None
+    assert metrics['period'] == {'from': '2024-02-01', 'till': '2024-02-29'}
+    assert sorted(metrics['outputs']) == sorted(str(path) for path in config['output_dir'].iterdir()
+                                                if path.suffix != '.json')
+    assert isinstance(metrics['fetch_workers'], int) and metrics['total_seconds'] > 0
+
+    stages = metrics['stages']
+    assert {'fetch_events', 'fetch_related', 'build_frames', 'sla_reports', 'final_sheets', 'write_xlsx',
+            'export_data'} <= set(stages)
+    for name, stage in stages.items():
+        assert set(stage) == STAGE_FIELDS, name
+        assert stage['seconds'] >= 0 and stage['peak_rss_bytes'] > 0, name
+    problems = exported_sheets(next(config['output_dir'].glob('*/')))['problems']
+    assert stages['fetch_events']['events'] == metrics['events'] == len(problems)
+    assert stages['fetch_events']['events_per_second'] > 0
+
+    # Cada tentativa conta como chamada; as respostas 502 são as que falharam
+    api = metrics['api']
+    assert {'event.get', 'host.get', 'user.get'} <= set(api)
+    assert all(set(stats) == API_FIELDS for stats in api.values())
+    assert sum(stats['calls'] for stats in api.values()) == sum(fake.calls.values()) + fake.faults['http_502']
+    assert sum(stats['errors'] for stats in api.values()) == fake.faults['http_502'] > 0
+    assert sum(stats['retries'] for stats in api.values()) >= fake.faults['http_502']
+    assert api['event.get']['bytes'] > api['user.get']['bytes'] > 0
+
+
+def test_no_sidecar_when_disabled(utc_host, fake_zabbix, report_config):
+    _, url = fake_zabbix(SyntheticEvents(2024, 2, events_per_day=10))
+    config = report_config(url, metrics_sidecar=False, sheets=['problems'])
+    ReportGenerator(config).generate()
+    assert not list(config['output_dir'].glob('*.metrics.json'))
+
+
+def test_stages_accumulate_and_merge():
+    metrics = RunMetrics()
+    for _ in range(2):
+        with metrics.stage('fetch') as stage:
+            stage['events'] = (stage['events'] or 0) + 500
+            time.sleep(0.02)
+    with metrics.stage('write'):
+        pass
+    metrics.record_api('event.get', 0.5, 1000)
+    metrics.record_api('event.get', 0.25, 0, retried=True, failed=True)
+    worker = {'stages': {'fetch': {'seconds': 1.0, 'events': 1000, 'peak_rss_bytes': 1},
+                         'collect': {'seconds': 2.0, 'events': None, 'peak_rss_bytes': None}},
+              'api': {'event.get': {'calls': 3, 'retries': 1, 'errors': 0, 'seconds': 1.0, 'bytes': 500}}}
+    metrics.merge(worker)
+    metrics.close()
+
+    result = metrics.as_dict()
+    fetch = result['stages']['fetch']
+    assert fetch['events'] == 2000 and fetch['seconds'] == pytest.approx(1.04, abs=0.05)
+    assert fetch['events_per_second'] == pytest.approx(2000 / fetch['seconds'], rel=0.01)
+    assert fetch['peak_rss_bytes'] > 1
+    assert result['stages']['write']['events_per_second'] is None
+    assert result['stages']['collect'] == {'seconds': 2.0, 'events': None, 'peak_rss_bytes': None,
+                                           'events_per_second': None}
+    assert result['api']['event.get'] == {'calls': 5, 'retries': 2, 'errors': 1, 'seconds': 1.75, 'bytes': 1500}
@@ -0,0 +1,75 @@
+# tests/test_sla_breakdown.py
+import numpy as np
+import pandas as pd
+
+from fake_zabbix import SyntheticEvents
+from report_logic import NEUTRAL_TAG_SEPARATOR, ReportGenerator, category_memberships
+
+BREAKDOWN_TAGS = ['service', 'tag1', 'owner']
+
+
+def _reference(df_problems: pd.DataFrame, threshold: float) -> pd.DataFrame:
+    """Breakdown counted the plain way: an exploded groupby over (dimension, value) memberships."""
+    df = df_problems.assign(
+        minutes=(df_problems['First Ack Time'] - df_problems['Time']).dt.total_seconds() / 60)
+    df['met'] = df['minutes'] <= threshold
+    df['violated'] = df['minutes'] > threshold
+    groups = df['Host Groups'].astype(str).str.split(NEUTRAL_TAG_SEPARATOR).explode()
+    memberships = [pd.DataFrame({'Dimension': 'host_group', 'Value': groups})]
+    pairs = df['Tags'].astype(str).str.split(NEUTRAL_TAG_SEPARATOR).explode().str.partition('=')
+    for tag in BREAKDOWN_TAGS:
+        memberships.append(pd.DataFrame({'Dimension': f"tag:{tag}", 'Value': pairs[pairs[0] == tag][2]}))
+    exploded = pd.concat(memberships).join(df[['met', 'violated', 'minutes']])
+    grouped = exploded.groupby(['Dimension', 'Value']).agg(
+        total=('met', 'size'), met=('met', 'sum'), violated=('violated', 'sum'), minutes=('minutes', 'sum'))
+    dimensions = ['host_group'] + [f"tag:{tag}" for tag in BREAKDOWN_TAGS]
+    return grouped.reset_index().sort_values(
+        ['Dimension', 'Value'], key=lambda column: column.map(dimensions.index) if column.name == 'Dimension'
+        else column).reset_index(drop=True)
+
+
+def test_breakdown_counts_match_a_groupby_per_dimension(utc_host, fake_zabbix, report_config):
+    data = SyntheticEvents(2024, 2, events_per_day=80, ack_rate=0.7, tags_per_event=2.0)
+    # Hosts em mais de um grupo: o evento conta uma vez em cada grupo
+    for i, host in enumerate(data.hosts):
+        if i % 3 == 0:
+            host['groups'].append({'groupid': '99', 'name': 'Databases'})
+    _, url = fake_zabbix(data)
+    generator = ReportGenerator(report_config(url, sheets=['problems', 'sla_breakdown'],
+                                              breakdown_tags=BREAKDOWN_TAGS))
+    df_problems = generator.collect_period()[0]
+    breakdown = generator._generate_sla_reports(df_problems)['SLA Breakdown']
+    expected = _reference(df_problems, 20)
+
+    assert breakdown['Dimension'].astype(str).tolist() == expected['Dimension'].tolist()
+    assert breakdown['Value'].tolist() == expected['Value'].tolist()
+    assert breakdown['Total Events'].tolist() == expected['total'].tolist()
+    assert breakdown['sla_met'].tolist() == expected['met'].tolist()
+    assert breakdown['sla_violated'].tolist() == expected['violated'].tolist()
+    acks = expected['met'] + expected['violated']
+    assert breakdown['Total Acks'].tolist() == acks.tolist()
+    np.testing.assert_allclose(breakdown['Avg Ack Duration (min)'], (expected['minutes'] / acks).round(2))
+
+    # Um evento por grupo e por valor de tag: os totais de cada dimensão batem com o quadro de problemas
+    totals = breakdown.groupby('Dimension', observed=True)['Total Events'].sum()
+    assert totals['host_group'] == len(df_problems) + int((df_problems['Host Groups'].astype(str)
+                                                           .str.contains('Databases')).sum())
+    assert totals['tag:service'] == int(df_problems['Tags'].astype(str).str.contains('service=').sum())
+    assert 'tag:owner' not in set(breakdown['Dimension'].astype(str))
+    assert 'Databases' in set(breakdown['Value'])
+
+
+def test_memberships_expand_each_category_once():
+    calls = []
+
+    def labels_of(category):
+        calls.append(category)
+        return category.split(',') if category else []
+
+    values = pd.Categorical(['a,b', 'c', None, 'a,b', '', 'b,a,c'])
+    labels = {'c': 0}
+    rows, codes = category_memberships(values, labels_of, labels)
+    assert sorted(calls) == sorted(values.categories)
+    assert labels == {'c': 0, 'a': 1, 'b': 2}
+    assert list(zip(rows.tolist(), codes.tolist())) == [(0, 1), (0, 2), (1, 0), (3, 1), (3, 2), (5, 2), (5, 1),
+                                                        (5, 0)]
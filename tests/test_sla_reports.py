@@ -0,0 +1,142 @@
+# tests/test_sla_reports.py
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from report_logic import ReportGenerator, categorical_values
+
+SHEETS = ['sla_details', 'daily_sla', 'daily_volume', 'top_10', 'user_productivity', 'period_sla']
+MET, VIOLATED = 'sla_met', 'sla_violated'
+
+
+def _problems(count: int = 3000, ack_rate: float = 0.6, seed: int = 7) -> pd.DataFrame:
+    """Synthetic language-neutral problems frame of February and March 2024, as collect_period builds it."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2024-02-01T00:00:00', 's')
+    clocks = np.sort(rng.integers(0, 60 * 86400, count))
+    times = (start + clocks).astype('datetime64[ns]')
+    ack_delay = rng.integers(0, 3 * 3600, count).astype('timedelta64[s]')
+    acked = rng.random(count) < ack_rate
+    users = rng.integers(0, 6, count)
+    df = pd.DataFrame({
+        'EventID': [str(1000 + i) for i in range(count)],
+        'Host': categorical_values(rng.integers(0, 30, count), lambda host: f"host-{host:02d}"),
+        # Categorias sem nenhum evento: severidade 'information' e um problema nunca visto
+        'Severity': pd.Categorical(rng.choice(['average', 'high', 'disaster'], count),
+                                   categories=['information', 'average', 'high', 'disaster']),
+        'Problem': pd.Categorical([f"Problem {k}" for k in rng.zipf(1.5, count) % 25],
+                                  categories=[f"Problem {k}" for k in range(26)]),
+        'Time': times,
+        'First Ack Time': np.where(acked, times + ack_delay, np.datetime64('NaT')).astype('datetime64[ns]'),
+        # Usuário 5 removido do Zabbix: reconhecimento sem usuário conhecido
+        'First Ack User': pd.Categorical(np.where(acked & (users < 5), users.astype(str), None),
+                                         categories=[str(user) for user in range(7)]),
+    })
+    df['Period'] = pd.Categorical(np.where(df['Time'] < np.datetime64('2024-03-01'), '2024-02', '2024-03'))
+    return df
+
+
+def _reference_reports(df_problems: pd.DataFrame, threshold: float, periods: int) -> dict:
+    """The groupby/pivot formulation the bincount engine replaced."""
+    df_problems = df_problems.copy()
+    df_problems['Date'] = df_problems['Time'].dt.normalize()
+    report = {'Daily Event Volume': df_problems.groupby('Date').size().reset_index(name='Total Events'),
+              'Top 10 Problems': df_problems.groupby('Problem', observed=True).size().nlargest(10).reset_index(
+                  name='Count')}
+    df_acknowledged = df_problems[df_problems['First Ack Time'].notna()].copy()
+    if df_acknowledged.empty:
+        return report
+
+    df_acknowledged['Ack Duration (min)'] = (df_acknowledged['First Ack Time']
+                                             - df_acknowledged['Time']).dt.total_seconds() / 60
+    df_acknowledged['SLA Status'] = categorical_values(
+        (df_acknowledged['Ack Duration (min)'] <= threshold).to_numpy(), lambda met: MET if met else VIOLATED)
+    df_sla_details = df_acknowledged[['EventID', 'Host', 'Problem', 'Time', 'First Ack Time', 'First Ack User',
+                                      'Ack Duration (min)', 'SLA Status']].copy()
+    df_sla_details['Ack Duration (min)'] = df_sla_details['Ack Duration (min)'].round(2)
+    df_sla_details['Date'] = df_sla_details['Time'].dt.normalize()
+
+    df_daily_sla = df_sla_details.groupby(['Date', 'SLA Status'], observed=True).size().unstack(fill_value=0)
+    for col in (MET, VIOLATED):
+        if col not in df_daily_sla.columns:
+            df_daily_sla[col] = 0
+    df_daily_sla['Total Acks'] = df_daily_sla[MET] + df_daily_sla[VIOLATED]
+    df_daily_sla['% Met'] = (df_daily_sla[MET] / df_daily_sla['Total Acks'] * 100).round(2)
+    df_daily_sla = df_daily_sla.reset_index()
+
+    df_user_prod = df_sla_details.groupby('First Ack User', observed=True).agg(
+        Total_Acks=('EventID', 'count'), SLA_Violations=('SLA Status', lambda status: (status == VIOLATED).sum())
+    ).reset_index().sort_values(by='Total_Acks', ascending=False)
+    df_monthly_summary = pd.DataFrame({'Status': [MET, VIOLATED],
+                                       'Count': [df_daily_sla[MET].sum(), df_daily_sla[VIOLATED].sum()]})
+    report = {'SLA Details': df_sla_details, 'Daily SLA Summary': df_daily_sla, **report,
+              'User Productivity': df_user_prod, 'Monthly Summary Data': df_monthly_summary}
+
+    if periods > 1:
+        df_period = df_acknowledged.groupby(['Period', 'SLA Status'], observed=True).size().unstack(fill_value=0)
+        for col in (MET, VIOLATED):
+            if col not in df_period.columns:
+                df_period[col] = 0
+        df_period = df_period[[MET, VIOLATED]]
+        df_period['Total Acks'] = df_period[MET] + df_period[VIOLATED]
+        df_period['% Met'] = (df_period[MET] / df_period['Total Acks'] * 100).round(2)
+        df_volume = df_problems.groupby('Period', observed=True).size().rename('Total Events')
+        df_period = pd.concat([df_volume, df_period], axis=1).fillna(0)
+        df_period.index.name = 'Period'
+        df_period.columns = list(df_period.columns)
+        report['Period SLA Summary'] = df_period.reset_index().astype({'Period': str})
+    return report
+
+
+def _engine_reports(df_problems: pd.DataFrame, threshold: float, date_till: date) -> dict:
+    engine = ReportGenerator({'url': 'http://zabbix.invalid/api_jsonrpc.php', 'token': 'token',
+                              'date_from': date(2024, 2, 1), 'date_till': date_till, 'sla_threshold': threshold,
+                              'severities': ['2', '3', '4', '5'], 'sheets': SHEETS, 'cache_enabled': False})
+    return engine._generate_sla_reports(df_problems.copy())
+
+
+def _assert_same_reports(got: dict, want: dict):
+    assert list(got) == list(want)
+    for key in want:
+        pd.testing.assert_frame_equal(got[key].reset_index(drop=True), want[key].reset_index(drop=True),
+                                      check_categorical=False, check_column_type=False, obj=key)
+
+
+@pytest.mark.parametrize('threshold', [20, 3, -1, 10 ** 6])
+def test_bincount_engine_matches_groupby_reports(threshold):
+    df_problems = _problems()
+    _assert_same_reports(_engine_reports(df_problems, threshold, date(2024, 3, 31)),
+                         _reference_reports(df_problems, threshold, periods=2))
+
+
+def test_single_period_has_no_period_summary():
+    df_problems = _problems()
+    df_problems = df_problems[df_problems['Period'] == '2024-02'].reset_index(drop=True)
+    got = _engine_reports(df_problems, 20, date(2024, 2, 29))
+    assert 'Period SLA Summary' not in got
+    _assert_same_reports(got, _reference_reports(df_problems, 20, periods=1))
+
+
+def test_period_without_acks_keeps_its_volume():
+    df_problems = _problems()
+    march = df_problems['Period'] == '2024-03'
+    df_problems.loc[march, 'First Ack Time'] = pd.NaT
+    df_problems.loc[march, 'First Ack User'] = None
+    got = _engine_reports(df_problems, 20, date(2024, 3, 31))
+    _assert_same_reports(got, _reference_reports(df_problems, 20, periods=2))
+    acked_in_february = (df_problems['First Ack Time'].notna() & ~march).sum()
+    assert got['Period SLA Summary']['Total Acks'].tolist() == [acked_in_february, 0]
+    assert got['Period SLA Summary']['Total Events'].tolist() == [(~march).sum(), march.sum()]
+
+
+def test_no_acks_still_builds_volume_and_top_10():
+    df_problems = _problems(ack_rate=0)
+    got = _engine_reports(df_problems, 20, date(2024, 3, 31))
+    assert list(got) == ['Daily Event Volume', 'Top 10 Problems']
+    _assert_same_reports(got, _reference_reports(df_problems, 20, periods=2))
+
+
+def test_empty_frame_has_no_reports():
+    assert _engine_reports(_problems().iloc[0:0], 20, date(2024, 3, 31)) == {}
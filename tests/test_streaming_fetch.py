@@ -0,0 +1,60 @@
+# tests/test_streaming_fetch.py
+from datetime import date
+
+import requests
+
+import zabbix_api
+from fake_zabbix import SyntheticEvents
+from json_stream import iter_response_text
+from report_logic import EventColumnBuilder, ReportGenerator
+
+
+def test_events_reach_the_builder_while_the_body_downloads(utc_host, fake_zabbix, report_config, monkeypatch):
+    fake, url = fake_zabbix(SyntheticEvents(2024, 2, events_per_day=40, ack_rate=0.8, tags_per_event=2.0))
+    generator = ReportGenerator(report_config(url, event_page_size=10 ** 6))
+    events = EventColumnBuilder()
+    sizes, pages = [], []
+
+    # Tamanho do builder a cada bloco de 4 KiB lido da resposta
+    def chunks(response, chunk_size=None):
+        for chunk in iter_response_text(response, chunk_size=4096):
+            sizes.append(len(events))
+            yield chunk
+    monkeypatch.setattr(zabbix_api, 'iter_response_text', chunks)
+    handle = fake.handle
+
+    def record_page(method, params):
+        pages.append(params)
+        return handle(method, params)
+    fake.handle = record_page
+
+    time_from, time_till = generator._day_bounds(date(2024, 2, 1))[0], generator._day_bounds(date(2024, 2, 29))[1]
+    received = generator._fetch_event_window(events, time_from, time_till)
+
+    # Os eventos entram no builder bloco a bloco, não depois do corpo inteiro
+    assert len(pages) == 1 and len(sizes) > 10
+    assert sizes[0] == 0 and 0 < sizes[len(sizes) // 2] < received == len(events)
+
+    # Mesmo conteúdo que a decodificação do corpo inteiro com json()
+    body = requests.post(url, json={'jsonrpc': '2.0', 'method': 'event.get', 'params': pages[0], 'id': 1}).json()
+    assert [events.record(idx) for idx in range(len(events))] == [
+        EventColumnBuilder.record_from_event(event) for event in body['result']]
+    assert events.userids and events.all_hostids and events.r_eventids
+
+
+def test_repeated_strings_are_stored_once():
+    events = EventColumnBuilder()
+    for eventid in range(1, 5):
+        events.add_event({'eventid': str(eventid), 'clock': str(1700000000 + eventid), 'severity': '4',
+                          'name': ''.join(['Disk ', 'full']), 'hosts': [{'hostid': str(10 + eventid % 2)}],
+                          'tags': [{'tag': 'service', 'value': ''.join(['d', 'b'])}],
+                          'acknowledges': [{'clock': '1700000100', 'userid': ''.join(['1', '2']), 'action': '2',
+                                            'message': ''}]})
+
+    assert len({id(name) for name in events.name}) == 1
+    assert len({id(tags) for tags in events.tags}) == 1
+    assert len({id(hostids) for hostids in events.hostids}) == 2
+    assert len({id(userid) for userid in events.ack_userid}) == 1
+    assert list(events.ack_start) == [0, 1, 2, 3] and events.userids == {'12'}
+    assert events.record(2) == [3, 1700000003, 4, 0, ['11'], 'Disk full', False, 0, [['service', 'db']],
+                                [[1700000100, '12', 2, '']]]
@@ -0,0 +1,101 @@
+# tests/test_xlsx_output.py
+from datetime import datetime
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+from openpyxl.utils import get_column_letter
+
+from fake_zabbix import SyntheticEvents
+from report_logic import ReportGenerator
+from xlsx_stream import EXCEL_MAX_SHEET_NAME, excel_sheet_parts
+
+
+def _report(fake_zabbix, report_config, **config) -> tuple:
+    """Runs an xlsx + csv report of the fake server; returns (workbook path, export dir)."""
+    _, url = fake_zabbix(SyntheticEvents(2024, 2, events_per_day=50))
+    config = report_config(url, output_formats=['xlsx', 'csv'], **config)
+    ReportGenerator(config).generate()
+    return next(config['output_dir'].glob('*.xlsx')), next(config['output_dir'].glob('*/'))
+
+
+def _rows(worksheet) -> list:
+    return [list(row) for row in worksheet.iter_rows(values_only=True)]
+
+
+def _problems_sheet() -> pd.DataFrame:
+    """A translated Problems-like sheet with every kind of column the writer converts."""
+    times = pd.to_datetime(['2024-02-01 08:00:05', '2024-02-01 23:59:59', None, '2024-02-29 00:00:00'])
+    return pd.DataFrame({
+        'Time': times,
+        'Severity': pd.Categorical(['Disaster', 'High', None, 'Disaster'],
+                                   categories=['High', 'Disaster', 'A long category no row uses']),
+        'Host': ['host-1', 'a much longer host name', None, 'h'],
+        'Duration': pd.to_timedelta([3600, 90, None, 86400 * 2], unit='s'),
+        'Ack Duration (min)': [1.5, np.nan, 12.25, 1000.0],
+        'Count': np.array([1, 22, 333, 4444], dtype=np.int64),
+        'Tags': ['service=db', '', None, 'x=y'],
+    })
+
+
+def test_sheet_parts_split_rows_and_keep_names_short():
+    assert excel_sheet_parts('Problems', 0, 1000) == [('Problems', 0, 0)]
+    assert excel_sheet_parts('Problems', 2000, 1000) == [('Problems', 0, 1000), ('Problems (2)', 1000, 2000)]
+    long_name = 'x' * EXCEL_MAX_SHEET_NAME
+    parts = excel_sheet_parts(long_name, 25, 10)
+    assert [name for name, _, _ in parts] == [long_name, 'x' * 27 + ' (2)', 'x' * 27 + ' (3)']
+    assert [(start, stop) for _, start, stop in parts] == [(0, 10), (10, 20), (20, 25)]
+
+
+def test_long_sheets_continue_on_numbered_sheets(utc_host, fake_zabbix, report_config, exported_sheets):
+    workbook_path, export_dir = _report(fake_zabbix, report_config, sheets=['problems', 'actions', 'top_10'],
+                                        max_sheet_rows=300)
+    exported = exported_sheets(export_dir)
+    workbook = openpyxl.load_workbook(workbook_path, read_only=True)
+    for sheet, stem in (('Problems', 'problems'), ('Actions', 'actions'), ('Top 10 Problems', 'top_10_problems')):
+        df = exported[stem]
+        shards = [sheet] + [f"{sheet} ({number})" for number in range(2, -(-len(df) // 300) + 1)]
+        assert [name for name in workbook.sheetnames if name.startswith(sheet)] == shards
+        rows = [_rows(workbook[name]) for name in shards]
+        # Cada parte repete o cabeçalho e leva no máximo 300 linhas, na ordem da tabela completa
+        assert all(part[0] == list(df.columns) for part in rows)
+        assert [len(part) - 1 for part in rows] == [min(300, len(df) - start) for start in range(0, len(df), 300)]
+        first_column = [row[0] for part in rows for row in part[1:]]
+        assert pd.Series(first_column).astype(str).tolist() == df.iloc[:, 0].astype(str).tolist()
+    assert len([name for name in workbook.sheetnames if name.startswith('Problems')]) > 1
+    workbook.close()
+
+
+@pytest.mark.parametrize('streaming', ['on', 'off'])
+def test_written_cells_formats_and_widths_follow_the_frame(tmp_path, report_config, streaming):
+    generator = ReportGenerator(report_config('http://zabbix.invalid/api_jsonrpc.php', sheets=['problems'],
+                                              xlsx_streaming=streaming))
+    df = _problems_sheet()
+    workbook_path = generator._save_report({'Problems': df}, {}, 'report', 'en_US')
+    worksheet = openpyxl.load_workbook(workbook_path)['Problems']
+
+    rows = list(worksheet.iter_rows(min_row=2, values_only=True))
+    assert [cell.value for cell in worksheet[1]] == list(df.columns)
+    assert len(rows) == len(df)
+    # Células vazias onde o frame não tem valor; datas como datetime e durações em dias, como no to_excel
+    convert = {'Time': lambda value: value.to_pydatetime(),
+               'Duration': lambda value: pytest.approx(value.total_seconds() / 86400)}
+    for column, cells in zip(df.columns, zip(*rows)):
+        expected = [None if pd.isna(value) or value == '' else convert.get(column, lambda v: v)(value)
+                    for value in df[column]]
+        assert [None if cell == '' else cell for cell in cells] == expected, column
+    assert isinstance(rows[0][0], datetime)
+    assert worksheet['A2'].number_format == 'yyyy-mm-dd hh:mm:ss'
+    # Sem tabela no modo streaming: cabeçalho estilizado e autofiltro no lugar dela
+    if streaming == 'on':
+        assert worksheet.auto_filter.ref == 'A1:G5' and worksheet['A1'].font.bold
+        assert not worksheet.tables
+    else:
+        assert [table.ref for table in worksheet.tables.values()] == ['A1:G5']
+
+    # Larguras: datas 20, Tags 80 e as demais pelo maior texto usado (ou cabeçalho) + 2
+    expected_widths = [20, len('Severity') + 2, len('a much longer host name') + 2, len('2 days 00:00:00') + 2,
+                       len('Ack Duration (min)') + 2, len('Count') + 2, 80]
+    widths = [worksheet.column_dimensions[get_column_letter(i + 1)].width for i in range(len(df.columns))]
+    assert widths == pytest.approx(expected_widths, abs=1)
@@ -0,0 +1,104 @@
+# tests/test_zabbix_api.py
+import json
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+
+from zabbix_api import LimiterManager, TokenBucket, TruncatedResponse, ZabbixTransport
+
+ITEMS = [{'eventid': str(eventid), 'name': 'x' * 200} for eventid in range(1, 51)]
+
+
+def _serve_bodies(cuts: list) -> tuple:
+    """HTTP/1.0 server whose n-th response body is cut after cuts[n] bytes (None = whole body).
+
+    Without Content-Length the body ends when the connection closes, so a cut looks like a clean close.
+    """
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            params = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['params']
+            requests_seen.append(params)
+            items = [item for item in ITEMS if int(item['eventid']) >= params.get('eventid_from', 0)]
+            body = json.dumps({'jsonrpc': '2.0', 'result': items, 'id': 1}).encode()
+            cut = cuts[len(requests_seen) - 1] if len(requests_seen) <= len(cuts) else None
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers()
+            self.wfile.write(body[:cut])
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api_jsonrpc.php", requests_seen
+
+
+def _acquire_times(limiter, count: int) -> list:
+    times = []
+    for _ in range(count):
+        limiter.acquire()
+        times.append(time.time())
+    return times
+
+
+def test_token_bucket_spaces_requests_after_the_burst():
+    bucket = TokenBucket(rate=50, burst=2)
+    start = time.monotonic()
+    for _ in range(12):
+        bucket.acquire()
+    assert time.monotonic() - start >= (12 - 2) / 50 * 0.9
+
+
+def test_shared_bucket_limits_all_processes_together():
+    context = multiprocessing.get_context('spawn')
+    with LimiterManager(ctx=context) as manager, ProcessPoolExecutor(3, mp_context=context) as pool:
+        limiter = manager.TokenBucket(20, 1)
+        results = [pool.submit(_acquire_times, limiter, 10) for _ in range(3)]
+        times = sorted(t for future in results for t in future.result())
+    # 30 requisições a 20/s somando os três processos: ao menos 29 intervalos de 50 ms
+    assert times[-1] - times[0] >= 29 / 20 * 0.9
+
+
+def _resume_after(params: dict, last_item: dict) -> dict:
+    return dict(params, eventid_from=int(last_item['eventid']) + 1)
+
+
+def test_body_cut_before_the_first_item_is_retried():
+    server, url, requests_seen = _serve_bodies([30])
+    try:
+        transport = ZabbixTransport(url, 'token', retries=2, rate_limit=0)
+        transport.retry_policy.base_delay = 0
+        assert list(transport.iter_call('event.get', {})) == ITEMS
+        assert len(requests_seen) == 2
+    finally:
+        server.shutdown()
+
+
+def test_body_cut_mid_stream_resumes_after_the_last_item():
+    server, url, requests_seen = _serve_bodies([3000])
+    try:
+        transport = ZabbixTransport(url, 'token', retries=2, rate_limit=0)
+        transport.retry_policy.base_delay = 0
+        assert list(transport.iter_call('event.get', {}, resume=_resume_after)) == ITEMS
+        assert requests_seen[1]['eventid_from'] > 1
+    finally:
+        server.shutdown()
+
+
+def test_body_cut_without_resume_raises_a_connection_error():
+    server, url, _ = _serve_bodies([3000])
+    try:
+        transport = ZabbixTransport(url, 'token', retries=2, rate_limit=0)
+        with pytest.raises(requests.ConnectionError) as error:
+            list(transport.iter_call('event.get', {}))
+        assert isinstance(error.value, TruncatedResponse)
+    finally:
+        server.shutdown()
@@ -28,8 +28,16 @@ LANGUAGES = {
         'report_period': "Período do Relatório:",
         'year': "Ano:",
         'month': "Mês:",
+        'months': "Meses:",
         'ack_sla': "SLA para Acknowledgement:",
+        'fetch_workers': "Requisições Paralelas:",
+        'cache_refresh': "Ignorar o cache local e baixar todo o período novamente",
+        'incremental_mode': "Modo incremental: buscar só o que mudou desde a última execução deste período",
         'browse_button': "Procurar...",
+        'output_formats': "Formatos:",
+        'format_xlsx': "Excel (.xlsx)",
+        'format_parquet': "Parquet",
+        'format_csv': "CSV (.csv.gz)",
         'generate_button': "Gerar Relatório",
         'generating_button': "Gerando...",
         'validating_button': "Validando...",
@@ -64,6 +72,16 @@ LANGUAGES = {
         'url_token_empty': "A URL e o Token da API não podem estar vazios.",
         'url_invalid': "A URL da API é inválida. Ela deve começar com 'http://' ou 'https://'.",
         'no_severity_selected': "Selecione pelo menos uma severidade.",
+        'no_output_format_selected': "Selecione pelo menos um formato de saída.",
+        'unknown_output_format': "Formato de saída desconhecido: {formats}. Use xlsx, parquet ou csv.",
+        'parquet_unavailable': "A saída Parquet requer o pacote pyarrow (pip install pyarrow).",
+        'unknown_report_sheet': "Aba desconhecida: {sheets}. Use: {choices}.",
+        'unknown_problem_column': "Coluna desconhecida da aba Problems: {columns}. Use: {choices}.",
+        'unknown_language': "Idioma desconhecido: {languages}. Use: {choices}.",
+        'invalid_business_hours': "Calendário de expediente inválido: {error}",
+        'log_business_hours': "Tempos de reconhecimento do SLA contados só em horas úteis.",
+        'invalid_servers': "Lista de servidores inválida: {error}",
+        'duplicate_server_names': "nomes de servidor repetidos ({names})",
         'cannot_access_output_dir': "Não foi possível criar ou acessar o diretório de saída:\n{error}",
         'zabbix_connection_failed': "Não foi possível conectar à API do Zabbix.\n\nDetalhes: {error}",
         'connection_successful': "Conexão bem-sucedida. ✔️",
@@ -84,17 +102,38 @@ LANGUAGES = {
         'log_no_events': "Nenhum evento encontrado para o período e severidades selecionados. Encerrando.",
         'log_events_found': "Total de eventos encontrados: {count}.",
         'log_fetching_days': "Buscando eventos de {start_date} a {end_date}...",
-        'log_fetching_day_progress': "Buscando dia {day_num}/{total_days}: {date}",
+        'log_periods_parallel': "Processando {periods} períodos em {workers} processos paralelos...",
+        'log_periods_combined': "{periods} períodos combinados: {count} eventos no total.",
+        'log_servers_parallel': "Processando {servers} servidores ({periods} período(s) cada) em {workers} processos paralelos...",
+        'log_servers_combined': "{servers} servidores combinados: {count} eventos no total.",
+        'log_cache_days': "Cache local: {cached} de {total} dias carregados do disco; os demais serão buscados na API.",
+        'log_cache_stored': "Cache local atualizado com {count} dias fechados.",
+        'log_sketches_cached': "Percentis: sketches de {count} dias fechados carregados do cache local.",
+        'log_name_cache': "Cache de nomes: hosts {host_hits} encontrados / {host_misses} ausentes ou expirados; usuários {user_hits} encontrados / {user_misses} ausentes ou expirados.",
+        'log_api_retry': "Falha em {method} ({error}); tentativa {attempt} em {delay:.1f}s.",
+        'log_event_fields_skipped': "Dados não usados pelas abas escolhidas não serão baixados: {fields}.",
+        'log_checkpoint_loaded': "Modo incremental: {stored} eventos guardados até {since}; reconsultando {recheck} problemas abertos ou recentes.",
+        'log_checkpoint_saved': "Checkpoint salvo: {count} eventos no período, {recheck} a reconsultar na próxima execução.",
+        'log_cache_unavailable': "Aviso: cache local indisponível ({error}). Continuando sem cache.",
+        'log_windows_planned': "{count} eventos distribuídos em {windows} janelas de busca.",
+        'log_window_fetched': "Janela {done}/{total} concluída: {start} → {end} ({count} eventos)",
         'log_fetching_recoveries': "Buscando detalhes de {count} eventos de recuperação...",
         'log_fetching_hosts': "Buscando nomes para {count} hosts...",
         'log_fetching_users': "Buscando nomes para {count} usuários...",
         'log_processing_events': "Processando eventos e construindo relatórios...",
-        'log_preparing_data': "Preparando dados e convertendo datas para os relatórios...",
         'log_generating_sla': "Gerando relatórios de análise de SLA...",
         'log_warn_no_acks': "Aviso: Nenhum evento com acknowledgement encontrado para gerar relatórios de SLA.",
         'log_no_data': "Nenhum dado disponível para gerar um relatório.",
         'log_saving_report': "Salvando relatório consolidado em Excel com gráficos...",
+        'log_xlsx_streaming': "Relatório grande ({rows} linhas): gravando o Excel em modo de memória constante.",
+        'log_sheet_split': "A aba {sheet_name} tem {rows} linhas, acima do limite do Excel: dividida em {parts} abas.",
         'log_report_saved': "Relatório completo com dashboards exportado para: {outfile}",
+        'log_data_exported': "Dados exportados ({formats}) para: {path}",
+        'log_metrics_header': "Tempo por etapa:",
+        'log_metrics_stage': "  {stage}: {seconds:.2f} s, {rate} eventos/s, pico de memória {peak_mb} MB",
+        'log_metrics_api_header': "Chamadas à API:",
+        'log_metrics_api': "  {method}: {calls} chamadas, {retries} novas tentativas, {mb:.1f} MB recebidos, {seconds:.2f} s",
+        'log_metrics_saved': "Métricas da execução salvas em: {path}",
         'log_process_complete': "✅ Processo concluído em {seconds:.2f} segundos.",
         'log_success_message': "Relatório gerado com sucesso em {path}",
         'log_warn_empty_sheet': "Aviso: Pulando aba vazia: {sheet_name}",
@@ -127,7 +166,9 @@ LANGUAGES = {
         'sheet_problems': "Problemas", 'sheet_actions': "Ações", 'sheet_sla_details': "Detalhes SLA",
         'sheet_daily_sla': "SLA Diário", 'sheet_daily_volume': "Volume Diário de Eventos",
         'sheet_top_10': "Top 10 Problemas", 'sheet_user_prod': "Produtividade por Usuário",
-        'sheet_dashboard': "Dashboard Mensal",
+        'sheet_dashboard': "Dashboard Mensal", 'sheet_period_sla': "SLA por Período",
+        'sheet_sla_breakdown': "SLA por Dimensão", 'sheet_percentiles': "Percentis de Tempo",
+        'sheet_server_sla': "SLA por Servidor",
         'col_event_id': "ID do Evento", 'col_time': "Hora", 'col_severity': "Severidade",
         'col_recovery_time': "Hora da Recuperação", 'col_status': "Status", 'col_host': "Host",
         'col_problem': "Problema", 'col_duration': "Duração", 'col_ack': "Reconhecido",
@@ -138,7 +179,12 @@ LANGUAGES = {
         'col_sla_status': "Status SLA", 'col_date': "Data", 'col_met': "Dentro do SLA",
         'col_violated': "Fora do SLA", 'col_total_acks': "Total Recon.",
         'col_percent_met': "% Dentro do SLA", 'col_total_events': "Total de Eventos",
-        'col_count': "Contagem", 'col_sla_violations': "Violações de SLA",
+        'col_count': "Contagem", 'col_sla_violations': "Violações de SLA", 'col_period': "Período",
+        'col_dimension': "Dimensão", 'col_value': "Valor", 'col_avg_ack_duration_min': "Tempo Médio de Ack (min)",
+        'dimension_host_group': "Grupo de hosts", 'dimension_tag': "Tag {tag}",
+        'dimension_severity': "Severidade", 'dimension_day': "Dia", 'col_resolved': "Resolvidos",
+        'col_server': "Servidor",
+        'col_ack_percentile': "Ack p{q} (min)", 'col_resolution_percentile': "Resolução p{q} (min)",
         'report_filename_prefix': "relatorio_zabbix_completo",
 
         # Gráficos
@@ -197,8 +243,16 @@ LANGUAGES = {
         'report_period': "Report Period:",
         'year': "Year:",
         'month': "Month:",
+        'months': "Months:",
         'ack_sla': "SLA for Acknowledgement:",
+        'fetch_workers': "Parallel Requests:",
+        'cache_refresh': "Ignore the local cache and download the whole period again",
+        'incremental_mode': "Incremental mode: fetch only what changed since the last run of this period",
         'browse_button': "Browse...",
+        'output_formats': "Formats:",
+        'format_xlsx': "Excel (.xlsx)",
+        'format_parquet': "Parquet",
+        'format_csv': "CSV (.csv.gz)",
         'generate_button': "Generate Report",
         'generating_button': "Generating...",
         'validating_button': "Validating...",
@@ -233,6 +287,16 @@ LANGUAGES = {
         'url_token_empty': "The API URL and Token cannot be empty.",
         'url_invalid': "The API URL is invalid. It must start with 'http://' or 'https://'.",
         'no_severity_selected': "Please select at least one severity.",
+        'no_output_format_selected': "Please select at least one output format.",
+        'unknown_output_format': "Unknown output format: {formats}. Use xlsx, parquet or csv.",
+        'parquet_unavailable': "Parquet output requires the pyarrow package (pip install pyarrow).",
+        'unknown_report_sheet': "Unknown sheet: {sheets}. Use: {choices}.",
+        'unknown_problem_column': "Unknown Problems column: {columns}. Use: {choices}.",
+        'unknown_language': "Unknown language: {languages}. Use: {choices}.",
+        'invalid_business_hours': "Invalid business calendar: {error}",
+        'log_business_hours': "SLA ack times counted in business hours only.",
+        'invalid_servers': "Invalid server list: {error}",
+        'duplicate_server_names': "repeated server names ({names})",
         'cannot_access_output_dir': "Could not create or access the output directory:\n{error}",
         'zabbix_connection_failed': "Could not connect to the Zabbix API.\n\nDetails: {error}",
         'connection_successful': "Connection successful. ✔️",
@@ -253,17 +317,38 @@ LANGUAGES = {
         'log_no_events': "No events found for the selected period and severities. Exiting.",
         'log_events_found': "Total events found: {count}.",
         'log_fetching_days': "Fetching events from {start_date} to {end_date}...",
-        'log_fetching_day_progress': "Fetching day {day_num}/{total_days}: {date}",
+        'log_periods_parallel': "Processing {periods} periods in {workers} parallel processes...",
+        'log_periods_combined': "{periods} periods combined: {count} events in total.",
+        'log_servers_parallel': "Processing {servers} servers ({periods} period(s) each) in {workers} parallel processes...",
+        'log_servers_combined': "{servers} servers combined: {count} events in total.",
+        'log_cache_days': "Local cache: {cached} of {total} days loaded from disk; the rest will be fetched from the API.",
+        'log_cache_stored': "Local cache updated with {count} closed days.",
+        'log_sketches_cached': "Percentiles: sketches of {count} closed days loaded from the local cache.",
+        'log_name_cache': "Name cache: hosts {host_hits} hit / {host_misses} missing or expired; users {user_hits} hit / {user_misses} missing or expired.",
+        'log_api_retry': "{method} failed ({error}); retry {attempt} in {delay:.1f}s.",
+        'log_event_fields_skipped': "Data not used by the selected sheets will not be downloaded: {fields}.",
+        'log_checkpoint_loaded': "Incremental mode: {stored} stored events up to {since}; re-checking {recheck} open or recent problems.",
+        'log_checkpoint_saved': "Checkpoint saved: {count} events in the period, {recheck} to re-check on the next run.",
+        'log_cache_unavailable': "Warning: local cache unavailable ({error}). Continuing without cache.",
+        'log_windows_planned': "{count} events split into {windows} fetch windows.",
+        'log_window_fetched': "Window {done}/{total} done: {start} → {end} ({count} events)",
         'log_fetching_recoveries': "Fetching details for {count} recovery events...",
         'log_fetching_hosts': "Fetching names for {count} hosts...",
         'log_fetching_users': "Fetching names for {count} users...",
         'log_processing_events': "Processing events and building reports...",
-        'log_preparing_data': "Preparing data and converting dates for reports...",
         'log_generating_sla': "Generating SLA analysis reports...",
         'log_warn_no_acks': "Warning: No acknowledged events found to generate SLA reports.",
         'log_no_data': "No data available to generate a report.",
         'log_saving_report': "Saving consolidated Excel report with charts...",
+        'log_xlsx_streaming': "Large report ({rows} rows): writing the Excel file in constant-memory mode.",
+        'log_sheet_split': "Sheet {sheet_name} has {rows} rows, above Excel's limit: split into {parts} sheets.",
         'log_report_saved': "Full report with dashboards exported to: {outfile}",
+        'log_data_exported': "Data exported ({formats}) to: {path}",
+        'log_metrics_header': "Time per stage:",
+        'log_metrics_stage': "  {stage}: {seconds:.2f} s, {rate} events/s, peak memory {peak_mb} MB",
+        'log_metrics_api_header': "API calls:",
+        'log_metrics_api': "  {method}: {calls} calls, {retries} retries, {mb:.1f} MB received, {seconds:.2f} s",
+        'log_metrics_saved': "Run metrics saved to: {path}",
         'log_process_complete': "✅ Process completed in {seconds:.2f} seconds.",
         'log_success_message': "Report generated successfully in {path}",
         'log_warn_empty_sheet': "Warning: Skipping empty sheet: {sheet_name}",
@@ -295,7 +380,9 @@ LANGUAGES = {
         'sheet_problems': "Problems", 'sheet_actions': "Actions", 'sheet_sla_details': "SLA Details",
         'sheet_daily_sla': "Daily SLA Summary", 'sheet_daily_volume': "Daily Event Volume",
         'sheet_top_10': "Top 10 Problems", 'sheet_user_prod': "User Productivity",
-        'sheet_dashboard': "Monthly Dashboard",
+        'sheet_dashboard': "Monthly Dashboard", 'sheet_period_sla': "SLA by Period",
+        'sheet_sla_breakdown': "SLA by Dimension", 'sheet_percentiles': "Time Percentiles",
+        'sheet_server_sla': "SLA by Server",
         'col_event_id': "EventID", 'col_time': "Time", 'col_severity': "Severity",
         'col_recovery_time': "Recovery Time", 'col_status': "Status", 'col_host': "Host",
         'col_problem': "Problem", 'col_duration': "Duration", 'col_ack': "Ack",
@@ -306,7 +393,12 @@ LANGUAGES = {
         'col_sla_status': "SLA Status", 'col_date': "Date", 'col_met': "Met",
         'col_violated': "Violated", 'col_total_acks': "Total Acks",
         'col_percent_met': "% Met", 'col_total_events': "Total Events",
-        'col_count': "Count", 'col_sla_violations': "SLA Violations",
+        'col_count': "Count", 'col_sla_violations': "SLA Violations", 'col_period': "Period",
+        'col_dimension': "Dimension", 'col_value': "Value", 'col_avg_ack_duration_min': "Avg Ack Time (min)",
+        'dimension_host_group': "Host group", 'dimension_tag': "Tag {tag}",
+        'dimension_severity': "Severity", 'dimension_day': "Day", 'col_resolved': "Resolved",
+        'col_server': "Server",
+        'col_ack_percentile': "Ack p{q} (min)", 'col_resolution_percentile': "Resolution p{q} (min)",
         'report_filename_prefix': "zabbix_full_report",
 
         # Charts
@@ -343,19 +435,28 @@ LANGUAGES = {
 }
 
 
-def get_string(key, **kwargs):
-    """
-    Retorna a string traduzida para o idioma detectado.
-    Permite formatação com .format(**kwargs).
-    """
-    if not hasattr(get_string, "strings"):
+def current_language() -> str:
+    """Código em LANGUAGES do idioma do sistema (en_US quando não há tradução para ele)."""
+    if not hasattr(current_language, "code"):
         lang_code, _ = locale.getdefaultlocale()
         if lang_code and lang_code.lower().startswith('pt'):
             lang_code = 'pt_BR'
 
         if lang_code not in LANGUAGES:
             lang_code = 'en_US'
-        get_string.strings = LANGUAGES[lang_code]
+        current_language.code = lang_code
+    return current_language.code
+
+
+def translate(lang_code, key, **kwargs):
+    """Retorna a string de key no idioma lang_code, formatada com .format(**kwargs)."""
+    base_string = LANGUAGES[lang_code].get(key, f"<{key}>")
+    return base_string.format(**kwargs)
 
-    base_string = get_string.strings.get(key, f"<{key}>")
-    return base_string.format(**kwargs)
\ No newline at end of file
+
+def get_string(key, **kwargs):
+    """
+    Retorna a string traduzida para o idioma detectado.
+    Permite formatação com .format(**kwargs).
+    """
+    return translate(current_language(), key, **kwargs)
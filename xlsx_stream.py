@@ -0,0 +1,120 @@
+# xlsx_stream.py
+import numpy as np
+import pandas as pd
+
+# Linhas convertidas por bloco: limita a memória das listas Python usadas na gravação
+STREAM_BLOCK_ROWS = 50000
+# Limite de linhas de uma planilha do Excel (1.048.576) menos a linha de cabeçalho
+EXCEL_MAX_DATA_ROWS = 1048575
+# Tamanho máximo do nome de uma aba no Excel
+EXCEL_MAX_SHEET_NAME = 31
+# Linhas amostradas para estimar a largura de colunas numéricas e de objetos
+WIDTH_SAMPLE_ROWS = 10000
+
+# Data serial 0 do Excel (sistema 1900, válido para datas após 1900-03-01)
+_EXCEL_EPOCH = np.datetime64('1899-12-30T00:00:00', 'ns')
+_DAY_NS = 86400 * 10**9
+
+# Aproximação do 'Table Style Medium 9' para planilhas sem tabela (constant_memory)
+HEADER_FORMAT = {'bold': True, 'font_color': '#FFFFFF', 'bg_color': '#4F81BD', 'border': 1, 'border_color': '#95B3D7'}
+BAND_FORMAT = {'bg_color': '#DCE6F1'}
+
+
+def _with_none(values: np.ndarray, missing: np.ndarray) -> list:
+    values = values.astype(object)
+    values[missing] = None
+    return values.tolist()
+
+
+def excel_cells(series: pd.Series, formats: dict) -> tuple[list, str, object]:
+    """Converts one column slice into (cell values, worksheet method name, cell format).
+
+    Missing values become None and are left blank. Datetimes and durations are written as
+    Excel serial numbers with the same number formats pandas' to_excel uses.
+    """
+    missing = series.isna().to_numpy()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = np.array(list(series.cat.categories.astype(str)) + [None], dtype=object)
+        return categories[series.cat.codes.to_numpy()].tolist(), 'write', None
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        ns = series.to_numpy(dtype='datetime64[ns]') - _EXCEL_EPOCH
+        ns = ns.view('i8')
+        days = ns // _DAY_NS
+        serial = days + (ns - days * _DAY_NS) / 1e9 / 86400
+        return _with_none(serial, missing), 'write_number', formats['datetime']
+    if pd.api.types.is_timedelta64_dtype(series.dtype):
+        serial = series.dt.total_seconds().to_numpy() / 86400
+        return _with_none(serial, missing), 'write_number', formats['duration']
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return _with_none(series.to_numpy(dtype='float64'), missing), 'write_number', None
+    return _with_none(series.to_numpy(dtype=object), missing), 'write', None
+
+
+def stream_dataframe(worksheet, df: pd.DataFrame, formats: dict, block_rows: int = STREAM_BLOCK_ROWS):
+    """Writes the header and the rows of df strictly in row order (xlsxwriter constant_memory mode)."""
+    worksheet.write_row(0, 0, [str(column) for column in df.columns], formats['header'])
+    for start in range(0, len(df), block_rows):
+        block = df.iloc[start:start + block_rows]
+        columns = []
+        for i in range(block.shape[1]):
+            values, method, cell_format = excel_cells(block.iloc[:, i], formats)
+            columns.append((i, values, getattr(worksheet, method), cell_format))
+        for offset in range(len(block)):
+            row = start + offset + 1
+            for col, values, write, cell_format in columns:
+                value = values[offset]
+                if value is not None:
+                    write(row, col, value, cell_format)
+
+
+def excel_sheet_parts(sheet_name: str, rows: int, max_rows: int = EXCEL_MAX_DATA_ROWS) -> list[tuple[str, int, int]]:
+    """Splits rows into (sheet name, start, stop) parts of at most max_rows: 'Problems', 'Problems (2)', ..."""
+    parts = []
+    for number, start in enumerate(range(0, max(rows, 1), max_rows), start=1):
+        name = sheet_name
+        if number > 1:
+            suffix = f" ({number})"
+            name = sheet_name[:EXCEL_MAX_SHEET_NAME - len(suffix)] + suffix
+        parts.append((name, start, min(start + max_rows, rows)))
+    return parts
+
+
+def longest_text(series: pd.Series) -> int:
+    """Estimates series.astype(str).str.len().max() without converting the whole column.
+
+    Categoricals use the lengths of their used categories and string columns their
+    vectorized lengths, both exact. Other columns are sampled at evenly spaced rows,
+    plus their minimum and maximum, which hold the longest numbers and durations.
+    """
+    if series.empty:
+        return 0
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        used = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories)) > 0
+        lengths = series.cat.categories.astype(str).str.len().to_numpy()[used]
+        return int(lengths.max()) if lengths.size else 0
+    if isinstance(series.dtype, pd.StringDtype):
+        longest = series.str.len().max()
+    else:
+        sample = series
+        if len(series) > WIDTH_SAMPLE_ROWS:
+            sample = series.iloc[np.linspace(0, len(series) - 1, WIDTH_SAMPLE_ROWS).astype(np.int64)]
+            if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_timedelta64_dtype(series.dtype):
+                sample = pd.concat([sample, pd.Series([series.min(), series.max()], dtype=series.dtype)])
+        longest = sample.astype(str).str.len().max()
+    return 0 if pd.isna(longest) else int(longest)
+
+
+def column_width(series: pd.Series, header, cap: int = 60) -> int:
+    """Excel width for a text or number column: longest value or header plus padding, capped."""
+    return min(max(longest_text(series), len(str(header))) + 2, cap)
+
+
+def stream_formats(workbook) -> dict:
+    """Workbook formats used by stream_dataframe and the table-style emulation."""
+    return {
+        'header': workbook.add_format(HEADER_FORMAT),
+        'band': workbook.add_format(BAND_FORMAT),
+        'datetime': workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'}),
+        'duration': workbook.add_format({'num_format': '0'}),
+    }
@@ -0,0 +1,211 @@
+# zabbix_api.py
+import logging
+import random
+import threading
+import time
+from multiprocessing.managers import BaseProxy, SyncManager
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ChunkedEncodingError, ConnectionError, HTTPError, Timeout
+
+from json_stream import IncompleteJsonStream, JsonRpcErrorResponse, iter_json_rpc_result, iter_response_text
+
+# Novas tentativas para chamadas *.get após falhas de rede ou respostas 429/5xx do frontend
+DEFAULT_API_RETRIES = 4
+# Requisições por segundo somando todas as threads (0 = sem limite). Quando vários processos coletam
+# o mesmo servidor (relatórios de vários períodos), o limite é um só para todos eles: compartilham um
+# TokenBucket servido por LimiterManager, e as conexões por processo são divididas entre eles
+DEFAULT_API_RATE_LIMIT = 20.0
+DEFAULT_API_TIMEOUT = 600
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TruncatedResponse(ConnectionError):
+    """The server closed the connection cleanly before the end of the JSON body."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a request may be sent."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes one token and returns how many seconds the caller must wait before using it."""
+        if self.rate <= 0:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # O token é reservado já aqui; o saldo negativo organiza a fila de espera
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+
+class TokenBucketProxy(BaseProxy):
+    """Proxy of a TokenBucket living in a LimiterManager; the wait happens in the calling process."""
+    _exposed_ = ('reserve',)
+
+    def reserve(self) -> float:
+        return self._callmethod('reserve')
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+
+class LimiterManager(SyncManager):
+    """SyncManager that also serves TokenBuckets, so worker processes can share one rate limit."""
+
+
+LimiterManager.register('TokenBucket', TokenBucket, proxytype=TokenBucketProxy)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: attempt n waits uniform(0, min(max_delay, base * 2**n))."""
+
+    def __init__(self, retries: int = DEFAULT_API_RETRIES, base_delay: float = 0.5, max_delay: float = 30.0):
+        self.retries = max(0, int(retries))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, error: Exception = None) -> float:
+        retry_after = getattr(getattr(error, 'response', None), 'headers', {}).get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        if isinstance(error, HTTPError):
+            return error.response is not None and error.response.status_code in RETRY_STATUS_CODES
+        return isinstance(error, (ConnectionError, Timeout, ChunkedEncodingError))
+
+
+def is_idempotent(method: str) -> bool:
+    """Only read-only methods are retried; a repeated write could be applied twice."""
+    return method.endswith('.get') or method == 'apiinfo.version'
+
+
+class ZabbixTransport:
+    """JSON-RPC transport over one pooled requests.Session, with rate limiting and retries.
+
+    Errors are raised as requests exceptions (network/HTTP) or JsonRpcErrorResponse
+    (error member in the response); callers map them to their own exception types.
+    """
+
+    def __init__(self, url: str, token: str, pool_size: int = 4, retries: int = DEFAULT_API_RETRIES,
+                 rate_limit: float = DEFAULT_API_RATE_LIMIT, timeout: float = DEFAULT_API_TIMEOUT,
+                 verify: bool = False, on_retry=None, metrics=None, limiter=None):
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+        self.verify = verify
+        self.retry_policy = RetryPolicy(retries)
+        # limiter: TokenBucket (ou proxy de LimiterManager) compartilhado com outros transportes; sem ele
+        # o limite vale só para este transporte
+        self.limiter = limiter if limiter is not None else TokenBucket(rate_limit, burst=pool_size)
+        # Chamado como on_retry(method, attempt, delay, error) antes de cada nova tentativa
+        self.on_retry = on_retry
+        # RunMetrics opcional: tempo, bytes e novas tentativas por método
+        self.metrics = metrics
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
+        # Um pool de conexões por worker, para que as requisições paralelas não disputem sockets
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _post(self, method: str, params: dict, stream: bool = False):
+        self.limiter.acquire()
+        payload = {'jsonrpc': '2.0', 'method': method, 'params': params, 'auth': self.token, 'id': 1}
+        response = self.session.post(self.url, json=payload, verify=self.verify, timeout=self.timeout, stream=stream)
+        try:
+            response.raise_for_status()
+        except HTTPError:
+            response.close()
+            raise
+        return response
+
+    def _record(self, method: str, start: float, response, attempt: int, failed: bool = False):
+        if self.metrics is None:
+            return
+        received = 0
+        if response is not None and hasattr(response.raw, 'tell'):
+            received = response.raw.tell()
+        self.metrics.record_api(method, time.perf_counter() - start, received, retried=attempt > 0, failed=failed)
+
+    def _backoff(self, method: str, attempt: int, error: Exception) -> bool:
+        """Sleeps before the next attempt; returns False when error must be raised instead."""
+        if attempt >= self.retry_policy.retries or not is_idempotent(method) \
+                or not self.retry_policy.is_retryable(error):
+            return False
+        delay = self.retry_policy.delay(attempt, error)
+        logging.warning(f"{method}: tentativa {attempt + 1} falhou ({error}); nova tentativa em {delay:.1f}s")
+        if self.on_retry:
+            self.on_retry(method, attempt + 1, delay, error)
+        time.sleep(delay)
+        return True
+
+    def call(self, method: str, params: dict):
+        """Sends one request and returns its decoded 'result'."""
+        attempt = 0
+        while True:
+            start, response = time.perf_counter(), None
+            try:
+                response = self._post(method, params)
+                result = response.json()
+                self._record(method, start, response, attempt)
+                break
+            except requests.RequestException as e:
+                self._record(method, start, response, attempt, failed=True)
+                if not self._backoff(method, attempt, e):
+                    raise
+                attempt += 1
+        if 'error' in result:
+            raise JsonRpcErrorResponse(result['error'])
+        return result.get('result', [])
+
+    def iter_call(self, method: str, params: dict, resume=None):
+        """Yields result items while the response downloads.
+
+        A failure before the first item is retried as a whole. A failure mid-stream is
+        retried only when resume is given: resume(params, last_item) returns the params
+        that continue right after the last item received (e.g. an eventid cursor).
+        """
+        attempt = 0
+        last_item = None
+        while True:
+            start, response = time.perf_counter(), None
+            try:
+                with self._post(method, params, stream=True) as response:
+                    try:
+                        for item in iter_json_rpc_result(iter_response_text(response)):
+                            last_item = item
+                            yield item
+                    except IncompleteJsonStream as e:
+                        # Corpo cortado sem erro de rede: tratado como falha de conexão (nova tentativa)
+                        raise TruncatedResponse(str(e), response=response) from e
+                self._record(method, start, response, attempt)
+                return
+            except requests.RequestException as e:
+                self._record(method, start, response, attempt, failed=True)
+                if last_item is not None and resume is None:
+                    raise
+                if not self._backoff(method, attempt, e):
+                    raise
+                attempt += 1
+                if last_item is not None:
+                    params = resume(params, last_item)